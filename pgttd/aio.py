@@ -0,0 +1,159 @@
+"""Asyncio client for driving and watching a game.
+
+:class:`AsyncClient` exposes ticks, tile fetches and vehicle queries as
+coroutines on an ``AsyncConnectionPool`` from :func:`pgttd.db.create_async_pool`.
+Every call borrows its own connection for one transaction, so a tick, a map
+fetch and a vehicle query started together run side by side on separate
+backends. The pool's ``max_size`` caps how many run at once.
+
+Regions are ``(x_min, x_max, y_min, y_max)`` tuples with inclusive bounds.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+from . import db
+
+Region = tuple[int, int, int, int]
+
+TILES_SQL = (
+    "SELECT t.x, t.y, s.glyph, s.color FROM tiles t "
+    "JOIN sprites s ON t.sprite_id = s.id"
+)
+# For clients that keep their own copy of the sprites
+TILE_SPRITES_SQL = "SELECT t.x, t.y, t.sprite_id FROM tiles t"
+SPRITES_SQL = (
+    "SELECT s.id, s.glyph, s.color, i.image FROM sprites s "
+    "JOIN sprite_images i ON i.sha256 = s.image_sha256"
+)
+# Range predicate served by the UNIQUE (x, y) index on tiles
+TILE_REGION = "t.x BETWEEN %s AND %s AND t.y BETWEEN %s AND %s"
+VEHICLES_SQL = "SELECT id, x, y, company_id FROM vehicles"
+# Served by the vehicle_cells index of procs/spatial.sql
+VEHICLES_IN_RECT_SQL = (
+    "SELECT id, x, y, company_id FROM vehicles_in_rect(%s, %s, %s, %s)"
+)
+# Composed by render_frame() of procs/frame.sql
+FRAME_SQL = "SELECT x, y, glyph, color FROM render_frame(%s, %s, %s, %s)"
+PACKED_FRAME_SQL = "SELECT render_frame_packed(%s, %s, %s, %s, %s)"
+CURRENT_TICK_SQL = "SELECT current_tick FROM game_state ORDER BY id LIMIT 1"
+GAME_STATE_SQL = (
+    "SELECT current_tick, sprite_version FROM game_state ORDER BY id LIMIT 1"
+)
+
+
+class AsyncClient:
+    """Run game queries concurrently on the connections of *pool*."""
+
+    def __init__(self, pool) -> None:
+        self.pool = pool
+
+    @classmethod
+    async def open(cls, dsn: str, max_size: int = 3, **kwargs) -> AsyncClient:
+        """Open a pool of *max_size* connections and wrap it.
+
+        All of them are connected up front, so the first concurrent calls do
+        not wait for a connection. Extra keyword arguments go to
+        :func:`pgttd.db.create_async_pool`.
+        """
+        kwargs.setdefault("min_size", max_size)
+        pool = db.create_async_pool(dsn, max_size=max_size, **kwargs)
+        await pool.open(wait=True)
+        return cls(pool)
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+    async def __aenter__(self) -> AsyncClient:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _fetchall(self, sql: str, params: Sequence = ()) -> list[tuple]:
+        async with self.pool.connection() as conn:
+            cur = await conn.execute(sql, params)
+            return await cur.fetchall()
+
+    async def tick(self, skip: Sequence[str] = ()) -> int:
+        """Run ``tick()`` in one transaction and return the new tick number.
+
+        Stages named in *skip* are left out, as with ``tick(1, skip)``.
+        """
+        async with self.pool.connection() as conn:
+            if skip:
+                await conn.execute("CALL tick(1, %s)", (list(skip),))
+            else:
+                await conn.execute("CALL tick()", prepare=True)
+            cur = await conn.execute(CURRENT_TICK_SQL)
+            row = await cur.fetchone()
+        return row[0] if row and row[0] is not None else 0
+
+    async def current_tick(self) -> int:
+        """Return the current game tick."""
+        rows = await self._fetchall(CURRENT_TICK_SQL)
+        return rows[0][0] if rows and rows[0][0] is not None else 0
+
+    async def game_state(self) -> tuple[int, int]:
+        """Return the current game tick and sprite version."""
+        rows = await self._fetchall(GAME_STATE_SQL)
+        if not rows:
+            return 0, 0
+        return rows[0][0] or 0, rows[0][1]
+
+    async def fetch_sprites(self) -> list[tuple]:
+        """Return ``(id, glyph, color, image)`` for every sprite."""
+        return await self._fetchall(SPRITES_SQL)
+
+    async def fetch_tiles(
+        self, region: Region | None = None, sprite_ids: bool = False
+    ) -> list[tuple]:
+        """Return ``(x, y, glyph, color)`` rows ordered by row, then column.
+
+        With *sprite_ids* the rows are ``(x, y, sprite_id)`` instead, read
+        without joining ``sprites``.
+        """
+        tiles = TILE_SPRITES_SQL if sprite_ids else TILES_SQL
+        if region is None:
+            return await self._fetchall(f"{tiles} ORDER BY t.y, t.x")
+        return await self._fetchall(
+            f"{tiles} WHERE {TILE_REGION} ORDER BY t.y, t.x", region
+        )
+
+    async def fetch_changed_tiles(
+        self, since_tick: int, region: Region | None = None, sprite_ids: bool = False
+    ) -> list[tuple]:
+        """Return the tiles changed at or after *since_tick*.
+
+        *sprite_ids* is as for :meth:`fetch_tiles`.
+        """
+        tiles = TILE_SPRITES_SQL if sprite_ids else TILES_SQL
+        sql = f"{tiles} WHERE t.updated_tick >= %s"
+        params: tuple[int, ...] = (since_tick,)
+        if region is not None:
+            sql += f" AND {TILE_REGION}"
+            params += tuple(region)
+        return await self._fetchall(sql, params)
+
+    async def fetch_vehicles(self, region: Region | None = None) -> list[tuple]:
+        """Return ``(id, x, y, company_id)`` for the vehicles in *region*.
+
+        A region is looked up through ``vehicles_in_rect()``, so only the
+        vehicles near it are read.
+        """
+        if region is None:
+            return await self._fetchall(f"{VEHICLES_SQL} ORDER BY id")
+        return await self._fetchall(f"{VEHICLES_IN_RECT_SQL} ORDER BY id", region)
+
+    async def fetch_frame(self, region: Region) -> list[tuple]:
+        """Return ``(x, y, glyph, color)`` for every tile in *region*.
+
+        Vehicles and industries are already drawn over the tiles.
+        """
+        return await self._fetchall(FRAME_SQL, region)
+
+    async def fetch_packed_frame(self, region: Region, rle: bool = False) -> bytes:
+        """Return *region* packed by ``render_frame_packed()``."""
+        rows = await self._fetchall(PACKED_FRAME_SQL, (*region, rle))
+        return bytes(rows[0][0])
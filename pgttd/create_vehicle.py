@@ -1,12 +1,54 @@
-"""Utilities for inserting sample vehicles for testing."""
+"""Utilities for inserting sample vehicles for testing.
+
+Single vehicles are described on the command line. ``--from-file`` instead
+reads one vehicle per JSONL line or CSV row, from a file or from ``-`` for
+stdin, and streams them into ``vehicles`` with ``COPY`` on one connection.
+
+Schedules and cargo given as JSON text are checked by
+:func:`check_schedule_text` and :func:`check_cargo_text`. These match the
+common shapes with a regular expression and hand the text on unchanged.
+Anything else, including every invalid value, goes through the full
+:func:`validate_schedule` and :func:`validate_cargo` checks.
+"""
 
 import argparse
+import contextlib
+import csv
 import json
-
-from psycopg.types.json import Json
+import re
+import sys
+import time
+from typing import IO, Any, Iterable, Iterator
 
 from . import db
 
+# Columns of a bulk vehicle row, in COPY order
+BULK_COLUMNS = ("x", "y", "schedule", "cargo", "company_id")
+
+# Invalid rows listed before the rest are summarised as a count
+MAX_REPORTED_ERRORS = 20
+
+_WS = r"[ \t\n\r]*"
+_INT = r"-?(?:0|[1-9][0-9]*)"
+_COUNT = r"(?:0|[1-9][0-9]*)"
+_STRING = r'"(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*"'
+
+
+def _object_re(first: str, second: str) -> str:
+    """Pattern for a JSON object holding exactly two keys, in either order."""
+    pair = f"{_WS}(?:{first}{_WS},{_WS}{second}|{second}{_WS},{_WS}{first}){_WS}"
+    return rf"\{{{pair}\}}{_WS}"
+
+
+def _array_re(item: str) -> re.Pattern[str]:
+    return re.compile(rf"{_WS}\[{_WS}(?:{item}(?:,{_WS}{item})*)?\]{_WS}")
+
+
+_SCHEDULE_RE = _array_re(_object_re(f'"x"{_WS}:{_WS}{_INT}', f'"y"{_WS}:{_WS}{_INT}'))
+_CARGO_RE = _array_re(
+    _object_re(f'"resource"{_WS}:{_WS}{_STRING}', f'"amount"{_WS}:{_WS}{_COUNT}')
+)
+
 
 def validate_schedule(schedule: str) -> list[dict[str, int]]:
     """Parse and validate a schedule JSON string."""
@@ -14,7 +56,11 @@ def validate_schedule(schedule: str) -> list[dict[str, int]]:
         schedule_obj = json.loads(schedule)
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON for --schedule: {e.msg}") from e
+    return check_schedule(schedule_obj)
 
+
+def check_schedule(schedule_obj: Any) -> list[dict[str, int]]:
+    """Validate an already parsed schedule."""
     if not isinstance(schedule_obj, list):
         raise ValueError("--schedule must be a JSON array")
     for idx, entry in enumerate(schedule_obj):
@@ -36,7 +82,11 @@ def validate_cargo(cargo: str) -> list[dict[str, object]]:
         cargo_obj = json.loads(cargo)
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON for --cargo: {e.msg}") from e
+    return check_cargo(cargo_obj)
+
 
+def check_cargo(cargo_obj: Any) -> list[dict[str, object]]:
+    """Validate an already parsed cargo list."""
     if not isinstance(cargo_obj, list):
         raise ValueError("--cargo must be a JSON array")
     for idx, item in enumerate(cargo_obj):
@@ -51,12 +101,24 @@ def validate_cargo(cargo: str) -> list[dict[str, object]]:
         if not isinstance(item["amount"], int):
             raise ValueError(f"Cargo entry {idx} key 'amount' must be an integer")
         if item["amount"] < 0:
-            raise ValueError(
-                f"Cargo entry {idx} key 'amount' must be non-negative"
-            )
+            raise ValueError(f"Cargo entry {idx} key 'amount' must be non-negative")
     return cargo_obj
 
 
+def check_schedule_text(schedule: str) -> str:
+    """Validate a schedule JSON string and return it unchanged."""
+    if not _SCHEDULE_RE.fullmatch(schedule):
+        validate_schedule(schedule)
+    return schedule
+
+
+def check_cargo_text(cargo: str) -> str:
+    """Validate a cargo JSON string and return it unchanged."""
+    if not _CARGO_RE.fullmatch(cargo):
+        validate_cargo(cargo)
+    return cargo
+
+
 def insert_vehicle(
     dsn: str,
     x: int,
@@ -71,8 +133,8 @@ def insert_vehicle(
         ValueError: If ``schedule`` or ``cargo`` are not valid JSON or fail
             validation checks.
     """
-    schedule_obj = validate_schedule(schedule)
-    cargo_obj = validate_cargo(cargo)
+    check_schedule_text(schedule)
+    check_cargo_text(cargo)
 
     with db.connect(dsn) as conn:
         with conn.cursor() as cur:
@@ -81,17 +143,150 @@ def insert_vehicle(
                 INSERT INTO vehicles (x, y, schedule, cargo, company_id)
                 VALUES (%s, %s, %s::jsonb, %s::jsonb, %s)
                 """,
-                (
-                    x,
-                    y,
-                    Json(schedule_obj),
-                    Json(cargo_obj),
-                    company_id,
-                ),
+                (x, y, schedule, cargo, company_id),
             )
         conn.commit()
 
 
+def _to_int(fields: dict[str, Any], key: str, default: int | None) -> int | None:
+    value = fields.get(key, default)
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+        raise ValueError(f"'{key}' must be an integer")
+    return value
+
+
+def _vehicle_row(fields: dict[str, Any], text: bool = False) -> tuple:
+    """Validate one bulk vehicle and return it in ``BULK_COLUMNS`` order.
+
+    With *text*, as for CSV, every value is a string: integers are parsed
+    and JSON columns are validated and passed on without encoding them again.
+    """
+    unknown = set(fields) - set(BULK_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown keys: {', '.join(sorted(unknown))}")
+
+    if text:
+        fields = dict(fields)
+        for key in ("x", "y", "company_id"):
+            if key in fields:
+                try:
+                    fields[key] = int(fields[key])
+                except ValueError:
+                    raise ValueError(f"'{key}' must be an integer") from None
+        schedule = check_schedule_text(fields.get("schedule", "[]"))
+        cargo = check_cargo_text(fields.get("cargo", "[]"))
+    else:
+        schedule = json.dumps(check_schedule(fields.get("schedule", [])))
+        cargo = json.dumps(check_cargo(fields.get("cargo", [])))
+
+    return (
+        _to_int(fields, "x", 1),
+        _to_int(fields, "y", 1),
+        schedule,
+        cargo,
+        _to_int(fields, "company_id", None),
+    )
+
+
+def _parse_record(record: str | dict[str, str], fmt: str) -> tuple:
+    if fmt == "csv":
+        # csv.DictReader files extra cells under None and fills missing ones
+        # with None
+        if None in record:
+            raise ValueError("too many fields")
+        if None in record.values():
+            raise ValueError("too few fields")
+        # Empty cells take the column default
+        return _vehicle_row({k: v for k, v in record.items() if v}, text=True)
+    try:
+        fields = json.loads(record)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e.msg}") from e
+    if not isinstance(fields, dict):
+        raise ValueError("Vehicle must be a JSON object")
+    return _vehicle_row(fields)
+
+
+def read_vehicles(
+    stream: IO[str],
+    fmt: str = "jsonl",
+    errors: list[tuple[int, str]] | None = None,
+) -> Iterator[tuple]:
+    """Yield validated vehicle rows from a JSONL or CSV *stream*.
+
+    Rows are read and validated one at a time, so the input is never held in
+    memory. Blank JSONL lines are skipped and empty CSV cells take the
+    defaults of the single-vehicle options. Without *errors*, raises
+    ``ValueError`` naming the line of the first invalid row. Otherwise each
+    invalid row is skipped and its line number and reason appended to
+    *errors*.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        records = ((reader.line_num, row) for row in reader)
+    else:
+        records = (
+            (lineno, line)
+            for lineno, line in enumerate(stream, start=1)
+            if line.strip()
+        )
+
+    for lineno, record in records:
+        try:
+            row = _parse_record(record, fmt)
+        except ValueError as e:
+            if errors is None:
+                raise ValueError(f"Line {lineno}: {e}") from e
+            errors.append((lineno, str(e)))
+            continue
+        yield row
+
+
+def format_errors(errors: list[tuple[int, str]]) -> str:
+    """Describe the invalid rows collected by :func:`read_vehicles`."""
+    lines = [f"{len(errors)} invalid vehicle(s):"]
+    lines += [
+        f"Line {lineno}: {reason}" for lineno, reason in errors[:MAX_REPORTED_ERRORS]
+    ]
+    if len(errors) > MAX_REPORTED_ERRORS:
+        lines.append(f"... and {len(errors) - MAX_REPORTED_ERRORS} more")
+    return "\n".join(lines)
+
+
+def _all_or_nothing(
+    rows: Iterable[tuple], errors: list[tuple[int, str]]
+) -> Iterator[tuple]:
+    """Pass *rows* on until one is invalid and raise once all are checked."""
+    for row in rows:
+        if not errors:
+            yield row
+    if errors:
+        raise ValueError(format_errors(errors))
+
+
+def copy_vehicles(dsn: str, rows: Iterable[tuple]) -> int:
+    """Stream *rows* into ``vehicles`` with ``COPY`` in one transaction.
+
+    Returns the number of vehicles inserted. If *rows* raises, nothing is
+    committed.
+    """
+    count = 0
+    with db.connect(dsn) as conn:
+        try:
+            with conn.cursor() as cur:
+                with cur.copy(
+                    f"COPY vehicles ({', '.join(BULK_COLUMNS)}) FROM STDIN"
+                ) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                        count += 1
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    return count
+
+
 def build_arg_parser() -> argparse.ArgumentParser:
     """Return an argument parser configured for vehicle creation."""
     parser = argparse.ArgumentParser(description="Create a vehicle")
@@ -111,13 +306,36 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default="[]",
         help="JSON description of cargo",
     )
+    parser.add_argument(
+        "--from-file",
+        metavar="PATH",
+        help="Insert the vehicles listed in PATH, or stdin for '-', instead",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "csv"],
+        help="Format of --from-file; defaults to csv for *.csv, else jsonl",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only validate --from-file, without a database connection",
+    )
     return parser
 
 
 def main() -> None:
     parser = build_arg_parser()
     args = parser.parse_args()
-    db.parse_dsn(args)
+    if args.check and not args.from_file:
+        parser.error("--check requires --from-file")
+    # Checking a file never connects
+    if not args.check:
+        db.parse_dsn(args)
+
+    if args.from_file:
+        bulk_main(args)
+        return
 
     try:
         insert_vehicle(
@@ -134,5 +352,36 @@ def main() -> None:
     print("Inserted vehicle at", args.x, args.y)
 
 
+def bulk_main(args: argparse.Namespace) -> None:
+    """Insert the vehicles of ``--from-file`` and report the insert rate."""
+    fmt = args.format or ("csv" if args.from_file.endswith(".csv") else "jsonl")
+    if args.from_file == "-":
+        stream = contextlib.nullcontext(sys.stdin)
+    else:
+        try:
+            stream = open(args.from_file, newline="", encoding="utf-8")
+        except OSError as e:
+            raise SystemExit(f"Cannot read {args.from_file}: {e.strerror}") from e
+
+    errors: list[tuple[int, str]] = []
+    start = time.perf_counter()
+    try:
+        with stream as lines:
+            rows = _all_or_nothing(read_vehicles(lines, fmt, errors), errors)
+            if args.check:
+                count = sum(1 for _ in rows)
+            else:
+                count = copy_vehicles(args.dsn, rows)
+    except ValueError as e:
+        raise SystemExit(str(e)) from e
+    elapsed = time.perf_counter() - start
+
+    done = "Validated" if args.check else "Inserted"
+    print(
+        f"{done} {count} vehicles in {elapsed:.2f} seconds "
+        f"({count / elapsed:,.0f} rows/s)"
+    )
+
+
 if __name__ == "__main__":  # pragma: no cover - script execution
     main()
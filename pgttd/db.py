@@ -1,7 +1,27 @@
+"""Database connection helpers shared by the command line tools.
+
+Tools open connections with :func:`connect`, or through a
+:class:`ConnectionFactory` when they may hold connections for a long time.
+A factory built with ``pool=True`` draws them from a ``psycopg_pool`` pool.
+That caps the number of backends, checks a connection before lending it
+out, and keeps prepared statements on connections that outlive a single
+task. :func:`create_pool` and :func:`create_async_pool` build those pools
+directly. The pool needs the optional ``psycopg-pool`` package; install it
+with the ``pool`` extra.
+"""
+
 import argparse
+import json
 import os
+from typing import Any
 
 import psycopg
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+
+DEFAULT_POOL_MIN = 1
+DEFAULT_POOL_MAX = 4
+# Seconds to wait for a pooled connection before giving up
+POOL_TIMEOUT = 30.0
 
 
 def add_dsn_argument(parser: argparse.ArgumentParser) -> None:
@@ -14,6 +34,40 @@ def add_dsn_argument(parser: argparse.ArgumentParser) -> None:
     )
 
 
+def add_pool_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options read by :meth:`ConnectionFactory.from_args`."""
+    parser.add_argument(
+        "--pool",
+        action="store_true",
+        help="Draw connections from a pool (needs psycopg-pool)",
+    )
+    parser.add_argument(
+        "--pool-min",
+        type=int,
+        default=DEFAULT_POOL_MIN,
+        help="Connections the pool keeps open",
+    )
+    parser.add_argument(
+        "--pool-max",
+        type=int,
+        default=DEFAULT_POOL_MAX,
+        help="Most connections the pool opens",
+    )
+    parser.add_argument(
+        "--statement-timeout",
+        type=int,
+        default=None,
+        metavar="MS",
+        help="Cancel statements running longer than MS milliseconds",
+    )
+    parser.add_argument(
+        "--prepare-threshold",
+        type=int,
+        default=None,
+        help="Prepare a query after it has run this many times on a connection",
+    )
+
+
 def parse_dsn(args: argparse.Namespace) -> argparse.Namespace:
     """Validate that *args* contains a DSN."""
     if not args.dsn:
@@ -21,6 +75,196 @@ def parse_dsn(args: argparse.Namespace) -> argparse.Namespace:
     return args
 
 
+def load_config() -> dict[str, Any]:
+    """Return connection parameters from environment or config file.
+
+    A JSON file named by ``PGTTD_CONFIG`` wins over the standard ``PG*``
+    environment variables.
+    """
+    cfg_path = os.environ.get("PGTTD_CONFIG")
+    if cfg_path and os.path.exists(cfg_path):
+        with open(cfg_path, "r", encoding="utf8") as cfg:
+            try:
+                return json.load(cfg)
+            except json.JSONDecodeError as exc:
+                msg = f"Invalid JSON in config file '{cfg_path}': {exc.msg}"
+                raise RuntimeError(msg) from exc
+
+    pgport = os.environ.get("PGPORT", "5432")
+    try:
+        port = int(pgport)
+    except ValueError as exc:
+        raise RuntimeError(f"Invalid PGPORT value: {pgport}") from exc
+
+    return {
+        "host": os.environ.get("PGHOST", "localhost"),
+        "port": port,
+        "dbname": os.environ.get("PGDATABASE", "pgttd"),
+        "user": os.environ.get("PGUSER", "postgres"),
+        "password": os.environ.get("PGPASSWORD", ""),
+    }
+
+
+def conninfo(dsn: str | None = None) -> str:
+    """Return *dsn*, or a connection string built from :func:`load_config`."""
+    return dsn or make_conninfo(**load_config())
+
+
+def session_kwargs(
+    dsn: str,
+    statement_timeout: int | None = None,
+    prepare_threshold: int | None = None,
+    **kwargs,
+) -> dict[str, Any]:
+    """Return ``psycopg.connect`` keyword arguments for the session settings.
+
+    The statement timeout, in milliseconds, is sent as a startup option, so
+    it costs no extra round trip. It is added to any ``options`` already in
+    *dsn* or *kwargs*.
+    """
+    if statement_timeout is not None:
+        if statement_timeout < 0:
+            raise ValueError("--statement-timeout must not be negative")
+        options = kwargs.get("options") or conninfo_to_dict(dsn).get("options", "")
+        kwargs["options"] = f"{options} -c statement_timeout={statement_timeout}"
+        kwargs["options"] = kwargs["options"].strip()
+    if prepare_threshold is not None:
+        kwargs["prepare_threshold"] = prepare_threshold
+    return kwargs
+
+
 def connect(dsn: str, **kwargs) -> psycopg.Connection:
     """Return a psycopg connection using *dsn*."""
     return psycopg.connect(dsn, **kwargs)
+
+
+def _pool_args(min_size: int, max_size: int) -> None:
+    if min_size < 0 or max_size < max(1, min_size):
+        raise ValueError("--pool-max must be positive and at least --pool-min")
+
+
+def create_pool(
+    dsn: str,
+    min_size: int = DEFAULT_POOL_MIN,
+    max_size: int = DEFAULT_POOL_MAX,
+    statement_timeout: int | None = None,
+    prepare_threshold: int | None = None,
+    **kwargs,
+):
+    """Return an open ``psycopg_pool.ConnectionPool`` for *dsn*.
+
+    Connections are checked with a round trip before they are handed out,
+    and broken ones are replaced.
+    """
+    from psycopg_pool import ConnectionPool
+
+    _pool_args(min_size, max_size)
+    return ConnectionPool(
+        dsn,
+        min_size=min_size,
+        max_size=max_size,
+        kwargs=session_kwargs(dsn, statement_timeout, prepare_threshold, **kwargs),
+        check=ConnectionPool.check_connection,
+        timeout=POOL_TIMEOUT,
+        name="pgttd",
+        open=True,
+    )
+
+
+def create_async_pool(
+    dsn: str,
+    min_size: int = DEFAULT_POOL_MIN,
+    max_size: int = DEFAULT_POOL_MAX,
+    statement_timeout: int | None = None,
+    prepare_threshold: int | None = None,
+    **kwargs,
+):
+    """Return a ``psycopg_pool.AsyncConnectionPool`` for *dsn*.
+
+    The pool is not open yet: use it as ``async with`` or await its
+    ``open()``, since it starts tasks on the running event loop.
+    """
+    from psycopg_pool import AsyncConnectionPool
+
+    _pool_args(min_size, max_size)
+    return AsyncConnectionPool(
+        dsn,
+        min_size=min_size,
+        max_size=max_size,
+        kwargs=session_kwargs(dsn, statement_timeout, prepare_threshold, **kwargs),
+        check=AsyncConnectionPool.check_connection,
+        timeout=POOL_TIMEOUT,
+        name="pgttd",
+        open=False,
+    )
+
+
+class ConnectionFactory:
+    """Open connections to one database, either directly or from a pool.
+
+    Code that holds connections calls :meth:`connect` and hands each one
+    back with :meth:`release` instead of closing it, so the same code works
+    with and without a pool.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        pool: bool = False,
+        min_size: int = DEFAULT_POOL_MIN,
+        max_size: int = DEFAULT_POOL_MAX,
+        statement_timeout: int | None = None,
+        prepare_threshold: int | None = None,
+    ) -> None:
+        self.dsn = dsn
+        self.kwargs = session_kwargs(dsn, statement_timeout, prepare_threshold)
+        self.pool = None
+        if pool:
+            self.pool = create_pool(
+                dsn, min_size, max_size, statement_timeout, prepare_threshold
+            )
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "ConnectionFactory":
+        """Build a factory from the options of :func:`add_pool_arguments`."""
+        return cls(
+            args.dsn,
+            pool=args.pool,
+            min_size=args.pool_min,
+            max_size=args.pool_max,
+            statement_timeout=args.statement_timeout,
+            prepare_threshold=args.prepare_threshold,
+        )
+
+    @property
+    def max_size(self) -> int | None:
+        """Most connections that can be out at once, or ``None`` unpooled."""
+        return self.pool.max_size if self.pool is not None else None
+
+    def connect(self) -> psycopg.Connection:
+        """Return a connection, waiting for one if the pool is exhausted."""
+        if self.pool is not None:
+            return self.pool.getconn()
+        return connect(self.dsn, **self.kwargs)
+
+    def release(self, conn: psycopg.Connection) -> None:
+        """Give back a connection from :meth:`connect`.
+
+        Pooled connections are rolled back and reused, or replaced if
+        broken. Others are closed.
+        """
+        if self.pool is not None:
+            self.pool.putconn(conn)
+        else:
+            conn.close()
+
+    def close(self) -> None:
+        """Close the pool and every connection in it."""
+        if self.pool is not None:
+            self.pool.close()
+
+    def __enter__(self) -> "ConnectionFactory":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,159 @@
+"""Advance the game tick with vehicle movement sharded across connections.
+
+Vehicles are split into contiguous id ranges, one per worker connection, and
+each range is moved by ``move_vehicles(min_id, max_id)`` concurrently. The
+rest of the tick pipeline runs first through ``tick()`` on the first
+connection, with its ``move_vehicles`` stage skipped. The
+shards of a tick are committed only once every shard has succeeded, and the
+``tick()`` call that advances ``game_state.current_tick`` is committed last,
+so a tick number is only published after all of its movement is visible.
+Shard commits are not atomic with each other: if a commit fails part-way,
+vehicles in the shards already committed are one step ahead of the rest.
+Vehicles move independently of each other, so each one still moves at most
+once per tick. With ``--pool`` the worker connections come from a pool, whose
+``--pool-max`` must be at least ``--workers``.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg
+
+from . import db
+
+# tick() stages replaced by the sharded movement
+SKIP_STAGES = ["move_vehicles"]
+
+
+def id_ranges(min_id: int, max_id: int, workers: int) -> list[tuple[int, int]]:
+    """Split ids ``min_id..max_id`` into at most *workers* contiguous ranges."""
+    count = max_id - min_id + 1
+    workers = max(1, min(workers, count))
+    size, extra = divmod(count, workers)
+    ranges = []
+    start = min_id
+    for i in range(workers):
+        end = start + size - 1 + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def _move_shard(conn: psycopg.Connection, min_id: int, max_id: int) -> None:
+    with conn.cursor() as cur:
+        cur.execute("CALL move_vehicles(%s, %s)", (min_id, max_id))
+
+
+class ParallelTicker:
+    """Run ticks with vehicle movement spread over *workers* connections.
+
+    The first connection also calls ``tick()`` and looks up the id range to
+    split, so a single worker behaves like ``tick()`` in one transaction,
+    except that vehicles move after the other stages.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        workers: int = 1,
+        factory: db.ConnectionFactory | None = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("--workers must be positive")
+        self.factory = factory or db.ConnectionFactory(dsn)
+        if self.factory.max_size is not None and self.factory.max_size < workers:
+            raise ValueError("--pool-max must be at least --workers")
+        self.conns = [self.factory.connect() for _ in range(workers)]
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def tick(self, advance: bool = True) -> None:
+        """Run one tick and commit it, rolling every shard back on failure.
+
+        With ``advance=False`` only vehicles are moved and ``tick()`` is not
+        called, which is how the movement benchmark uses it.
+        """
+        main = self.conns[0]
+        try:
+            with main.cursor() as cur:
+                if advance:
+                    cur.execute("CALL tick(1, %s)", (SKIP_STAGES,))
+                cur.execute("SELECT min(id), max(id) FROM vehicles")
+                min_id, max_id = cur.fetchone()
+            if min_id is not None:
+                ranges = id_ranges(min_id, max_id, len(self.conns))
+                futures = [
+                    self.pool.submit(_move_shard, conn, lo, hi)
+                    for conn, (lo, hi) in zip(self.conns, ranges)
+                ]
+                for future in futures:
+                    future.result()
+        except BaseException:
+            for conn in self.conns:
+                conn.rollback()
+            raise
+
+        # Publish the tick counter only after every shard has committed
+        for conn in self.conns[1:]:
+            conn.commit()
+        main.commit()
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        for conn in self.conns:
+            self.factory.release(conn)
+
+    def __enter__(self) -> "ParallelTicker":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Return an argument parser configured for parallel ticks."""
+    parser = argparse.ArgumentParser(
+        description="Advance the game tick with sharded vehicle movement"
+    )
+    db.add_dsn_argument(parser)
+    db.add_pool_arguments(parser)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of connections moving vehicle shards concurrently",
+    )
+    parser.add_argument("--ticks", type=int, default=1, help="Number of ticks to run")
+    return parser
+
+
+def main() -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args()
+    db.parse_dsn(args)
+
+    try:
+        with db.ConnectionFactory.from_args(args) as factory, ParallelTicker(
+            args.dsn, args.workers, factory
+        ) as ticker:
+            start = time.perf_counter()
+            for _ in range(args.ticks):
+                ticker.tick()
+            elapsed = time.perf_counter() - start
+    except ValueError as e:
+        raise SystemExit(str(e)) from e
+    except psycopg.Error:  # pragma: no cover - simple CLI logging
+        logging.exception("parallel tick failed")
+        return 1
+
+    print(
+        f"Ran {args.ticks} ticks with {args.workers} workers in "
+        f"{elapsed:.2f} seconds ({elapsed / args.ticks:.3f} s/tick)"
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - script execution
+    sys.exit(main())
@@ -1,32 +1,82 @@
-"""Wrapper module to advance the game tick."""
+"""Wrapper module to advance the game tick.
+
+With ``--ticks N`` the game is fast-forwarded by ``N`` ticks in a single
+``fast_forward()`` call, which loops server-side and commits every
+``--commit-every`` ticks. ``--snapshot`` copies the named tables into
+``tick_snapshots`` after each of those commits.
+"""
 
 import argparse
 import logging
 import sys
+import time
 
 import psycopg
 
 from . import db
 
 
-def main() -> int:
-    """Call the ``tick`` stored procedure."""
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Return an argument parser configured for advancing ticks."""
     parser = argparse.ArgumentParser(description="Advance the game tick")
     db.add_dsn_argument(parser)
+    parser.add_argument("--ticks", type=int, default=1, help="Number of ticks to run")
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=1,
+        help="Ticks to run per transaction when fast-forwarding",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="append",
+        default=[],
+        metavar="TABLE",
+        help="Snapshot TABLE after every commit; may be repeated",
+    )
+    return parser
+
+
+def main() -> int:
+    """Call the ``tick`` stored procedure."""
+    parser = build_arg_parser()
     args, _ = parser.parse_known_args()
     db.parse_dsn(args)
+    if args.ticks < 1 or args.commit_every < 1:
+        raise SystemExit("--ticks and --commit-every must be positive")
 
-    with db.connect(args.dsn) as conn:
+    if args.ticks == 1 and not args.snapshot:
+        with db.connect(args.dsn) as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("CALL tick()")
+                conn.commit()
+                logging.info("tick() executed successfully")
+                return 0
+            except psycopg.Error:  # pragma: no cover - simple CLI logging
+                logging.exception("tick() execution failed")
+                conn.rollback()
+                return 1
+
+    # fast_forward() commits by itself, which needs an autocommit session
+    start = time.perf_counter()
+    with db.connect(args.dsn, autocommit=True) as conn:
         try:
             with conn.cursor() as cur:
-                cur.execute("CALL tick()")
-            conn.commit()
-            logging.info("tick() executed successfully")
-            return 0
+                cur.execute(
+                    "CALL fast_forward(%s, %s, %s)",
+                    (args.ticks, args.commit_every, args.snapshot),
+                )
         except psycopg.Error:  # pragma: no cover - simple CLI logging
-            logging.exception("tick() execution failed")
-            conn.rollback()
+            logging.exception("fast_forward() execution failed")
             return 1
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Ran {args.ticks} ticks in {elapsed:.2f} seconds "
+        f"({args.ticks / elapsed:,.0f} ticks/s)"
+    )
+    return 0
 
 
 if __name__ == "__main__":  # pragma: no cover - script execution
@@ -0,0 +1,476 @@
+"""Run the tick pipeline in process on NumPy arrays.
+
+:func:`load` reads resources, industries, vehicles and companies into arrays
+and :meth:`World.step` applies the same rules as ``economy_tick()``,
+``move_vehicles()`` and ``update_balances()``, so long runs and parameter
+sweeps need no database round trip per tick. :meth:`World.save` writes the
+final state back with ``COPY``.
+
+The world is a snapshot: schedules, industries, flow fields and the rows of
+``industry_outputs`` and ``vehicle_operations`` stay as they were loaded.
+Resource amounts are kept as floats rounded to the six decimals of
+``resources.amount``, so they can differ from the database in the last
+decimal place. Requires NumPy (``pip install pgttd[sim]``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import psycopg
+
+from . import db
+
+# tick_stages the simulation knows how to run, in their default order
+STAGES = [
+    "economy_tick",
+    "refresh_flow_fields",
+    "move_vehicles",
+    "update_balances",
+    "evict_routes",
+    "prune_tick_stats",
+]
+
+
+def _trunc6(values: np.ndarray) -> np.ndarray:
+    """Truncate towards zero at six decimals, as ``trunc(x::numeric, 6)``."""
+    # Round off float noise first; the numeric cast keeps 15 digits
+    return np.trunc(np.round(values * 1e6, 3)) / 1e6
+
+
+def industry_levels(rows: Iterable[tuple[int, int, bool, int]]) -> dict[int, int]:
+    """Return the chain level of each industry, as ``refresh_industry_plan()``.
+
+    *rows* are ``(industry_id, resource_id, is_input, per_tick)`` tuples from
+    ``resource_industry_io``.
+    """
+    inputs: dict[int, set[int]] = {}
+    producers: dict[int, set[int]] = {}
+    for industry, resource, is_input, _ in rows:
+        inputs.setdefault(industry, set())
+        if is_input:
+            inputs[industry].add(resource)
+        else:
+            producers.setdefault(resource, set()).add(industry)
+
+    levels: dict[int, int] = {}
+    unplaced = set(inputs)
+    level = 0
+    while unplaced:
+        ready = {
+            i
+            for i in unplaced
+            if not any((producers.get(r, set()) - {i}) & unplaced for r in inputs[i])
+        }
+        if not ready:
+            # Production cycles share the final level
+            ready = unplaced
+        for i in ready:
+            levels[i] = level
+        unplaced -= ready
+        level += 1
+    return levels
+
+
+@dataclass
+class _Level:
+    """Industry flows of one chain level, indexed for vectorised ticks."""
+
+    in_resource: np.ndarray
+    in_per_tick: np.ndarray
+    in_starts: np.ndarray
+    in_industry: np.ndarray
+    industries: int
+    resource: np.ndarray
+    industry: np.ndarray
+    signed_per_tick: np.ndarray
+
+
+class Economy:
+    """Resource stocks, their growth rules and the industry plan."""
+
+    def __init__(
+        self,
+        resources: Iterable[tuple[int, float]],
+        rules: Iterable[tuple[int, int, int]] = (),
+        flows: Iterable[tuple[int, int, bool, int]] = (),
+    ) -> None:
+        resources = list(resources)
+        self.ids = np.array([r[0] for r in resources], dtype=np.int64)
+        self.amount = np.array([float(r[1]) for r in resources], dtype=np.float64)
+        self._index = {rid: i for i, rid in enumerate(self.ids.tolist())}
+
+        self.growth = np.zeros(len(self.ids))
+        for resource, growth, decay in rules:
+            self.growth[self._index[resource]] = growth - decay
+
+        flows = list(flows)
+        levels = industry_levels(flows)
+        self.levels = [
+            self._build_level([f for f in flows if levels[f[0]] == level])
+            for level in sorted(set(levels.values()))
+        ]
+
+    def _build_level(self, flows: list[tuple[int, int, bool, int]]) -> _Level:
+        local = {i: n for n, i in enumerate(sorted({f[0] for f in flows}))}
+        inputs = sorted(
+            (local[i], self._index[r], q) for i, r, is_input, q in flows if is_input
+        )
+        in_industry = np.array([i for i, _, _ in inputs], dtype=np.int64)
+        starts = np.flatnonzero(np.diff(in_industry, prepend=-1))
+        return _Level(
+            in_resource=np.array([r for _, r, _ in inputs], dtype=np.int64),
+            in_per_tick=np.array([q for _, _, q in inputs], dtype=np.float64),
+            in_starts=starts,
+            in_industry=in_industry[starts],
+            industries=len(local),
+            resource=np.array([self._index[f[1]] for f in flows], dtype=np.int64),
+            industry=np.array([local[f[0]] for f in flows], dtype=np.int64),
+            signed_per_tick=np.array(
+                [-f[3] if f[2] else f[3] for f in flows], dtype=np.float64
+            ),
+        )
+
+    def step(self) -> None:
+        """Apply one ``economy_tick()``."""
+        size = len(self.amount)
+        np.maximum(0.0, self.amount + self.growth, out=self.amount)
+        for level in self.levels:
+            # Industries without inputs never run
+            rate = np.zeros(level.industries)
+            if len(level.in_resource):
+                demand = np.bincount(
+                    level.in_resource, weights=level.in_per_tick, minlength=size
+                )[level.in_resource]
+                # An input nobody asks any of does not limit the rate
+                share = np.ones(len(demand))
+                np.divide(
+                    self.amount[level.in_resource],
+                    demand,
+                    out=share,
+                    where=demand > 0,
+                )
+                np.minimum(share, 1.0, out=share)
+                rate[level.in_industry] = np.minimum.reduceat(share, level.in_starts)
+            delta = np.bincount(
+                level.resource,
+                weights=rate[level.industry] * level.signed_per_tick,
+                minlength=size,
+            )
+            self.amount = np.round(np.maximum(0.0, self.amount + _trunc6(delta)), 6)
+
+
+class Fleet:
+    """Vehicle positions, their unpacked schedules and built flow fields."""
+
+    def __init__(
+        self,
+        vehicles: Iterable[tuple[int, int, int, int, list[int], list[int]]],
+        flow_fields: Iterable[tuple[int, int, int, int, int, int]] = (),
+    ) -> None:
+        """*vehicles* are ``(id, x, y, schedule_idx, schedule_x, schedule_y)``.
+
+        *flow_fields* are the ``(dest_x, dest_y, tile_x, tile_y, next_x,
+        next_y)`` rows of the fields built for the current terrain.
+        """
+        vehicles = list(vehicles)
+        self.ids = np.array([v[0] for v in vehicles], dtype=np.int64)
+        self.x = np.array([v[1] for v in vehicles], dtype=np.int64)
+        self.y = np.array([v[2] for v in vehicles], dtype=np.int64)
+        self.idx = np.array([v[3] for v in vehicles], dtype=np.int64)
+
+        lengths = np.array([len(v[4]) for v in vehicles], dtype=np.int64)
+        self.active = np.flatnonzero(lengths > 0)
+        self.sched_len = lengths[self.active]
+        self.sched_start = (np.cumsum(lengths) - lengths)[self.active]
+        self.sched_x = np.array([p for v in vehicles for p in v[4]], dtype=np.int64)
+        self.sched_y = np.array([p for v in vehicles for p in v[5]], dtype=np.int64)
+
+        fields = sorted(
+            (self._key(dx, dy, tx, ty), nx, ny)
+            for dx, dy, tx, ty, nx, ny in flow_fields
+        )
+        self.field_keys = np.array([f[0] for f in fields], dtype=np.int64)
+        self.field_x = np.array([f[1] for f in fields], dtype=np.int64)
+        self.field_y = np.array([f[2] for f in fields], dtype=np.int64)
+
+    @staticmethod
+    def _key(*coords):
+        # Pack coordinates below 32768 into one sortable 64 bit integer
+        key = 0
+        for c in coords:
+            key = key * 65536 + c
+        return key
+
+    @staticmethod
+    def _lookup(keys: np.ndarray, wanted: np.ndarray) -> np.ndarray:
+        """Return positions of *wanted* in sorted *keys*, or -1 if absent."""
+        if not len(keys):
+            return np.full(len(wanted), -1)
+        pos = np.searchsorted(keys, wanted).clip(max=len(keys) - 1)
+        return np.where(keys[pos] == wanted, pos, -1)
+
+    def step(self) -> None:
+        """Apply one ``move_vehicles()``."""
+        if not len(self.active):
+            return
+        x = self.x[self.active]
+        y = self.y[self.active]
+        idx = self.idx[self.active]
+        idx = np.where((idx < 0) | (idx >= self.sched_len), 0, idx)
+        tx = self.sched_x[self.sched_start + idx]
+        ty = self.sched_y[self.sched_start + idx]
+        arrived = (x == tx) & (y == ty)
+
+        # Step straight towards the target, x first, then y
+        new_x = x + np.sign(tx - x)
+        new_y = np.where(x == tx, y + np.sign(ty - y), y)
+
+        # Follow the flow field from the tiles it covers
+        keys = ((tx * 65536 + ty) * 65536 + x) * 65536 + y
+        pos = self._lookup(self.field_keys, keys)
+        hit = pos >= 0
+        new_x[hit] = self.field_x[pos[hit]]
+        new_y[hit] = self.field_y[pos[hit]]
+
+        self.x[self.active] = np.where(arrived, x, new_x)
+        self.y[self.active] = np.where(arrived, y, new_y)
+        self.idx[self.active] = np.where(arrived, (idx + 1) % self.sched_len, idx)
+
+
+class Ledger:
+    """Company balances and the per-tick activity that feeds them."""
+
+    def __init__(
+        self,
+        companies: Iterable[tuple[int, int, int, int]],
+        outputs: Iterable[tuple[int, int]] = (),
+        operations: Iterable[tuple[int, int, int]] = (),
+    ) -> None:
+        """*companies* are ``(id, cash, income, expenses)``; *outputs* and
+        *operations* are ``industry_outputs`` and ``vehicle_operations`` rows
+        without their ids."""
+        companies = list(companies)
+        self.ids = np.array([c[0] for c in companies], dtype=np.int64)
+        self.cash = np.array([c[1] for c in companies], dtype=np.int64)
+        self.income = np.array([c[2] for c in companies], dtype=np.int64)
+        self.expenses = np.array([c[3] for c in companies], dtype=np.int64)
+
+        index = {cid: i for i, cid in enumerate(self.ids.tolist())}
+        self.tick_income = np.zeros(len(self.ids), dtype=np.int64)
+        self.tick_expenses = np.zeros(len(self.ids), dtype=np.int64)
+        for company, value in outputs:
+            self.tick_income[index[company]] += value
+        for company, revenue, cost in operations:
+            self.tick_income[index[company]] += revenue
+            self.tick_expenses[index[company]] += cost
+
+    def step(self) -> None:
+        """Apply one ``update_balances()``."""
+        self.income[:] = self.tick_income
+        self.expenses[:] = self.tick_expenses
+        self.cash += self.tick_income - self.tick_expenses
+
+
+class World:
+    """Economy, fleet and ledger advanced together by the tick pipeline."""
+
+    def __init__(
+        self,
+        economy: Economy,
+        fleet: Fleet,
+        ledger: Ledger,
+        tick: int = 0,
+        stages: Iterable[str] = ("economy_tick", "move_vehicles", "update_balances"),
+    ) -> None:
+        self.economy = economy
+        self.fleet = fleet
+        self.ledger = ledger
+        self.tick = tick
+        steps = {
+            "economy_tick": economy.step,
+            "move_vehicles": fleet.step,
+            "update_balances": ledger.step,
+        }
+        # Flow fields are loaded already built, leaving nothing to refresh,
+        # and there is no route cache to evict from or tick_stats to prune
+        self._steps = [steps[s] for s in stages if s in steps]
+
+    def step(self) -> None:
+        """Run one tick of the enabled stages."""
+        self.tick += 1
+        for step in self._steps:
+            step()
+
+    def run(self, ticks: int) -> None:
+        """Run *ticks* ticks."""
+        for _ in range(ticks):
+            self.step()
+
+    def save(self, conn: psycopg.Connection) -> None:
+        """Write the state back to the database with ``COPY``.
+
+        The caller commits.
+        """
+        tables = [
+            (
+                "resources",
+                "amount NUMERIC",
+                zip(self.economy.ids.tolist(), self.economy.amount.tolist()),
+                "amount = s.amount",
+            ),
+            (
+                "vehicles",
+                "x INTEGER, y INTEGER, schedule_idx INTEGER",
+                zip(
+                    self.fleet.ids.tolist(),
+                    self.fleet.x.tolist(),
+                    self.fleet.y.tolist(),
+                    self.fleet.idx.tolist(),
+                ),
+                "x = s.x, y = s.y, schedule_idx = s.schedule_idx",
+            ),
+            (
+                "companies",
+                "cash INTEGER, income INTEGER, expenses INTEGER",
+                zip(
+                    self.ledger.ids.tolist(),
+                    self.ledger.cash.tolist(),
+                    self.ledger.income.tolist(),
+                    self.ledger.expenses.tolist(),
+                ),
+                "cash = s.cash, income = s.income, expenses = s.expenses",
+            ),
+        ]
+        with conn.cursor() as cur:
+            for table, columns, rows, assignments in tables:
+                staging = f"sim_{table}"
+                cur.execute(
+                    f"CREATE TEMP TABLE {staging} (id INTEGER, {columns}) "
+                    "ON COMMIT DROP"
+                )
+                with cur.copy(f"COPY {staging} FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                cur.execute(
+                    f"UPDATE {table} t SET {assignments} "
+                    f"FROM {staging} s WHERE t.id = s.id"
+                )
+            cur.execute("UPDATE game_state SET current_tick = %s", (self.tick,))
+
+
+def load(conn: psycopg.Connection) -> World:
+    """Read the current game into a :class:`World`.
+
+    Raises ``ValueError`` if an enabled tick stage cannot be simulated.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT array_position(%s::text[], name) FROM tick_stages "
+            "WHERE enabled ORDER BY position",
+            (STAGES,),
+        )
+        positions = [row[0] for row in cur.fetchall()]
+        if None in positions:
+            cur.execute(
+                "SELECT string_agg(name, ', ') FROM tick_stages "
+                "WHERE enabled AND name <> ALL (%s)",
+                (STAGES,),
+            )
+            raise ValueError(f"cannot simulate tick stages: {cur.fetchone()[0]}")
+        stages = [STAGES[p - 1] for p in positions]
+        if "refresh_flow_fields" in stages:
+            cur.execute(
+                "SELECT count(*) FROM flow_field_destinations "
+                "WHERE terrain_version IS DISTINCT FROM "
+                "(SELECT terrain_version FROM game_state ORDER BY id LIMIT 1)"
+            )
+            if cur.fetchone()[0]:
+                raise ValueError(
+                    "flow fields are waiting to be built; "
+                    "run refresh_flow_fields() first"
+                )
+
+        cur.execute("SELECT id, amount FROM resources ORDER BY id")
+        resources = cur.fetchall()
+        cur.execute("SELECT resource_id, growth_rate, decay_rate FROM resource_rules")
+        rules = cur.fetchall()
+        cur.execute(
+            "SELECT industry_id, resource_id, is_input, per_tick "
+            "FROM resource_industry_io"
+        )
+        economy = Economy(resources, rules, cur.fetchall())
+
+        cur.execute(
+            "SELECT id, x, y, schedule_idx, schedule_x, schedule_y "
+            "FROM vehicles ORDER BY id"
+        )
+        vehicles = cur.fetchall()
+        cur.execute(
+            "SELECT f.dest_x, f.dest_y, f.tile_x, f.tile_y, f.next_x, f.next_y "
+            "FROM flow_fields f JOIN flow_field_destinations d "
+            "USING (dest_x, dest_y) WHERE d.terrain_version = "
+            "(SELECT terrain_version FROM game_state ORDER BY id LIMIT 1)"
+        )
+        fleet = Fleet(vehicles, cur.fetchall())
+
+        cur.execute("SELECT id, cash, income, expenses FROM companies ORDER BY id")
+        companies = cur.fetchall()
+        cur.execute("SELECT company_id, value FROM industry_outputs")
+        outputs = cur.fetchall()
+        cur.execute("SELECT company_id, revenue, cost FROM vehicle_operations")
+        ledger = Ledger(companies, outputs, cur.fetchall())
+
+        cur.execute("SELECT current_tick FROM game_state ORDER BY id LIMIT 1")
+        row = cur.fetchone()
+    return World(economy, fleet, ledger, row[0] if row else 0, stages)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Simulate ticks in process")
+    db.add_dsn_argument(parser)
+    parser.add_argument(
+        "--ticks", type=int, default=1000, help="Number of ticks to simulate"
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Write the final state back to the database",
+    )
+    args = parser.parse_args()
+    db.parse_dsn(args)
+    if args.ticks < 1:
+        raise SystemExit("--ticks must be positive")
+
+    with db.connect(args.dsn) as conn:
+        try:
+            world = load(conn)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        start = time.perf_counter()
+        world.run(args.ticks)
+        elapsed = time.perf_counter() - start
+        if args.save:
+            try:
+                world.save(conn)
+                conn.commit()
+            except psycopg.Error:  # pragma: no cover - simple CLI logging
+                logging.exception("Saving the simulated state failed")
+                conn.rollback()
+                return 1
+
+    print(
+        f"Simulated {args.ticks} ticks in {elapsed:.2f} seconds "
+        f"({args.ticks / elapsed:,.0f} ticks/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - script execution
+    sys.exit(main())
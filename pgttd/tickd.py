@@ -0,0 +1,225 @@
+"""Long-running tick service.
+
+``python -m pgttd.tickd`` keeps one connection open and calls ``tick()`` as a
+prepared statement, either at a fixed ``--rate`` or back to back. When ticks
+overrun their slots the daemon either runs the missed ticks straight away
+(``--behind catch-up``) or drops them and waits for the next slot
+(``--behind skip``). Tick latency percentiles are logged every
+``--report-every`` ticks. SIGTERM and SIGINT stop the daemon once the tick
+in flight has committed. With ``--pool`` the connection comes from a pool
+that checks it before use, and ``--statement-timeout`` bounds each tick.
+"""
+
+import argparse
+import logging
+import math
+import signal
+import sys
+import threading
+import time
+
+import psycopg
+
+from . import db
+
+log = logging.getLogger(__name__)
+
+TICK_SQL = "CALL tick()"
+RECONNECT_DELAY = 1.0
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the nearest-rank *pct* percentile of *values*."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def next_deadline(
+    deadline: float, now: float, period: float, behind: str
+) -> tuple[float, int]:
+    """Return when the next tick is due and how many ticks were skipped.
+
+    *deadline* is when the tick that just ran was due. With ``"catch-up"``
+    the next tick is simply one period later, even if that is already past.
+    With ``"skip"`` any slots that have already passed are dropped.
+    """
+    deadline += period
+    if behind == "skip" and period > 0 and now > deadline:
+        skipped = math.ceil((now - deadline) / period)
+        return deadline + skipped * period, skipped
+    return deadline, 0
+
+
+class TickDaemon:
+    """Call ``tick()`` repeatedly on one connection until stopped."""
+
+    def __init__(
+        self,
+        dsn: str,
+        rate: float = 0.0,
+        behind: str = "catch-up",
+        report_every: int = 100,
+        factory: db.ConnectionFactory | None = None,
+    ) -> None:
+        if rate < 0:
+            raise ValueError("--rate must not be negative")
+        if report_every < 1:
+            raise ValueError("--report-every must be positive")
+        self.dsn = dsn
+        self.factory = factory or db.ConnectionFactory(dsn)
+        self.period = 1.0 / rate if rate else 0.0
+        self.behind = behind
+        self.report_every = report_every
+        self.stopping = threading.Event()
+        self.latencies: list[float] = []
+        self.skipped = 0
+
+    def stop(self, *_args) -> None:
+        """Ask the daemon to stop after the tick in flight; a signal handler."""
+        self.stopping.set()
+
+    def report(self) -> None:
+        """Log latency percentiles for the ticks since the last report."""
+        if not self.latencies:
+            return
+        ms = [latency * 1000 for latency in self.latencies]
+        log.info(
+            "%d ticks: p50 %.1f ms, p90 %.1f ms, p99 %.1f ms, max %.1f ms, "
+            "%d skipped",
+            len(ms),
+            percentile(ms, 50),
+            percentile(ms, 90),
+            percentile(ms, 99),
+            max(ms),
+            self.skipped,
+        )
+        self.latencies = []
+        self.skipped = 0
+
+    def run(self, max_ticks: int | None = None) -> int:
+        """Run ticks until stopped or *max_ticks* have committed.
+
+        Returns the number of ticks committed. A lost connection, one that is
+        closed or broken, is re-established after a short delay; any other
+        database error, including a cancelled tick, is raised after rolling
+        back.
+        """
+        conn = None
+        ticks = 0
+        deadline = time.monotonic()
+        try:
+            while not self.stopping.is_set():
+                if max_ticks is not None and ticks >= max_ticks:
+                    break
+                start = time.monotonic()
+                try:
+                    if conn is None:
+                        conn = self.factory.connect()
+                    with conn.cursor() as cur:
+                        cur.execute(TICK_SQL, prepare=True)
+                    conn.commit()
+                except psycopg.OperationalError:
+                    # Cancelled (statement_timeout) and deadlocked ticks are
+                    # OperationalErrors too, but leave the connection usable
+                    if conn is not None and not (conn.closed or conn.broken):
+                        conn.rollback()
+                        raise
+                    log.exception("connection lost, reconnecting")
+                    if conn is not None:
+                        self.factory.release(conn)
+                    conn = None
+                    self.stopping.wait(RECONNECT_DELAY)
+                    deadline = time.monotonic()
+                    continue
+                except psycopg.Error:
+                    if conn is not None:
+                        conn.rollback()
+                    raise
+                end = time.monotonic()
+
+                ticks += 1
+                self.latencies.append(end - start)
+                if len(self.latencies) >= self.report_every:
+                    self.report()
+
+                if self.period:
+                    deadline, skipped = next_deadline(
+                        deadline, end, self.period, self.behind
+                    )
+                    self.skipped += skipped
+                    # Returns early when a stop is requested
+                    self.stopping.wait(max(0.0, deadline - end))
+        finally:
+            self.report()
+            if conn is not None:
+                self.factory.release(conn)
+        return ticks
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Return an argument parser configured for the tick daemon."""
+    parser = argparse.ArgumentParser(description="Run game ticks continuously")
+    db.add_dsn_argument(parser)
+    db.add_pool_arguments(parser)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="Target ticks per second; 0 runs ticks back to back",
+    )
+    parser.add_argument(
+        "--behind",
+        choices=("catch-up", "skip"),
+        default="catch-up",
+        help="Run missed ticks immediately or skip them when behind",
+    )
+    parser.add_argument(
+        "--report-every",
+        type=int,
+        default=100,
+        help="Log latency percentiles every N ticks",
+    )
+    parser.add_argument(
+        "--max-ticks",
+        type=int,
+        default=None,
+        help="Stop after N ticks instead of running until signalled",
+    )
+    return parser
+
+
+def main() -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args()
+    db.parse_dsn(args)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+
+    try:
+        factory = db.ConnectionFactory.from_args(args)
+    except ValueError as e:
+        raise SystemExit(str(e)) from e
+
+    with factory:
+        try:
+            daemon = TickDaemon(
+                args.dsn, args.rate, args.behind, args.report_every, factory
+            )
+        except ValueError as e:
+            raise SystemExit(str(e)) from e
+        signal.signal(signal.SIGTERM, daemon.stop)
+        signal.signal(signal.SIGINT, daemon.stop)
+
+        try:
+            ticks = daemon.run(args.max_ticks)
+        except psycopg.Error:  # pragma: no cover - simple CLI logging
+            log.exception("tick() execution failed")
+            return 1
+    log.info("stopped after %d ticks", ticks)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - script execution
+    sys.exit(main())
@@ -6,26 +6,70 @@ and the associated sprite information. Tiles are rendered in a curses window
 using simple color pairs. After each render pass a `tick()` stored procedure is
 called to advance the simulation.
 
+The full map is fetched once on startup. Subsequent refreshes only request the
+tiles whose ``updated_tick`` is at or after the last tick the viewer saw and
+repaint just those cells. A full resync happens when the viewer falls too far
+behind, when the world is reset, or when the terminal is resized.
+
+Vehicles are drawn over the tiles. Each frame looks up the vehicles in view
+with ``vehicles_in_rect()`` from ``sql/procs/spatial.sql``, which reads only
+the vehicles near the viewport.
+
+With ``--frame`` each refresh instead calls ``render_frame()`` from
+``sql/procs/frame.sql``, which returns every visible cell with vehicles and
+industries already drawn over the tiles. A frame then costs one query whose
+size follows the viewport, and only the cells that differ are repainted.
+``--packed`` fetches the same frame from ``render_frame_packed()`` as one
+byte string of glyph and palette planes and paints it without building a
+:class:`Tile` per cell.
+
+Sprites are loaded once into a :class:`SpriteAtlas` and tiles are fetched as
+sprite ids, without joining ``sprites``. The atlas is reloaded when
+``game_state.sprite_version`` moves, which is read with the current tick.
+
+Only the tiles inside the visible viewport plus a prefetch margin are loaded.
+The viewport pans with the arrow keys or ``h``/``j``/``k``/``l`` and the region
+around it is prefetched on a background connection so panning does not stall.
+
 Connection information is read from standard PostgreSQL environment variables
 (`PGHOST`, `PGPORT`, `PGDATABASE`, `PGUSER`, `PGPASSWORD`) or from a JSON
 configuration file referenced via the ``PGTTD_CONFIG`` environment variable.
 Command line arguments can override these settings and also provide a DSN
-connection string.
+connection string. The viewer and its prefetcher share the connection options
+of the other tools, including ``--pool``.
+
+With ``--async`` the viewer runs on :class:`pgttd.aio.AsyncClient` instead.
+Input handling, drawing and ticking are separate asyncio tasks and each
+query borrows its own pooled connection. A slow tick then no longer stalls
+the frames or the keyboard.
 """
 from __future__ import annotations
 
 import argparse
-import json
-import os
+import asyncio
+import struct
 import time
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Any, Callable, Iterable
 
 import curses
 import psycopg
 
 import pgttd.db as db
+from pgttd.aio import (
+    CURRENT_TICK_SQL,
+    FRAME_SQL,
+    GAME_STATE_SQL,
+    PACKED_FRAME_SQL,
+    SPRITES_SQL,
+    TILE_REGION,
+    TILE_SPRITES_SQL,
+    TILES_SQL,
+    AsyncClient,
+)
+from pgttd.db import load_config  # noqa: F401 - kept for existing imports
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +88,103 @@ class Tile:
     color: str
 
 
+@dataclass(frozen=True)
+class Sprite:
+    """Glyph, color and PNG image of one sprite."""
+
+    ch: str
+    color: str
+    image: bytes
+
+
+# Drawn for tiles whose sprite is not in the atlas
+MISSING_SPRITE = Sprite("?", "white", b"")
+
+
+class SpriteAtlas:
+    """Sprites by id, kept until ``game_state.sprite_version`` moves."""
+
+    def __init__(self) -> None:
+        self.sprites: dict[int, Sprite] = {}
+        self.version: int | None = None
+
+    def update(self, rows: Iterable[tuple], version: int) -> None:
+        """Replace the sprites with ``(id, glyph, color, image)`` rows."""
+
+        self.sprites = {
+            sprite_id: Sprite(ch, (color or "white").lower(), bytes(image))
+            for sprite_id, ch, color, image in rows
+        }
+        self.version = version
+
+    def sync(self, conn, version: int) -> bool:
+        """Reload the sprites unless they are at *version*.
+
+        Returns ``True`` if they were reloaded, so tiles already drawn may
+        show old sprites.
+        """
+
+        if version == self.version:
+            return False
+        with conn.cursor() as cur:
+            cur.execute(SPRITES_SQL)
+            self.update(cur, version)
+        return True
+
+    def tiles(self, rows: Iterable[tuple]) -> Iterable[Tile]:
+        """Yield a :class:`Tile` for each ``(x, y, sprite_id)`` row."""
+
+        sprites = self.sprites
+        for x, y, sprite_id in rows:
+            sprite = sprites.get(sprite_id, MISSING_SPRITE)
+            yield Tile(x, y, sprite.ch, sprite.color)
+
+
+@dataclass(frozen=True)
+class Viewport:
+    """Rectangular window of map tiles with its top-left corner at ``x``/``y``."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @property
+    def x_max(self) -> int:
+        return self.x + self.width - 1
+
+    @property
+    def y_max(self) -> int:
+        return self.y + self.height - 1
+
+    def contains(self, other: Viewport) -> bool:
+        """Return ``True`` if *other* lies entirely within this viewport."""
+
+        return (
+            self.x <= other.x
+            and self.y <= other.y
+            and other.x_max <= self.x_max
+            and other.y_max <= self.y_max
+        )
+
+    def expand(self, margin: int) -> Viewport:
+        """Return the viewport grown by *margin* tiles on every side."""
+
+        x = max(0, self.x - margin)
+        y = max(0, self.y - margin)
+        return Viewport(x, y, self.x_max + margin - x + 1, self.y_max + margin - y + 1)
+
+    def pan(self, dx: int, dy: int) -> Viewport:
+        """Return the viewport shifted by ``dx``/``dy`` without going negative."""
+
+        return Viewport(
+            max(0, self.x + dx), max(0, self.y + dy), self.width, self.height
+        )
+
+    def resize(self, width: int, height: int) -> Viewport:
+        return Viewport(self.x, self.y, width, height)
+
+
 COLOR_NAMES = {
     "black": curses.COLOR_BLACK,
     "red": curses.COLOR_RED,
@@ -56,45 +197,126 @@ COLOR_NAMES = {
 }
 
 
-def load_config() -> dict[str, str]:
-    """Return connection parameters from environment or config file."""
+# How vehicles are drawn over their tile
+VEHICLE_GLYPH = "@"
+VEHICLE_COLOR = "yellow"
 
-    cfg_path = os.environ.get("PGTTD_CONFIG")
-    if cfg_path and os.path.exists(cfg_path):
-        with open(cfg_path, "r", encoding="utf8") as cfg:
-            try:
-                return json.load(cfg)
-            except json.JSONDecodeError as exc:
-                msg = f"Invalid JSON in config file '{cfg_path}': {exc.msg}"
-                raise RuntimeError(msg) from exc
+# Layout of render_frame_packed(): width, height and flags, then the planes
+FRAME_HEADER = struct.Struct(">HHB")
+FRAME_RLE = 1
+# Colors of the palette plane by index, as frame_palette() in the database
+FRAME_PALETTE = (
+    "black",
+    "red",
+    "green",
+    "yellow",
+    "blue",
+    "magenta",
+    "cyan",
+    "white",
+)
 
-    pgport = os.environ.get("PGPORT", "5432")
-    try:
-        port = int(pgport)
-    except ValueError as exc:
-        raise RuntimeError(f"Invalid PGPORT value: {pgport}") from exc
-
-    return {
-        "host": os.environ.get("PGHOST", "localhost"),
-        "port": port,
-        "dbname": os.environ.get("PGDATABASE", "pgttd"),
-        "user": os.environ.get("PGUSER", "postgres"),
-        "password": os.environ.get("PGPASSWORD", ""),
-    }
-
-
-def fetch_tiles(conn) -> Iterable[Tile]:
-    """Retrieve the current tile set from the database."""
-
-    sql = (
-        "SELECT t.x, t.y, s.glyph, s.color FROM tiles t "
-        "JOIN sprites s ON t.sprite_id = s.id "
-        "ORDER BY t.y, t.x"
-    )
+
+def region_params(region: Viewport) -> tuple[int, int, int, int]:
+    """Return the parameters for :data:`pgttd.aio.TILE_REGION`."""
+
+    return (region.x, region.x_max, region.y, region.y_max)
+
+
+def fetch_tiles(
+    conn, region: Viewport | None = None, atlas: SpriteAtlas | None = None
+) -> Iterable[Tile]:
+    """Retrieve the current tile set, optionally restricted to *region*.
+
+    With an *atlas* only sprite ids are fetched and looked up in it.
+    """
+
+    sql = TILES_SQL if atlas is None else TILE_SPRITES_SQL
     with conn.cursor() as cur:
-        cur.execute(sql)
-        for x, y, ch, color in cur:
-            yield Tile(x, y, ch, color or "white")
+        if region is None:
+            cur.execute(f"{sql} ORDER BY t.y, t.x")
+        else:
+            cur.execute(
+                f"{sql} WHERE {TILE_REGION} ORDER BY t.y, t.x",
+                region_params(region),
+            )
+        yield from tiles_from_rows(cur) if atlas is None else atlas.tiles(cur)
+
+
+def tiles_from_rows(rows: Iterable[tuple]) -> Iterable[Tile]:
+    """Yield a :class:`Tile` for each ``(x, y, glyph, color)`` row."""
+
+    for x, y, ch, color in rows:
+        yield Tile(x, y, ch, color or "white")
+
+
+def fetch_current_tick(conn) -> int:
+    """Return the current game tick."""
+
+    with conn.cursor() as cur:
+        cur.execute(CURRENT_TICK_SQL)
+        row = cur.fetchone()
+    return row[0] if row and row[0] is not None else 0
+
+
+def fetch_game_state(conn) -> tuple[int, int]:
+    """Return the current game tick and sprite version."""
+
+    with conn.cursor() as cur:
+        cur.execute(GAME_STATE_SQL)
+        row = cur.fetchone()
+    if not row:
+        return 0, 0
+    return row[0] or 0, row[1]
+
+
+def fetch_changed_tiles(
+    conn,
+    since_tick: int,
+    region: Viewport | None = None,
+    atlas: SpriteAtlas | None = None,
+) -> Iterable[Tile]:
+    """Retrieve tiles modified at or after *since_tick*, optionally in *region*.
+
+    With an *atlas* only sprite ids are fetched and looked up in it.
+    """
+
+    tiles = TILES_SQL if atlas is None else TILE_SPRITES_SQL
+    sql = f"{tiles} WHERE t.updated_tick >= %s"
+    params: tuple[int, ...] = (since_tick,)
+    if region is not None:
+        sql += f" AND {TILE_REGION}"
+        params += region_params(region)
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        yield from tiles_from_rows(cur) if atlas is None else atlas.tiles(cur)
+
+
+def fetch_vehicle_positions(conn, region: Viewport) -> set[tuple[int, int]]:
+    """Return the tiles inside *region* that hold at least one vehicle."""
+
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT DISTINCT x, y FROM vehicles_in_rect(%s, %s, %s, %s)",
+            region_params(region),
+        )
+        return {(x, y) for x, y in cur}
+
+
+def fetch_frame(conn, region: Viewport) -> Iterable[Tile]:
+    """Retrieve the composed cells of *region* from ``render_frame()``."""
+
+    with conn.cursor() as cur:
+        cur.execute(FRAME_SQL, region_params(region))
+        yield from tiles_from_rows(cur)
+
+
+def fetch_packed_frame(conn, region: Viewport, rle: bool = False) -> bytes:
+    """Return *region* packed by ``render_frame_packed()``."""
+
+    with conn.cursor() as cur:
+        cur.execute(PACKED_FRAME_SQL, region_params(region) + (rle,))
+        return bytes(cur.fetchone()[0])
 
 
 def advance_tick(conn) -> None:
@@ -109,6 +331,70 @@ def advance_tick(conn) -> None:
             raise
 
 
+class Prefetcher:
+    """Load tile regions on a background thread using a dedicated connection."""
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        release: Callable[[Any], None] | None = None,
+        atlas: SpriteAtlas | None = None,
+    ):
+        self._connect = connect
+        self._release = release
+        self._atlas = atlas
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future: Future | None = None
+        self.region: Viewport | None = None
+
+    def _fetch(self, region: Viewport) -> tuple[int, list[Tile]]:
+        if self._conn is None:
+            self._conn = self._connect()
+        tick = fetch_current_tick(self._conn)
+        tiles = list(fetch_tiles(self._conn, region, self._atlas))
+        self._conn.commit()
+        return tick, tiles
+
+    def covers(self, view: Viewport) -> bool:
+        """Return ``True`` if an in-flight fetch will contain *view*."""
+
+        return (
+            self._future is not None
+            and self.region is not None
+            and self.region.contains(view)
+        )
+
+    def request(self, region: Viewport) -> None:
+        """Start loading *region* unless a fetch is already in flight."""
+
+        if self._future is not None:
+            return
+        self.region = region
+        self._future = self._executor.submit(self._fetch, region)
+
+    def result(self, wait: bool = False) -> tuple[Viewport, int, list[Tile]] | None:
+        """Return ``(region, tick, tiles)`` of a finished fetch, if any."""
+
+        if self._future is None or (not wait and not self._future.done()):
+            return None
+        future, self._future = self._future, None
+        try:
+            tick, tiles = future.result()
+        except psycopg.Error:
+            logger.exception("Failed to prefetch tiles")
+            return None
+        return self.region, tick, tiles
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self._conn is not None:
+            if self._release is not None:
+                self._release(self._conn)
+            else:
+                self._conn.close()
+
+
 # ---------------------------------------------------------------------------
 # Rendering
 # ---------------------------------------------------------------------------
@@ -131,8 +417,29 @@ def color_pair(color: str, cache: dict[str, int] | None = None) -> int:
     return curses.color_pair(cache[color])
 
 
+def draw_tile(
+    stdscr, tile: Tile, color_cache: dict[str, int], view: Viewport | None
+) -> None:
+    """Draw *tile* at its position relative to *view*."""
+
+    x, y = tile.x, tile.y
+    if view is not None:
+        x -= view.x
+        y -= view.y
+        if not (0 <= x < view.width and 0 <= y < view.height):
+            return
+    try:
+        stdscr.addch(y, x, tile.ch, color_pair(tile.color, color_cache))
+    except curses.error:
+        # Ignore tiles outside the screen.
+        pass
+
+
 def render(
-    stdscr, tiles: Iterable[Tile], color_cache: dict[str, int] | None = None
+    stdscr,
+    tiles: Iterable[Tile],
+    color_cache: dict[str, int] | None = None,
+    view: Viewport | None = None,
 ) -> None:
     """Render tiles onto the curses screen."""
 
@@ -140,12 +447,394 @@ def render(
         color_cache = COLOR_CACHE
     stdscr.erase()
     for tile in tiles:
+        draw_tile(stdscr, tile, color_cache, view)
+    stdscr.refresh()
+
+
+def track(tiles: Iterable[Tile], grid: dict[tuple[int, int], Tile]) -> Iterable[Tile]:
+    """Yield *tiles* unchanged while recording each one in *grid*."""
+
+    for tile in tiles:
+        grid[(tile.x, tile.y)] = tile
+        yield tile
+
+
+def render_changes(
+    stdscr,
+    tiles: Iterable[Tile],
+    grid: dict[tuple[int, int], Tile],
+    color_cache: dict[str, int] | None = None,
+    view: Viewport | None = None,
+) -> int:
+    """Repaint only the cells whose tile differs from *grid*.
+
+    Returns the number of changed tiles.
+    """
+
+    if color_cache is None:
+        color_cache = COLOR_CACHE
+    drawn = 0
+    for tile in tiles:
+        key = (tile.x, tile.y)
+        if grid.get(key) == tile:
+            continue
+        grid[key] = tile
+        drawn += 1
+        draw_tile(stdscr, tile, color_cache, view)
+    if drawn:
+        stdscr.refresh()
+    return drawn
+
+
+def render_vehicles(
+    stdscr,
+    positions: set[tuple[int, int]],
+    previous: set[tuple[int, int]],
+    grid: dict[tuple[int, int], Tile],
+    color_cache: dict[str, int] | None = None,
+    view: Viewport | None = None,
+) -> set[tuple[int, int]]:
+    """Draw vehicles at *positions* over the tiles.
+
+    Tiles in *previous* that no vehicle holds any more are repainted from
+    *grid*. Every vehicle is drawn again, since a tile repaint may have
+    covered it. Returns *positions*, to pass as *previous* next frame.
+    """
+
+    if color_cache is None:
+        color_cache = COLOR_CACHE
+    for key in previous - positions:
+        tile = grid.get(key)
+        if tile is not None:
+            draw_tile(stdscr, tile, color_cache, view)
+    for x, y in positions:
+        draw_tile(stdscr, Tile(x, y, VEHICLE_GLYPH, VEHICLE_COLOR), color_cache, view)
+    if positions or previous:
+        stdscr.refresh()
+    return positions
+
+
+def decode_frame(data: bytes) -> tuple[int, int, bytes, bytes]:
+    """Return the width, height, glyph plane and palette plane of *data*.
+
+    *data* is a frame from ``render_frame_packed()``; run-length encoded
+    planes are expanded.
+    """
+
+    width, height, flags = FRAME_HEADER.unpack_from(data)
+    body = memoryview(data)[FRAME_HEADER.size :]
+    if flags & FRAME_RLE:
+        planes = b"".join(
+            bytes((value,)) * count for count, value in zip(body[::2], body[1::2])
+        )
+    else:
+        planes = bytes(body)
+    cells = width * height
+    if len(planes) != 2 * cells:
+        raise ValueError(
+            f"Packed frame of {width}x{height} cells has {len(planes)} bytes "
+            f"of planes, expected {2 * cells}"
+        )
+    return width, height, planes[:cells], planes[cells:]
+
+
+def paint_frame(
+    stdscr,
+    data: bytes,
+    previous: bytes | None = None,
+    color_cache: dict[str, int] | None = None,
+) -> bytes:
+    """Paint a frame from ``render_frame_packed()`` at the screen origin.
+
+    With the planes of the *previous* frame only cells that differ are
+    painted, otherwise the screen is cleared first. Returns the planes, to
+    pass as *previous* next frame.
+    """
+
+    width, height, glyphs, colors = decode_frame(data)
+    planes = glyphs + colors
+    if planes == previous:
+        return planes
+    pairs = [color_pair(color, color_cache) for color in FRAME_PALETTE]
+    cells = width * height
+    if previous is None or len(previous) != 2 * cells:
+        stdscr.erase()
+        previous = None
+    for i in range(cells):
+        glyph = glyphs[i]
+        if previous is not None:
+            if glyph == previous[i] and colors[i] == previous[cells + i]:
+                continue
+            if not glyph:
+                glyph = ord(" ")
+        elif not glyph:
+            continue
         try:
-            stdscr.addch(tile.y, tile.x, tile.ch, color_pair(tile.color, color_cache))
+            stdscr.addch(i // width, i % width, glyph, pairs[colors[i] & 7])
         except curses.error:
-            # Ignore tiles outside the screen.
+            # Ignore cells outside the screen.
             pass
     stdscr.refresh()
+    return planes
+
+
+def needs_resync(last_tick: int | None, current_tick: int, max_lag: int) -> bool:
+    """Return ``True`` if the local grid can no longer be patched incrementally."""
+
+    if last_tick is None or current_tick < last_tick:
+        return True
+    return max_lag > 0 and current_tick - last_tick > max_lag
+
+
+PAN_KEYS = {
+    curses.KEY_LEFT: (-1, 0),
+    curses.KEY_RIGHT: (1, 0),
+    curses.KEY_UP: (0, -1),
+    curses.KEY_DOWN: (0, 1),
+    ord("h"): (-1, 0),
+    ord("l"): (1, 0),
+    ord("k"): (0, -1),
+    ord("j"): (0, 1),
+}
+
+
+def screen_viewport(stdscr, view: Viewport) -> Viewport:
+    """Return *view* resized to the current terminal dimensions."""
+
+    height, width = stdscr.getmaxyx()
+    return view.resize(width, height)
+
+
+# ---------------------------------------------------------------------------
+# Asyncio mode
+# ---------------------------------------------------------------------------
+
+
+# Seconds between keyboard polls; curses has no awaitable input
+INPUT_POLL = 0.02
+
+
+async def wait_for(event: asyncio.Event, timeout: float | None) -> bool:
+    """Wait until *event* is set or *timeout* passes; return whether it was set."""
+
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+class AsyncViewer:
+    """Draw, read keys and tick concurrently through an :class:`AsyncClient`.
+
+    Each activity is its own task. Frames are drawn every *refresh* seconds,
+    or as soon as the view pans, whatever a tick in flight is doing.
+    """
+
+    def __init__(
+        self,
+        stdscr,
+        client: AsyncClient,
+        refresh: float,
+        step: bool,
+        max_lag: int = 100,
+        margin: int = 32,
+        pan_step: int = 4,
+        frame: bool = False,
+        packed: str | None = None,
+    ):
+        self.stdscr = stdscr
+        self.client = client
+        self.refresh = refresh
+        self.step = step
+        self.max_lag = max_lag
+        self.margin = margin
+        self.pan_step = pan_step
+        self.frame = frame
+        self.packed = packed
+        self.view = screen_viewport(stdscr, Viewport(0, 0, 0, 0))
+        self.resized = True
+        self.moved = asyncio.Event()
+        self.tick_requested = asyncio.Event()
+        self.frames = 0
+        self.ticks = 0
+
+    async def read_keys(self) -> None:
+        """Handle key presses until ``q`` is pressed."""
+
+        while True:
+            ch = self.stdscr.getch()
+            if ch == -1:
+                await asyncio.sleep(INPUT_POLL)
+            elif ch == ord("q"):
+                return
+            elif ch == curses.KEY_RESIZE:
+                self.view = screen_viewport(self.stdscr, self.view)
+                self.resized = True
+                self.moved.set()
+            elif ch in PAN_KEYS:
+                dx, dy = PAN_KEYS[ch]
+                self.view = self.view.pan(dx * self.pan_step, dy * self.pan_step)
+                self.moved.set()
+            elif ch == ord("t"):
+                self.tick_requested.set()
+
+    async def run_ticks(self) -> None:
+        """Advance the game until a tick fails."""
+
+        while True:
+            if self.step:
+                await self.tick_requested.wait()
+                self.tick_requested.clear()
+            try:
+                await self.client.tick()
+            except psycopg.Error:
+                logger.exception("Tick advancement failed; exiting viewer")
+                return
+            self.ticks += 1
+            if not self.step:
+                await asyncio.sleep(self.refresh)
+
+    async def draw_frames(self) -> None:
+        """Keep the screen in step with the database."""
+
+        if self.packed:
+            await self.draw_packed_frames()
+            return
+        if self.frame:
+            await self.draw_composed_frames()
+            return
+        grid: dict[tuple[int, int], Tile] = {}
+        vehicles: set[tuple[int, int]] = set()
+        atlas = SpriteAtlas()
+        last_tick: int | None = None
+        loaded: Viewport | None = None
+        while True:
+            current_tick, sprite_version = await self.client.game_state()
+            if sprite_version != atlas.version:
+                atlas.update(await self.client.fetch_sprites(), sprite_version)
+                last_tick = None
+            view = self.view
+            redraw = self.moved.is_set()
+            self.moved.clear()
+            if (
+                self.resized
+                or needs_resync(last_tick, current_tick, self.max_lag)
+                or loaded is None
+                or not loaded.contains(view)
+            ):
+                self.resized = False
+                loaded = view.expand(self.margin)
+                rows, moving = await asyncio.gather(
+                    self.client.fetch_tiles(region_params(loaded), sprite_ids=True),
+                    self.client.fetch_vehicles(region_params(view)),
+                )
+                grid.clear()
+                render(self.stdscr, track(atlas.tiles(rows), grid), COLOR_CACHE, view)
+            else:
+                if redraw:
+                    render(self.stdscr, grid.values(), COLOR_CACHE, view)
+                rows, moving = await asyncio.gather(
+                    self.client.fetch_changed_tiles(
+                        last_tick, region_params(loaded), sprite_ids=True
+                    ),
+                    self.client.fetch_vehicles(region_params(view)),
+                )
+                render_changes(self.stdscr, atlas.tiles(rows), grid, COLOR_CACHE, view)
+            vehicles = render_vehicles(
+                self.stdscr,
+                {(x, y) for _, x, y, _ in moving},
+                vehicles,
+                grid,
+                COLOR_CACHE,
+                view,
+            )
+            last_tick = current_tick
+            self.frames += 1
+            await wait_for(self.moved, self.refresh)
+
+    async def draw_composed_frames(self) -> None:
+        """Draw each frame from one ``render_frame()`` query."""
+
+        grid: dict[tuple[int, int], Tile] = {}
+        while True:
+            view = self.view
+            redraw = self.resized or self.moved.is_set()
+            self.resized = False
+            self.moved.clear()
+            rows = await self.client.fetch_frame(region_params(view))
+            if redraw:
+                grid.clear()
+                render(
+                    self.stdscr, track(tiles_from_rows(rows), grid), COLOR_CACHE, view
+                )
+            else:
+                render_changes(
+                    self.stdscr, tiles_from_rows(rows), grid, COLOR_CACHE, view
+                )
+            self.frames += 1
+            await wait_for(self.moved, self.refresh)
+
+    async def draw_packed_frames(self) -> None:
+        """Paint each frame from one ``render_frame_packed()`` query."""
+
+        planes: bytes | None = None
+        while True:
+            view = self.view
+            redraw = self.resized or self.moved.is_set()
+            self.resized = False
+            self.moved.clear()
+            data = await self.client.fetch_packed_frame(
+                region_params(view), self.packed == "rle"
+            )
+            planes = paint_frame(
+                self.stdscr, data, None if redraw else planes, COLOR_CACHE
+            )
+            self.frames += 1
+            await wait_for(self.moved, self.refresh)
+
+    async def run(self) -> None:
+        """Run until ``q`` is pressed or a task stops, then cancel the rest."""
+
+        tasks = [
+            asyncio.create_task(coro)
+            for coro in (self.read_keys(), self.run_ticks(), self.draw_frames())
+        ]
+        finished, pending = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in finished:
+            task.result()
+
+
+async def async_main(
+    stdscr,
+    dsn: str,
+    refresh: float,
+    step: bool,
+    max_lag: int = 100,
+    margin: int = 32,
+    pan_step: int = 4,
+    frame: bool = False,
+    packed: str | None = None,
+    **pool_kwargs,
+) -> None:
+    """Render the simulation with :class:`AsyncViewer`.
+
+    *pool_kwargs* go to :meth:`AsyncClient.open`.
+    """
+
+    curses.curs_set(0)
+    stdscr.nodelay(True)
+    stdscr.keypad(True)
+    async with await AsyncClient.open(dsn, **pool_kwargs) as client:
+        viewer = AsyncViewer(
+            stdscr, client, refresh, step, max_lag, margin, pan_step, frame, packed
+        )
+        await viewer.run()
 
 
 # ---------------------------------------------------------------------------
@@ -153,23 +842,123 @@ def render(
 # ---------------------------------------------------------------------------
 
 
-def main(stdscr, dsn: str | None, refresh: float, step: bool) -> None:
-    """Render the simulation in a curses window."""
+def main(
+    stdscr,
+    connections: db.ConnectionFactory,
+    refresh: float,
+    step: bool,
+    full_refresh: bool = False,
+    max_lag: int = 100,
+    margin: int = 32,
+    pan_step: int = 4,
+    frame: bool = False,
+    packed: str | None = None,
+) -> None:
+    """Render the simulation in a curses window.
+
+    *packed* is ``"raw"`` or ``"rle"`` to draw packed frames.
+    """
 
     curses.curs_set(0)
     stdscr.nodelay(True)
-    if dsn:
-        conn = db.connect(dsn)
-    else:
-        config = load_config()
-        conn = psycopg.connect(**config)
+    stdscr.keypad(True)
+
+    conn = connections.connect()
+    atlas = SpriteAtlas()
+    prefetcher = Prefetcher(connections.connect, connections.release, atlas)
+    grid: dict[tuple[int, int], Tile] = {}
+    vehicles: set[tuple[int, int]] = set()
+    last_tick: int | None = None
+    view = screen_viewport(stdscr, Viewport(0, 0, 0, 0))
+    loaded: Viewport | None = None
+    planes: bytes | None = None
+    redraw = False
     try:
         while True:
-            tiles = fetch_tiles(conn)
-            render(stdscr, tiles, color_cache=COLOR_CACHE)
+            if packed:
+                planes = paint_frame(
+                    stdscr,
+                    fetch_packed_frame(conn, view, packed == "rle"),
+                    None if redraw else planes,
+                    COLOR_CACHE,
+                )
+                redraw = False
+            elif frame:
+                if redraw or not grid:
+                    grid.clear()
+                    render(
+                        stdscr, track(fetch_frame(conn, view), grid), COLOR_CACHE, view
+                    )
+                else:
+                    render_changes(
+                        stdscr, fetch_frame(conn, view), grid, COLOR_CACHE, view
+                    )
+                redraw = False
+            elif full_refresh:
+                atlas.sync(conn, fetch_game_state(conn)[1])
+                render(stdscr, fetch_tiles(conn, view, atlas), COLOR_CACHE, view)
+            else:
+                current_tick, sprite_version = fetch_game_state(conn)
+                if atlas.sync(conn, sprite_version):
+                    # Tiles on screen or in flight may show the old sprites
+                    last_tick = None
+                    prefetcher.result(wait=True)
+                fetched = prefetcher.result(wait=prefetcher.covers(view))
+                if fetched is not None and last_tick is not None:
+                    region, tick, tiles = fetched
+                    if region.contains(view):
+                        loaded = region
+                        grid.clear()
+                        grid.update(((t.x, t.y), t) for t in tiles)
+                        last_tick = min(last_tick, tick)
+                        redraw = True
+                if (
+                    needs_resync(last_tick, current_tick, max_lag)
+                    or loaded is None
+                    or not loaded.contains(view)
+                ):
+                    loaded = view.expand(margin)
+                    grid.clear()
+                    render(
+                        stdscr,
+                        track(fetch_tiles(conn, loaded, atlas), grid),
+                        COLOR_CACHE,
+                        view,
+                    )
+                else:
+                    if redraw:
+                        render(stdscr, grid.values(), COLOR_CACHE, view)
+                    render_changes(
+                        stdscr,
+                        fetch_changed_tiles(conn, last_tick, loaded, atlas),
+                        grid,
+                        COLOR_CACHE,
+                        view,
+                    )
+                redraw = False
+                last_tick = current_tick
+                if not loaded.contains(view.expand(margin // 2)):
+                    prefetcher.request(view.expand(margin))
+            if not (frame or packed):
+                vehicles = render_vehicles(
+                    stdscr,
+                    fetch_vehicle_positions(conn, view),
+                    vehicles,
+                    grid,
+                    COLOR_CACHE,
+                    view,
+                )
             ch = stdscr.getch()
             if ch == ord("q"):
                 break
+            if ch == curses.KEY_RESIZE:
+                last_tick = None
+                view = screen_viewport(stdscr, view)
+                redraw = True
+            if ch in PAN_KEYS:
+                dx, dy = PAN_KEYS[ch]
+                view = view.pan(dx * pan_step, dy * pan_step)
+                redraw = True
             if not step or ch == ord("t"):
                 try:
                     advance_tick(conn)
@@ -178,13 +967,15 @@ def main(stdscr, dsn: str | None, refresh: float, step: bool) -> None:
                     break
             time.sleep(refresh)
     finally:
-        conn.close()
+        prefetcher.close()
+        connections.release(conn)
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     parser = argparse.ArgumentParser(description=__doc__)
     db.add_dsn_argument(parser)
+    db.add_pool_arguments(parser)
     parser.add_argument(
         "--refresh",
         type=float,
@@ -196,10 +987,82 @@ if __name__ == "__main__":
         action="store_true",
         help="advance simulation only when 't' is pressed",
     )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="refetch and repaint the whole map on every refresh",
+    )
+    parser.add_argument(
+        "--max-lag",
+        type=int,
+        default=100,
+        help="resync the whole map after falling this many ticks behind",
+    )
+    parser.add_argument(
+        "--margin",
+        type=int,
+        default=32,
+        help="tiles to prefetch around the viewport",
+    )
+    parser.add_argument(
+        "--pan-step",
+        type=int,
+        default=4,
+        help="tiles to pan per arrow/hjkl key press",
+    )
+    parser.add_argument(
+        "--frame",
+        action="store_true",
+        help="draw each frame from one render_frame() query",
+    )
+    parser.add_argument(
+        "--packed",
+        nargs="?",
+        const="raw",
+        choices=["raw", "rle"],
+        help="draw each frame from one render_frame_packed() byte string, "
+        "run-length encoded with 'rle'",
+    )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="draw, read keys and tick concurrently on separate connections",
+    )
     args = parser.parse_args()
-    try:
-        db.parse_dsn(args)
-        dsn = args.dsn
-    except RuntimeError:
-        dsn = None
-    curses.wrapper(main, dsn, args.refresh, args.step)
+    # Without a DSN, connect with the environment or PGTTD_CONFIG settings
+    args.dsn = db.conninfo(args.dsn)
+    if args.use_async:
+        curses.wrapper(
+            lambda stdscr: asyncio.run(
+                async_main(
+                    stdscr,
+                    args.dsn,
+                    args.refresh,
+                    args.step,
+                    args.max_lag,
+                    args.margin,
+                    args.pan_step,
+                    args.frame,
+                    args.packed,
+                    # One connection each for the tick and the frame queries
+                    max_size=max(2, args.pool_max),
+                    statement_timeout=args.statement_timeout,
+                    prepare_threshold=args.prepare_threshold,
+                )
+            )
+        )
+    else:
+        with db.ConnectionFactory.from_args(args) as connections:
+            curses.wrapper(
+                main,
+                connections,
+                args.refresh,
+                args.step,
+                args.full_refresh,
+                args.max_lag,
+                args.margin,
+                args.pan_step,
+                args.frame,
+                args.packed,
+            )
@@ -0,0 +1,124 @@
+"""Benchmark the economy_tick stored procedure.
+
+The script replaces the economy tables with a layered production chain: the
+resources are split into tiers and every industry turns one or two resources
+of a tier into one or two resources of the next, so that many industries
+compete for each input. It then times ``SELECT economy_tick()`` over a number
+of ticks, each committed separately, after timing how long
+``refresh_industry_plan()`` takes to order the industries. It requires a running PostgreSQL database.
+"""
+
+import argparse
+import time
+
+import pgttd.db as db
+
+POPULATE_SQL = [
+    """
+    INSERT INTO resources (name, amount)
+    SELECT 'resource ' || i, 1000 FROM generate_series(1, %(resources)s) AS i
+    """,
+    """
+    INSERT INTO resource_rules (resource_id, growth_rate, decay_rate)
+    SELECT id, CASE WHEN id <= %(tier)s THEN 50 ELSE 0 END, 1
+    FROM resources
+    """,
+    """
+    -- Industry i reads from tier t and writes to tier t + 1
+    INSERT INTO resource_industries (
+        name, input_resource_id, output_resource_id,
+        input_per_tick, output_per_tick
+    )
+    SELECT 'industry ' || i,
+           t * %(tier)s + 1 + (i::bigint * 7919) %% %(tier)s,
+           (t + 1) * %(tier)s + 1 + (i::bigint * 104729) %% %(tier)s,
+           1 + i %% 5,
+           1 + i %% 3
+    FROM generate_series(1, %(industries)s) AS i,
+         LATERAL (SELECT i %% (%(tiers)s - 1) AS t) AS tier
+    """,
+    """
+    -- Every third industry also needs a second input and makes a byproduct
+    INSERT INTO resource_industry_flows
+        (industry_id, resource_id, is_input, per_tick)
+    SELECT id, input_resource_id - 1 + (CASE WHEN
+               (input_resource_id - 1) %% %(tier)s = 0 THEN %(tier)s ELSE 0
+           END), true, 2
+    FROM resource_industries
+    WHERE id %% 3 = 0
+    UNION ALL
+    SELECT id, output_resource_id - 1 + (CASE WHEN
+               (output_resource_id - 1) %% %(tier)s = 0 THEN %(tier)s ELSE 0
+           END), false, 1
+    FROM resource_industries
+    WHERE id %% 3 = 0
+    """,
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark economy_tick")
+    db.add_dsn_argument(parser)
+    parser.add_argument(
+        "--resources", type=int, default=10000, help="Number of resources"
+    )
+    parser.add_argument(
+        "--industries", type=int, default=50000, help="Number of industries"
+    )
+    parser.add_argument(
+        "--tiers", type=int, default=5, help="Number of production chain tiers"
+    )
+    parser.add_argument("--ticks", type=int, default=5, help="Number of ticks to time")
+    args = parser.parse_args()
+    db.parse_dsn(args)
+    if args.tiers < 2:
+        raise SystemExit("--tiers must be at least 2")
+
+    params = {
+        "resources": args.resources,
+        "industries": args.industries,
+        "tiers": args.tiers,
+        "tier": args.resources // args.tiers,
+    }
+
+    with db.connect(args.dsn) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "TRUNCATE resources, resource_rules, resource_industries, "
+                "resource_industry_flows RESTART IDENTITY CASCADE"
+            )
+            for sql in POPULATE_SQL:
+                cur.execute(sql, params)
+            conn.commit()
+            conn.autocommit = True
+            cur.execute("VACUUM ANALYZE resources, resource_industries")
+            conn.autocommit = False
+
+            start = time.perf_counter()
+            cur.execute("SELECT refresh_industry_plan()")
+            levels = cur.fetchone()[0]
+            cur.execute("ANALYZE resource_industry_plan")
+            conn.commit()
+            planned = time.perf_counter() - start
+
+            elapsed = 0.0
+            for _ in range(args.ticks):
+                start = time.perf_counter()
+                cur.execute("SELECT economy_tick()")
+                conn.commit()
+                elapsed += time.perf_counter() - start
+
+    ticks = args.ticks
+    print(
+        f"Planned {args.industries} industries into {levels} chain levels "
+        f"in {planned:.2f} seconds"
+    )
+    print(
+        f"Ran {ticks} economy ticks over {args.resources} resources in "
+        f"{elapsed:.2f} seconds ({elapsed / ticks * 1000:.0f} ms/tick, "
+        f"{args.industries * ticks / elapsed:,.0f} industries/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark the ways the curses viewer can fetch a frame.
+
+For a square region the script times, in milliseconds per frame:
+
+* ``fetch_tiles()``, one :class:`~renderer.cli_viewer.Tile` per tile;
+* ``fetch_frame()``, the same for the composed cells of ``render_frame()``;
+* ``fetch_packed_frame()`` plus ``decode_frame()``, raw and run-length
+  encoded, which build no per-cell objects.
+
+Each is reported as elapsed time and as the CPU time of this process, which
+leaves out the time the database spends on the query. Packed frames also
+report their size in bytes. Painting is left out, as it needs a terminal.
+It requires a running PostgreSQL database with the viewer's sprites and
+``sql/procs/spatial.sql`` and ``sql/procs/frame.sql`` loaded.
+"""
+
+import argparse
+import time
+
+import pgttd.db as db
+from renderer.cli_viewer import (
+    Viewport,
+    decode_frame,
+    fetch_frame,
+    fetch_packed_frame,
+    fetch_tiles,
+)
+
+
+def _time(frames: int, func) -> tuple[float, float]:
+    """Return the mean elapsed and CPU milliseconds of calling *func*."""
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(frames):
+        func()
+    cpu = time.process_time() - cpu_start
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / frames, cpu * 1000 / frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark frame fetching")
+    db.add_dsn_argument(parser)
+    parser.add_argument("--size", type=int, default=256, help="Region width and height")
+    parser.add_argument("--frames", type=int, default=10, help="Frames to time")
+    args = parser.parse_args()
+    db.parse_dsn(args)
+
+    region = Viewport(0, 0, args.size, args.size)
+    with db.connect(args.dsn) as conn:
+        raw = fetch_packed_frame(conn, region)
+        rle = fetch_packed_frame(conn, region, rle=True)
+        for name, func in [
+            ("fetch_tiles", lambda: list(fetch_tiles(conn, region))),
+            ("fetch_frame", lambda: list(fetch_frame(conn, region))),
+            (
+                "packed",
+                lambda: decode_frame(fetch_packed_frame(conn, region)),
+            ),
+            (
+                "packed rle",
+                lambda: decode_frame(fetch_packed_frame(conn, region, rle=True)),
+            ),
+        ]:
+            elapsed, cpu = _time(args.frames, func)
+            print(f"{name:<12} {elapsed:>9.1f} ms/frame {cpu:>9.1f} ms client CPU")
+        print(f"Packed frame {len(raw):,} bytes, run-length encoded {len(rle):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 """Benchmark the move_vehicles stored procedure.
 
 The script inserts a configurable number of vehicles and measures the
-execution time of ``CALL move_vehicles()``. It requires a running
-PostgreSQL database.
+execution time of ``CALL move_vehicles()`` over a number of ticks, each
+committed separately. For every tick it also reports the WAL generated and,
+with a single worker, the vehicle tuples written and how many of those were
+HOT updates. With ``--workers`` above one the movement is sharded across
+connections by :class:`pgttd.parallel_tick.ParallelTicker`. It requires a
+running PostgreSQL database.
 """
 
 import argparse
@@ -10,6 +14,16 @@ import json
 import time
 
 import pgttd.db as db
+from pgttd.parallel_tick import ParallelTicker
+
+STATS_SQL = """
+    SELECT
+        n_tup_upd,
+        n_tup_hot_upd,
+        pg_wal_lsn_diff(pg_current_wal_insert_lsn(), '0/0')::bigint
+    FROM pg_stat_xact_user_tables
+    WHERE relid = 'vehicles'::regclass
+"""
 
 
 def main() -> None:
@@ -21,28 +35,98 @@ def main() -> None:
         default=100000,
         help="Number of vehicles to insert",
     )
+    parser.add_argument(
+        "--ticks",
+        type=int,
+        default=5,
+        help="Number of ticks to time",
+    )
+    parser.add_argument(
+        "--idle",
+        type=float,
+        default=0.0,
+        help="Fraction of vehicles parked on their only waypoint",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of connections moving vehicle shards concurrently",
+    )
     args = parser.parse_args()
     db.parse_dsn(args)
 
     schedule = [{"x": 100, "y": 0}]
+    idle = int(args.count * args.idle)
 
     with db.connect(args.dsn) as conn:
         with conn.cursor() as cur:
             cur.execute("TRUNCATE vehicles")
             cur.execute(
                 "INSERT INTO vehicles (x, y, schedule) "
-                "SELECT 0, 0, %s::jsonb FROM generate_series(1, %s)",
-                (json.dumps(schedule), args.count),
+                "SELECT CASE WHEN i <= %s THEN 100 ELSE 0 END, 0, %s::jsonb "
+                "FROM generate_series(1, %s) AS i",
+                (idle, json.dumps(schedule), args.count),
             )
             conn.commit()
+            conn.autocommit = True
+            cur.execute("VACUUM ANALYZE vehicles")
+            conn.autocommit = False
 
-        start = time.perf_counter()
-        with conn.cursor() as cur:
-            cur.execute("CALL move_vehicles()")
-        conn.commit()
-        elapsed = time.perf_counter() - start
+        if args.workers > 1:
+            with ParallelTicker(args.dsn, args.workers) as ticker:
+                with conn.cursor() as cur:
+                    cur.execute(STATS_SQL)
+                    wal_start = cur.fetchone()[2]
+                conn.commit()
+                start = time.perf_counter()
+                for _ in range(args.ticks):
+                    ticker.tick(advance=False)
+                elapsed = time.perf_counter() - start
+                with conn.cursor() as cur:
+                    cur.execute(STATS_SQL)
+                    wal = cur.fetchone()[2] - wal_start
+            report(args, elapsed, wal)
+            return
+
+        elapsed = 0.0
+        tuples = hot = wal = 0
+        for _ in range(args.ticks):
+            with conn.cursor() as cur:
+                # The xact counters can include unflushed earlier
+                # transactions, so take the difference across the call
+                cur.execute(STATS_SQL)
+                upd_start, hot_start, wal_start = cur.fetchone()
+                start = time.perf_counter()
+                cur.execute("CALL move_vehicles()")
+                elapsed += time.perf_counter() - start
+                cur.execute(STATS_SQL)
+                upd_end, hot_end, wal_end = cur.fetchone()
+            conn.commit()
+            tuples += upd_end - upd_start
+            hot += hot_end - hot_start
+            wal += wal_end - wal_start
+
+    report(args, elapsed, wal, tuples, hot)
 
-    print(f"Moved {args.count} vehicles in {elapsed:.2f} seconds")
+
+def report(
+    args: argparse.Namespace,
+    elapsed: float,
+    wal: int,
+    tuples: int | None = None,
+    hot: int | None = None,
+) -> None:
+    ticks = args.ticks
+    print(
+        f"Moved {args.count} vehicles for {ticks} ticks with {args.workers} "
+        f"workers in {elapsed:.2f} seconds ({elapsed / ticks:.3f} s/tick, "
+        f"{args.count * ticks / elapsed:,.0f} vehicles/s)"
+    )
+    written = ""
+    if tuples is not None:
+        written = f"{tuples / ticks:.0f} tuples written ({hot / ticks:.0f} HOT), "
+    print(f"Per tick: {written}{wal / ticks / 1024:.0f} KiB WAL")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""Benchmark the find_route pathfinding function.
+
+The script fills the ``terrain`` table with square grids of the requested
+sizes, crossed by a water wall with a single gap, and times a corner-to-corner
+``find_route()`` call on each. With ``--legacy`` the original temp-table
+implementation from ``sql/procs/pathfinding_legacy.sql`` is timed as well.
+It requires a running PostgreSQL database with the pathfinding functions
+loaded.
+"""
+
+import argparse
+import time
+
+import psycopg
+
+import pgttd.db as db
+
+
+def build_grid(conn, size: int) -> None:
+    """Replace ``terrain`` with a ``size`` x ``size`` grid and a walled river."""
+    wall = size // 2
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE terrain")
+        cur.execute(
+            "INSERT INTO terrain (tile_x, tile_y, type) "
+            "SELECT x, y, CASE WHEN x = %s AND y <> %s THEN 'water' "
+            "ELSE 'plain' END "
+            "FROM generate_series(1, %s) x CROSS JOIN generate_series(1, %s) y",
+            (wall, size - 1, size, size),
+        )
+        cur.execute("ANALYZE terrain")
+    conn.commit()
+
+
+def time_route(conn, func: str, size: int, timeout: float) -> tuple[float, int] | None:
+    """Return ``(seconds, path length)`` or ``None`` if *timeout* expired."""
+    with conn.cursor() as cur:
+        cur.execute(f"SET statement_timeout = {int(timeout * 1000)}")
+        start = time.perf_counter()
+        try:
+            cur.execute(f"SELECT {func}(1, 1, %s, %s)", (size, 1))
+        except psycopg.errors.QueryCanceled:
+            conn.rollback()
+            return None
+        path = cur.fetchone()[0]
+        elapsed = time.perf_counter() - start
+        cur.execute("RESET statement_timeout")
+    conn.commit()
+    return elapsed, len(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark find_route")
+    db.add_dsn_argument(parser)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[256, 1024],
+        help="Grid edge lengths to benchmark",
+    )
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="Also time find_route_legacy()",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=300.0,
+        help="Per-route statement timeout in seconds",
+    )
+    args = parser.parse_args()
+    db.parse_dsn(args)
+
+    funcs = ["find_route"] + (["find_route_legacy"] if args.legacy else [])
+    with db.connect(args.dsn) as conn:
+        for size in args.sizes:
+            build_grid(conn, size)
+            for func in funcs:
+                result = time_route(conn, func, size, args.timeout)
+                if result is None:
+                    print(f"{func} {size}x{size}: timed out after {args.timeout:.0f}s")
+                else:
+                    elapsed, length = result
+                    print(
+                        f"{func} {size}x{size}: {elapsed:.2f} seconds "
+                        f"({length} tile path)"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark the vehicle cell index of ``sql/procs/spatial.sql``.
+
+The script scatters vehicles at random over a square map, files them with
+``refresh_vehicle_cells()`` and then reports:
+
+* the time of ``CALL move_vehicles()`` per tick with the cell triggers in
+  place, and how many of the vehicle tuples written were HOT updates;
+* the time of ``vehicles_at()``, ``vehicles_in_rect()`` over a viewport and
+  ``vehicles_within()``, each next to the same filter run as a sequential
+  scan of ``vehicles``.
+
+Run it once with ``--no-cells`` to time ``move_vehicles()`` without the
+triggers. It requires a running PostgreSQL database with the schema and the
+spatial procedures loaded.
+"""
+
+import argparse
+import json
+import random
+import time
+
+import pgttd.db as db
+from scripts.benchmark_move_vehicles import STATS_SQL
+
+TRIGGERS = [
+    "vehicles_cells_ins",
+    "vehicles_cells_del",
+    "vehicles_cells_truncate",
+    "vehicles_cells_upd",
+]
+
+SEQ_RECT_SQL = (
+    "SELECT count(*) FROM vehicles WHERE x BETWEEN %s AND %s AND y BETWEEN %s AND %s"
+)
+SEQ_WITHIN_SQL = (
+    "SELECT count(*) FROM vehicles "
+    "WHERE (x - %s)::bigint * (x - %s) + (y - %s)::bigint * (y - %s) "
+    "<= %s::bigint * %s"
+)
+
+
+def _time(cur, sql: str, params_list: list[tuple]) -> float:
+    """Return the mean milliseconds of running *sql* once per parameter set."""
+    start = time.perf_counter()
+    for params in params_list:
+        cur.execute(sql, params)
+        cur.fetchall()
+    return (time.perf_counter() - start) * 1000 / len(params_list)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vehicle lookups")
+    db.add_dsn_argument(parser)
+    parser.add_argument(
+        "--count", type=int, default=1000000, help="Number of vehicles to insert"
+    )
+    parser.add_argument("--size", type=int, default=1000, help="Map width and height")
+    parser.add_argument("--ticks", type=int, default=3, help="Number of ticks to time")
+    parser.add_argument(
+        "--queries", type=int, default=20, help="Lookups to time of each kind"
+    )
+    parser.add_argument("--radius", type=int, default=10, help="vehicles_within radius")
+    parser.add_argument(
+        "--no-cells",
+        action="store_true",
+        help="Disable the cell triggers and time move_vehicles() alone",
+    )
+    args = parser.parse_args()
+    db.parse_dsn(args)
+
+    rng = random.Random(0)
+    size = args.size
+    schedule = [{"x": size // 2, "y": size // 2}]
+
+    with db.connect(args.dsn) as conn:
+        with conn.cursor() as cur:
+            action = "DISABLE" if args.no_cells else "ENABLE"
+            for trigger in TRIGGERS:
+                cur.execute(f"ALTER TABLE vehicles {action} TRIGGER {trigger}")
+            cur.execute("TRUNCATE vehicles")
+            cur.execute(
+                "INSERT INTO vehicles (x, y, schedule) "
+                "SELECT floor(random() * %s), floor(random() * %s), %s::jsonb "
+                "FROM generate_series(1, %s)",
+                (size, size, json.dumps(schedule), args.count),
+            )
+            cur.execute("SELECT refresh_vehicle_cells()")
+            conn.commit()
+            conn.autocommit = True
+            cur.execute("VACUUM ANALYZE vehicles")
+            cur.execute("VACUUM ANALYZE vehicle_cells")
+            conn.autocommit = False
+
+            elapsed = 0.0
+            tuples = hot = 0
+            for _ in range(args.ticks):
+                cur.execute(STATS_SQL)
+                upd_start, hot_start, _ = cur.fetchone()
+                start = time.perf_counter()
+                cur.execute("CALL move_vehicles()")
+                elapsed += time.perf_counter() - start
+                cur.execute(STATS_SQL)
+                upd_end, hot_end, _ = cur.fetchone()
+                conn.commit()
+                tuples += upd_end - upd_start
+                hot += hot_end - hot_start
+            cells = "without" if args.no_cells else "with"
+            print(
+                f"move_vehicles {cells} cell triggers: "
+                f"{elapsed / args.ticks:.2f} s/tick, {tuples / args.ticks:.0f} "
+                f"tuples written ({hot / args.ticks:.0f} HOT)"
+            )
+            if args.no_cells:
+                for trigger in TRIGGERS:
+                    cur.execute(f"ALTER TABLE vehicles ENABLE TRIGGER {trigger}")
+                cur.execute("SELECT refresh_vehicle_cells()")
+                conn.commit()
+
+            points = [
+                (rng.randrange(size), rng.randrange(size)) for _ in range(args.queries)
+            ]
+            # An 80x24 terminal viewport
+            rects = [(x, x + 79, y, y + 23) for x, y in points]
+            r = args.radius
+            cases = [
+                (
+                    "point",
+                    "SELECT * FROM vehicles_at(%s, %s)",
+                    points,
+                    SEQ_RECT_SQL,
+                    [(x, x, y, y) for x, y in points],
+                ),
+                (
+                    "80x24 viewport",
+                    "SELECT * FROM vehicles_in_rect(%s, %s, %s, %s)",
+                    rects,
+                    SEQ_RECT_SQL,
+                    rects,
+                ),
+                (
+                    f"radius {r}",
+                    "SELECT * FROM vehicles_within(%s, %s, %s)",
+                    [(x, y, r) for x, y in points],
+                    SEQ_WITHIN_SQL,
+                    [(x, x, y, y, r, r) for x, y in points],
+                ),
+            ]
+            for name, sql, params, seq_sql, seq_params in cases:
+                indexed = _time(cur, sql, params)
+                scanned = _time(cur, seq_sql, seq_params)
+                print(
+                    f"{name:<16} {indexed:>8.2f} ms indexed "
+                    f"{scanned:>8.2f} ms sequential scan"
+                )
+            conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
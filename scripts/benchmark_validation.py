@@ -0,0 +1,94 @@
+"""Benchmark schedule and cargo validation for vehicle ingestion.
+
+The script generates vehicles with random schedules and cargo and times, in
+records per second:
+
+* the parse, check and encode path, which decodes each JSON value, checks
+  it and encodes it again;
+* ``check_schedule_text`` and ``check_cargo_text``, which pass the original
+  text on;
+* ``read_vehicles`` over the same vehicles as JSONL and as CSV.
+
+It needs no database.
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import time
+
+from pgttd import create_vehicle
+
+
+def _vehicles(count: int, stops: int) -> list[dict]:
+    rng = random.Random(0)
+    return [
+        {
+            "x": rng.randrange(256),
+            "y": rng.randrange(256),
+            "schedule": [
+                {"x": rng.randrange(256), "y": rng.randrange(256)}
+                for _ in range(rng.randint(0, stops))
+            ],
+            "cargo": [
+                {"resource": rng.choice(["coal", "ore", "wood"]), "amount": i}
+                for i in range(rng.randint(0, 2))
+            ],
+        }
+        for _ in range(count)
+    ]
+
+
+def _rate(count: int, func) -> float:
+    start = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vehicle validation")
+    parser.add_argument(
+        "--vehicles", type=int, default=100000, help="Number of vehicles"
+    )
+    parser.add_argument("--stops", type=int, default=8, help="Maximum schedule length")
+    args = parser.parse_args()
+
+    vehicles = _vehicles(args.vehicles, args.stops)
+    texts = [(json.dumps(v["schedule"]), json.dumps(v["cargo"])) for v in vehicles]
+    jsonl = "".join(json.dumps(v) + "\n" for v in vehicles)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["x", "y", "schedule", "cargo"])
+    for v, (schedule, cargo) in zip(vehicles, texts):
+        writer.writerow([v["x"], v["y"], schedule, cargo])
+    csv_text = buf.getvalue()
+
+    def reserialize():
+        for schedule, cargo in texts:
+            json.dumps(create_vehicle.validate_schedule(schedule))
+            json.dumps(create_vehicle.validate_cargo(cargo))
+
+    def pass_through():
+        for schedule, cargo in texts:
+            create_vehicle.check_schedule_text(schedule)
+            create_vehicle.check_cargo_text(cargo)
+
+    def read(text: str, fmt: str):
+        errors: list[tuple[int, str]] = []
+        for _ in create_vehicle.read_vehicles(io.StringIO(text), fmt, errors):
+            pass
+
+    count = args.vehicles
+    for name, func in [
+        ("parse, check and encode", reserialize),
+        ("check text", pass_through),
+        ("read_vehicles jsonl", lambda: read(jsonl, "jsonl")),
+        ("read_vehicles csv", lambda: read(csv_text, "csv")),
+    ]:
+        print(f"{name:<24} {_rate(count, func):>12,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,16 +14,25 @@ SCHEMA_PATH = ROOT / "sql" / "schema.sql"
 # Ordered list to satisfy foreign key dependencies
 TABLE_ORDER = [
     "terrain",
+    "sprites",
     "tiles",
     "companies",
     "industries",
     "vehicles",
+    "vehicle_cells",
     "industry_outputs",
     "vehicle_operations",
     "game_state",
     "resources",
     "resource_rules",
     "resource_industries",
+    "resource_industry_flows",
+    "route_cache",
+    "vehicle_routes",
+    "flow_fields",
+    "tick_stages",
+    "tick_stats",
+    "tick_snapshots",
 ]
 
 
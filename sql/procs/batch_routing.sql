@@ -0,0 +1,288 @@
+-- Batch routing
+-- Route many vehicles in one call. Terrain is loaded once per call and
+-- vehicles sharing a destination share one reverse Dijkstra search from
+-- that destination, which yields a flow field of next steps towards it.
+
+DO $$
+BEGIN
+    CREATE TYPE route_request AS (
+        vehicle_id integer,
+        start_x integer,
+        start_y integer,
+        end_x integer,
+        end_y integer
+    );
+EXCEPTION WHEN duplicate_object THEN
+    NULL;
+END$$;
+
+-- Return the next cell towards (end_x, end_y) for every cell of a grid
+-- produced by terrain_grid(). The destination maps to itself and cells that
+-- cannot reach it map to 0. When starts is given the search stops as soon as
+-- all of those cells are settled.
+CREATE OR REPLACE FUNCTION flow_field_next(
+    min_x integer,
+    min_y integer,
+    max_x integer,
+    max_y integer,
+    step integer[],
+    end_x integer,
+    end_y integer,
+    starts integer[] DEFAULT NULL
+)
+RETURNS integer[] AS $$
+DECLARE
+    h integer := max_y - min_y + 1;
+    nxt integer[];
+    dist integer[];
+    closed boolean[];
+    wanted boolean[];
+    remaining integer := -1;
+    heap_key integer[] := '{}';
+    heap_seq integer[] := '{}';
+    heap_node integer[] := '{}';
+    heap_size integer := 0;
+    seq integer := 0;
+    pos integer;
+    child integer;
+    key integer;
+    key_seq integer;
+    key_node integer;
+    goal integer;
+    cur integer;
+    nbr integer;
+    cx integer;
+    cy integer;
+    nx integer;
+    ny integer;
+    nd integer;
+    d integer;
+BEGIN
+    nxt := array_fill(0, ARRAY[array_length(step, 1)]);
+    goal := (end_x - min_x) * h + (end_y - min_y) + 1;
+    IF end_x NOT BETWEEN min_x AND max_x
+       OR end_y NOT BETWEEN min_y AND max_y
+       OR step[goal] IS NULL THEN
+        RETURN nxt;
+    END IF;
+
+    dist := array_fill(NULL::integer, ARRAY[array_length(step, 1)]);
+    closed := array_fill(false, ARRAY[array_length(step, 1)]);
+    IF starts IS NOT NULL THEN
+        wanted := array_fill(false, ARRAY[array_length(step, 1)]);
+        remaining := 0;
+        FOREACH cur IN ARRAY starts LOOP
+            IF NOT wanted[cur] THEN
+                wanted[cur] := true;
+                remaining := remaining + 1;
+            END IF;
+        END LOOP;
+    END IF;
+
+    nxt[goal] := goal;
+    dist[goal] := 0;
+    heap_key[1] := 0;
+    heap_seq[1] := 0;
+    heap_node[1] := goal;
+    heap_size := 1;
+
+    WHILE heap_size > 0 LOOP
+        -- Pop the minimum and sift the last entry down from the root
+        cur := heap_node[1];
+        key := heap_key[heap_size];
+        key_seq := heap_seq[heap_size];
+        key_node := heap_node[heap_size];
+        heap_size := heap_size - 1;
+        IF heap_size > 0 THEN
+            pos := 1;
+            LOOP
+                child := pos * 2;
+                EXIT WHEN child > heap_size;
+                IF child < heap_size
+                   AND (heap_key[child + 1] < heap_key[child]
+                        OR (heap_key[child + 1] = heap_key[child]
+                            AND heap_seq[child + 1] < heap_seq[child])) THEN
+                    child := child + 1;
+                END IF;
+                EXIT WHEN key < heap_key[child]
+                    OR (key = heap_key[child] AND key_seq < heap_seq[child]);
+                heap_key[pos] := heap_key[child];
+                heap_seq[pos] := heap_seq[child];
+                heap_node[pos] := heap_node[child];
+                pos := child;
+            END LOOP;
+            heap_key[pos] := key;
+            heap_seq[pos] := key_seq;
+            heap_node[pos] := key_node;
+        END IF;
+
+        CONTINUE WHEN closed[cur];
+        closed[cur] := true;
+        IF remaining > 0 AND wanted[cur] THEN
+            remaining := remaining - 1;
+            EXIT WHEN remaining = 0;
+        END IF;
+        -- Impassable cells may start a route but never continue one
+        CONTINUE WHEN step[cur] IS NULL;
+
+        cx := (cur - 1) / h + min_x;
+        cy := (cur - 1) % h + min_y;
+        FOR d IN 1..4 LOOP
+            nx := cx + CASE d WHEN 1 THEN 1 WHEN 2 THEN -1 ELSE 0 END;
+            ny := cy + CASE d WHEN 3 THEN 1 WHEN 4 THEN -1 ELSE 0 END;
+            CONTINUE WHEN nx < min_x OR nx > max_x OR ny < min_y OR ny > max_y;
+            nbr := (nx - min_x) * h + (ny - min_y) + 1;
+            CONTINUE WHEN closed[nbr];
+
+            -- Moving from nbr into cur costs the step cost of cur
+            nd := dist[cur] + step[cur];
+            CONTINUE WHEN dist[nbr] IS NOT NULL AND dist[nbr] <= nd;
+            dist[nbr] := nd;
+            nxt[nbr] := cur;
+
+            -- Push the neighbour and sift it up towards the root
+            seq := seq + 1;
+            heap_size := heap_size + 1;
+            pos := heap_size;
+            WHILE pos > 1 LOOP
+                child := pos / 2;
+                EXIT WHEN heap_key[child] < nd
+                    OR (heap_key[child] = nd AND heap_seq[child] < seq);
+                heap_key[pos] := heap_key[child];
+                heap_seq[pos] := heap_seq[child];
+                heap_node[pos] := heap_node[child];
+                pos := child;
+            END LOOP;
+            heap_key[pos] := nd;
+            heap_seq[pos] := seq;
+            heap_node[pos] := nbr;
+        END LOOP;
+    END LOOP;
+
+    RETURN nxt;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Return a path for every request, in the same format as find_route().
+CREATE OR REPLACE FUNCTION find_routes(
+    requests route_request[],
+    cost_map integer[][] DEFAULT NULL  -- optional costs: [x, y, cost]
+)
+RETURNS TABLE (vehicle_id integer, path integer[][]) AS $$
+DECLARE
+    min_x integer;
+    min_y integer;
+    max_x integer;
+    max_y integer;
+    h integer;
+    step integer[];
+    nxt integer[];
+    req route_request;
+    dest_x integer;
+    dest_y integer;
+    goal integer;
+    cur integer;
+    path_x integer[];
+    path_y integer[];
+BEGIN
+    SELECT * INTO min_x, min_y, max_x, max_y, step FROM terrain_grid(cost_map);
+    h := max_y - min_y + 1;
+
+    FOR req IN
+        SELECT * FROM unnest(requests) r ORDER BY r.end_x, r.end_y
+    LOOP
+        vehicle_id := req.vehicle_id;
+
+        IF req.start_x = req.end_x AND req.start_y = req.end_y THEN
+            path := ARRAY[ARRAY[req.start_x, req.start_y]];
+            RETURN NEXT;
+            CONTINUE;
+        END IF;
+        IF min_x IS NULL
+           OR req.start_x NOT BETWEEN min_x AND max_x
+           OR req.start_y NOT BETWEEN min_y AND max_y THEN
+            path := ARRAY[]::integer[][];
+            RETURN NEXT;
+            CONTINUE;
+        END IF;
+
+        -- One search per destination, stopping once all its starts settle
+        IF dest_x IS DISTINCT FROM req.end_x OR dest_y IS DISTINCT FROM req.end_y THEN
+            dest_x := req.end_x;
+            dest_y := req.end_y;
+            goal := (dest_x - min_x) * h + (dest_y - min_y) + 1;
+            nxt := flow_field_next(
+                min_x, min_y, max_x, max_y, step, dest_x, dest_y,
+                ARRAY(
+                    SELECT (r.start_x - min_x) * h + (r.start_y - min_y) + 1
+                    FROM unnest(requests) r
+                    WHERE r.end_x = dest_x AND r.end_y = dest_y
+                      AND r.start_x BETWEEN min_x AND max_x
+                      AND r.start_y BETWEEN min_y AND max_y
+                      AND (r.start_x, r.start_y) <> (dest_x, dest_y)
+                )
+            );
+        END IF;
+
+        cur := (req.start_x - min_x) * h + (req.start_y - min_y) + 1;
+        IF nxt[cur] = 0 THEN
+            path := ARRAY[]::integer[][];
+            RETURN NEXT;
+            CONTINUE;
+        END IF;
+
+        path_x := ARRAY[req.start_x];
+        path_y := ARRAY[req.start_y];
+        WHILE cur <> goal LOOP
+            cur := nxt[cur];
+            path_x := path_x || ((cur - 1) / h + min_x);
+            path_y := path_y || ((cur - 1) % h + min_y);
+        END LOOP;
+
+        SELECT array_agg(ARRAY[path_x[i], path_y[i]] ORDER BY i)
+        INTO path
+        FROM generate_subscripts(path_x, 1) AS i;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Compute routes for the requested vehicles and store them in
+-- vehicle_routes, restarting each vehicle at the beginning of its route.
+CREATE OR REPLACE PROCEDURE route_vehicles(
+    requests route_request[],
+    cost_map integer[][] DEFAULT NULL
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO vehicle_routes AS vr (vehicle_id, path)
+    SELECT r.vehicle_id, r.path
+    FROM find_routes(requests, cost_map) r
+    ON CONFLICT ON CONSTRAINT vehicle_routes_pkey DO UPDATE
+    SET path = EXCLUDED.path;
+
+    UPDATE vehicles v
+    SET next_waypoint_idx = 2
+    FROM unnest(requests) r
+    WHERE v.id = r.vehicle_id;
+END;
+$$;
+
+-- Advance every vehicle with a stored route one step along it in a single
+-- set-based statement. Vehicles that reached the end of their route are
+-- left untouched.
+CREATE OR REPLACE PROCEDURE move_vehicles_routed()
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE vehicles v
+    SET
+        x = vr.path[GREATEST(v.next_waypoint_idx, 2)][1],
+        y = vr.path[GREATEST(v.next_waypoint_idx, 2)][2],
+        next_waypoint_idx = GREATEST(v.next_waypoint_idx, 2) + 1
+    FROM vehicle_routes vr
+    WHERE vr.vehicle_id = v.id
+      AND GREATEST(v.next_waypoint_idx, 2) <= array_length(vr.path, 1);
+END;
+$$;
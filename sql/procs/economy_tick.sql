@@ -1,32 +1,147 @@
 -- Resource and industry tick processing
 
--- Perform a single economy tick. Resources regenerate/decay and
--- resource industries consume inputs and produce outputs.
+-- Rebuild resource_industry_plan. Each industry is placed one chain level
+-- after the last industry producing any of its inputs, so that within a
+-- tick every producer runs before its consumers. Industries in a production
+-- cycle share the final level. Returns the number of levels.
+CREATE OR REPLACE FUNCTION refresh_industry_plan()
+RETURNS integer AS $$
+DECLARE
+    lvl integer := 0;
+    placed integer;
+BEGIN
+    DELETE FROM resource_industry_plan;
+    INSERT INTO resource_industry_plan
+        (industry_id, resource_id, is_input, per_tick)
+    SELECT industry_id, resource_id, is_input, per_tick
+    FROM resource_industry_io;
+    ANALYZE resource_industry_plan;
+
+    LOOP
+        -- Place industries none of whose inputs come from an unplaced
+        -- industry; the subquery sees the plan as it was before this
+        -- statement, so a level never feeds an industry in the same level
+        UPDATE resource_industry_plan p
+        SET chain_level = lvl
+        WHERE p.chain_level IS NULL
+          AND NOT EXISTS (
+              SELECT 1
+              FROM resource_industry_plan inp
+              JOIN resource_industry_plan outp
+                ON outp.resource_id = inp.resource_id
+               AND NOT outp.is_input
+               AND outp.chain_level IS NULL
+               AND outp.industry_id <> inp.industry_id
+              WHERE inp.industry_id = p.industry_id
+                AND inp.is_input
+                AND inp.chain_level IS NULL
+          );
+        GET DIAGNOSTICS placed = ROW_COUNT;
+        EXIT WHEN placed = 0;
+        lvl := lvl + 1;
+    END LOOP;
+
+    UPDATE resource_industry_plan SET chain_level = lvl
+    WHERE chain_level IS NULL;
+    GET DIAGNOSTICS placed = ROW_COUNT;
+    RETURN lvl + (placed > 0)::integer;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Any change to the industries or their flows can reorder the chain, so
+-- drop the plan and let the next economy_tick() rebuild it
+CREATE OR REPLACE FUNCTION invalidate_industry_plan()
+RETURNS trigger AS $$
+BEGIN
+    DELETE FROM resource_industry_plan;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS resource_industries_invalidate_plan
+ON resource_industries;
+CREATE TRIGGER resource_industries_invalidate_plan
+AFTER INSERT OR DELETE
+OR UPDATE OF input_resource_id, output_resource_id,
+input_per_tick, output_per_tick
+ON resource_industries
+FOR EACH STATEMENT EXECUTE FUNCTION invalidate_industry_plan();
+
+DROP TRIGGER IF EXISTS resource_industries_truncate_plan
+ON resource_industries;
+CREATE TRIGGER resource_industries_truncate_plan
+AFTER TRUNCATE ON resource_industries
+FOR EACH STATEMENT EXECUTE FUNCTION invalidate_industry_plan();
+
+DROP TRIGGER IF EXISTS resource_industry_flows_invalidate_plan
+ON resource_industry_flows;
+CREATE TRIGGER resource_industry_flows_invalidate_plan
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON resource_industry_flows
+FOR EACH STATEMENT EXECUTE FUNCTION invalidate_industry_plan();
+
+-- Perform a single economy tick. Resources regenerate/decay, then resource
+-- industries consume inputs and produce outputs one chain level at a time,
+-- so goods flow down a whole production chain within one tick. Industries
+-- of a level that compete for an input share it in proportion to what each
+-- requests, and each runs at the rate of its scarcest input; industries
+-- without an input resource do not run. The work is a fixed number of
+-- statements per chain level, whatever the industry count.
 CREATE OR REPLACE FUNCTION economy_tick() RETURNS VOID AS $$
+DECLARE
+    lvl integer;
 BEGIN
     -- Apply resource growth and decay
     UPDATE resources r
     SET amount = GREATEST(0, r.amount + rr.growth_rate - rr.decay_rate)
     FROM resource_rules rr
-    WHERE rr.resource_id = r.id;
-
-    -- Handle industries that have enough input resources
-    WITH ready AS (
-        SELECT i.id, i.input_resource_id, i.output_resource_id,
-               i.input_per_tick, i.output_per_tick
-        FROM resource_industries i
-        JOIN resources rin ON rin.id = i.input_resource_id
-        WHERE rin.amount >= i.input_per_tick
-    ), consumed AS (
+    WHERE rr.resource_id = r.id AND rr.growth_rate <> rr.decay_rate;
+
+    IF NOT EXISTS (SELECT 1 FROM resource_industry_plan) THEN
+        PERFORM refresh_industry_plan();
+    END IF;
+
+    FOR lvl IN
+        SELECT DISTINCT chain_level FROM resource_industry_plan ORDER BY 1
+    LOOP
+        WITH io AS MATERIALIZED (
+            SELECT industry_id, resource_id, is_input, per_tick
+            FROM resource_industry_plan
+            WHERE chain_level = lvl
+        ), share AS (
+            -- Fraction of the total request each input can satisfy;
+            -- LEAST() skips the NULL of an input nobody asks any of
+            SELECT d.resource_id,
+                   LEAST(1, r.amount::float8 / NULLIF(d.demand, 0)) AS share
+            FROM (
+                SELECT resource_id, sum(per_tick) AS demand
+                FROM io
+                WHERE is_input
+                GROUP BY resource_id
+            ) d
+            JOIN resources r ON r.id = d.resource_id
+        ), rate AS (
+            SELECT io.industry_id, min(s.share) AS rate
+            FROM io
+            JOIN share s ON s.resource_id = io.resource_id
+            WHERE io.is_input
+            GROUP BY io.industry_id
+        ), change AS (
+            -- Industries without inputs never run. Totals are truncated
+            -- towards zero so that rounding never takes more than the
+            -- stock or makes more than the recipes allow.
+            SELECT io.resource_id,
+                   trunc(sum(
+                       rate.rate * io.per_tick
+                       * CASE WHEN io.is_input THEN -1 ELSE 1 END
+                   )::numeric, 6) AS delta
+            FROM io
+            JOIN rate ON rate.industry_id = io.industry_id
+            GROUP BY io.resource_id
+        )
         UPDATE resources r
-        SET amount = r.amount - ready.input_per_tick
-        FROM ready
-        WHERE r.id = ready.input_resource_id
-        RETURNING ready.output_resource_id, ready.output_per_tick
-    )
-    UPDATE resources r
-    SET amount = r.amount + c.output_per_tick
-    FROM consumed c
-    WHERE r.id = c.output_resource_id;
+        SET amount = GREATEST(0, r.amount + c.delta)
+        FROM change c
+        WHERE r.id = c.resource_id AND c.delta <> 0;
+    END LOOP;
 END;
 $$ LANGUAGE plpgsql;
@@ -0,0 +1,101 @@
+-- Flow fields
+-- A flow field stores, for every tile, the next tile on a cheapest route to
+-- one destination, so move_vehicles() can take a terrain-aware step for
+-- every vehicle with a single join. Waypoints are registered as
+-- destinations whenever a vehicle schedule is written, and
+-- refresh_flow_fields() rebuilds the fields whose terrain_version is behind
+-- game_state.terrain_version (bumped by the trigger in route_cache.sql).
+-- move_vehicles() ignores a field until it has been rebuilt.
+
+-- Registers waypoints of inserted vehicles per statement, so bulk inserts
+-- stay cheap, and of updated schedules per row, so that ticks updating
+-- every vehicle's position do not pay for it.
+CREATE OR REPLACE FUNCTION register_flow_field_destinations()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_LEVEL = 'ROW' THEN
+        INSERT INTO flow_field_destinations (dest_x, dest_y)
+        SELECT DISTINCT w.x, w.y
+        FROM unnest(NEW.schedule_x, NEW.schedule_y) AS w (x, y)
+        WHERE w.x IS NOT NULL AND w.y IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    ELSE
+        INSERT INTO flow_field_destinations (dest_x, dest_y)
+        SELECT DISTINCT w.x, w.y
+        FROM new_rows v, unnest(v.schedule_x, v.schedule_y) AS w (x, y)
+        WHERE w.x IS NOT NULL AND w.y IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS vehicles_register_destinations_ins ON vehicles;
+CREATE TRIGGER vehicles_register_destinations_ins
+AFTER INSERT ON vehicles
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION register_flow_field_destinations();
+
+DROP TRIGGER IF EXISTS vehicles_register_destinations_upd ON vehicles;
+CREATE TRIGGER vehicles_register_destinations_upd
+AFTER UPDATE OF schedule ON vehicles
+FOR EACH ROW
+WHEN (OLD.schedule IS DISTINCT FROM NEW.schedule)
+EXECUTE FUNCTION register_flow_field_destinations();
+
+-- Rebuild up to max_fields flow fields that are missing or were built for
+-- older terrain, least recently built first. Terrain is loaded once per
+-- call. Returns the number of fields rebuilt.
+CREATE OR REPLACE FUNCTION refresh_flow_fields(max_fields integer DEFAULT NULL)
+RETURNS integer AS $$
+DECLARE
+    version bigint;
+    grid record;
+    h integer;
+    dest record;
+    built integer := 0;
+BEGIN
+    SELECT gs.terrain_version INTO version
+    FROM game_state gs ORDER BY gs.id LIMIT 1;
+    version := COALESCE(version, 0);
+
+    FOR dest IN
+        SELECT d.dest_x, d.dest_y
+        FROM flow_field_destinations d
+        WHERE d.terrain_version IS DISTINCT FROM version
+        ORDER BY d.terrain_version NULLS FIRST, d.dest_x, d.dest_y
+        LIMIT max_fields
+    LOOP
+        IF built = 0 THEN
+            SELECT * INTO grid FROM terrain_grid();
+            h := grid.max_y - grid.min_y + 1;
+        END IF;
+
+        DELETE FROM flow_fields f
+        WHERE f.dest_x = dest.dest_x AND f.dest_y = dest.dest_y;
+
+        IF grid.min_x IS NOT NULL THEN
+            INSERT INTO flow_fields (dest_x, dest_y, tile_x, tile_y, next_x, next_y)
+            SELECT
+                dest.dest_x,
+                dest.dest_y,
+                (c.i - 1) / h + grid.min_x,
+                (c.i - 1) % h + grid.min_y,
+                (c.n - 1) / h + grid.min_x,
+                (c.n - 1) % h + grid.min_y
+            FROM unnest(flow_field_next(
+                grid.min_x, grid.min_y, grid.max_x, grid.max_y, grid.step,
+                dest.dest_x, dest.dest_y
+            )) WITH ORDINALITY AS c (n, i)
+            WHERE c.n <> 0;
+        END IF;
+
+        UPDATE flow_field_destinations d
+        SET terrain_version = version
+        WHERE d.dest_x = dest.dest_x AND d.dest_y = dest.dest_y;
+        built := built + 1;
+    END LOOP;
+
+    RETURN built;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,126 @@
+-- Composed viewer frames
+-- render_frame() returns what a renderer draws on each tile of a rectangle,
+-- so a frame costs one query whose work grows with the rectangle only.
+-- A vehicle ('@', yellow) hides the industry ('I', magenta) on its tile,
+-- which hides the tile. Tiles are drawn with the glyph and color of their
+-- sprite, as the curses viewer's fetch_tiles() reads them. Vehicles are found
+-- with vehicles_in_rect() from spatial.sql and the industries of each tile
+-- through industries_tile_idx. The function is PL/pgSQL, which resolves the
+-- tables it reads when first called, so this file loads before the sprites
+-- are set up.
+
+CREATE OR REPLACE FUNCTION render_frame(
+    x_min integer, x_max integer, y_min integer, y_max integer
+)
+RETURNS TABLE (x integer, y integer, glyph text, color text) AS $$
+#variable_conflict use_column
+BEGIN
+    RETURN QUERY
+    WITH moving AS (
+        SELECT DISTINCT v.x, v.y
+        FROM vehicles_in_rect(x_min, x_max, y_min, y_max) v
+    )
+    SELECT
+        t.x,
+        t.y,
+        CASE
+            WHEN m.x IS NOT NULL THEN '@'
+            WHEN b.built THEN 'I'
+            ELSE s.glyph::text
+        END,
+        CASE
+            WHEN m.x IS NOT NULL THEN 'yellow'
+            WHEN b.built THEN 'magenta'
+            ELSE s.color::text
+        END
+    FROM tiles t
+    JOIN sprites s ON s.id = t.sprite_id
+    LEFT JOIN moving m ON m.x = t.x AND m.y = t.y
+    LEFT JOIN LATERAL (
+        SELECT true AS built FROM industries i WHERE i.tile_id = t.id LIMIT 1
+    ) b ON true
+    WHERE t.x BETWEEN x_min AND x_max
+      AND t.y BETWEEN y_min AND y_max
+    ORDER BY t.y, t.x;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Colors of the palette planes of render_frame_packed(), by index. They are
+-- the eight curses colors, in the order of their curses numbers.
+CREATE OR REPLACE FUNCTION frame_palette()
+RETURNS text [] AS $$
+    SELECT ARRAY[
+        'black', 'red', 'green', 'yellow', 'blue', 'magenta', 'cyan', 'white'
+    ]
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Run-length encode bytes as (count, byte) pairs with counts of 1 to 255
+CREATE OR REPLACE FUNCTION pack_runs(data bytea)
+RETURNS bytea AS $$
+DECLARE
+    n integer := length(data);
+    runs text [] := '{}';
+    i integer := 0;
+    j integer;
+    value integer;
+BEGIN
+    WHILE i < n LOOP
+        value := get_byte(data, i);
+        j := i + 1;
+        WHILE j < n AND j - i < 255 AND get_byte(data, j) = value LOOP
+            j := j + 1;
+        END LOOP;
+        runs := runs || (lpad(to_hex(j - i), 2, '0') || lpad(to_hex(value), 2, '0'));
+        i := j;
+    END LOOP;
+    RETURN decode(array_to_string(runs, ''), 'hex');
+END;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+
+-- render_frame() packed into one bytea:
+--   width, height    2 bytes each, big-endian
+--   flags            1 byte; 1 when the planes are run-length encoded
+--   glyph plane      one byte per cell, row by row: the glyph's character
+--                    code, 0 where there is no tile, '?' above 255
+--   palette plane    one byte per cell: the color's index in
+--                    frame_palette(), white for colors not in it
+-- With rle the two planes together are encoded by pack_runs().
+CREATE OR REPLACE FUNCTION render_frame_packed(
+    x_min integer, x_max integer, y_min integer, y_max integer,
+    rle boolean DEFAULT false
+)
+RETURNS bytea AS $$
+    WITH cells AS (
+        SELECT
+            gy.y,
+            gx.x,
+            CASE
+                WHEN f.glyph IS NULL THEN 0
+                WHEN ascii(f.glyph) BETWEEN 1 AND 255 THEN ascii(f.glyph)
+                ELSE ascii('?')
+            END AS glyph,
+            CASE
+                WHEN f.glyph IS NULL THEN 0
+                ELSE COALESCE(
+                    array_position(frame_palette(), lower(f.color)) - 1, 7
+                )
+            END AS color
+        FROM generate_series(y_min, y_max) gy (y)
+        CROSS JOIN generate_series(x_min, x_max) gx (x)
+        LEFT JOIN render_frame(x_min, x_max, y_min, y_max) f
+            ON f.x = gx.x AND f.y = gy.y
+    ),
+    planes AS (
+        SELECT decode(
+            string_agg(lpad(to_hex(glyph), 2, '0'), '' ORDER BY y, x)
+            || string_agg(lpad(to_hex(color), 2, '0'), '' ORDER BY y, x),
+            'hex'
+        ) AS data
+        FROM cells
+    )
+    SELECT int2send((x_max - x_min + 1)::int2)
+        || int2send((y_max - y_min + 1)::int2)
+        || CASE WHEN rle THEN '\x01'::bytea ELSE '\x00'::bytea END
+        || CASE WHEN rle THEN pack_runs(data) ELSE data END
+    FROM planes
+$$ LANGUAGE sql STABLE;
@@ -1,23 +1,37 @@
--- Procedure to move vehicles one step towards their scheduled waypoints
-CREATE OR REPLACE PROCEDURE move_vehicles()
+-- Procedure to move vehicles one step towards their scheduled waypoints.
+-- min_id and max_id restrict the update to one id range so that separate
+-- connections can move disjoint shards of the fleet concurrently.
+DROP PROCEDURE IF EXISTS move_vehicles();
+CREATE OR REPLACE PROCEDURE move_vehicles(
+    min_id integer DEFAULT NULL,
+    max_id integer DEFAULT NULL
+)
 LANGUAGE plpgsql
 AS $$
+DECLARE
+    version bigint;
 BEGIN
+    SELECT gs.terrain_version INTO version
+    FROM game_state gs ORDER BY gs.id LIMIT 1;
+
     WITH v AS (
         SELECT
             id,
             x,
             y,
-            schedule,
-            jsonb_array_length(schedule) AS sched_len,
+            schedule_x,
+            schedule_y,
+            schedule_len AS sched_len,
             CASE
-                WHEN jsonb_array_length(schedule) = 0 THEN NULL
                 WHEN schedule_idx IS NULL
-                     OR schedule_idx >= jsonb_array_length(schedule)
+                     OR schedule_idx >= schedule_len
                      OR schedule_idx < 0 THEN 0
                 ELSE schedule_idx
             END AS idx
         FROM vehicles
+        WHERE schedule_len > 0
+          AND id BETWEEN COALESCE(min_id, -2147483648)
+                     AND COALESCE(max_id, 2147483647)
     ),
     targets AS (
         SELECT
@@ -26,30 +40,43 @@ BEGIN
             y,
             sched_len,
             idx,
-            (schedule -> idx) AS target,
-            ((schedule -> idx) ->> 'x')::int AS target_x,
-            ((schedule -> idx) ->> 'y')::int AS target_y
+            schedule_x[idx + 1] AS target_x,
+            schedule_y[idx + 1] AS target_y
         FROM v
-        WHERE sched_len > 0
     ),
     moved AS (
+        -- Follow the destination's flow field where one built for the
+        -- current terrain covers the tile. Step straight towards the target
+        -- before the field is first built or rebuilt after a terrain change,
+        -- and from tiles with no route to it, so no vehicle is stuck there.
         SELECT
-            id,
+            t.id,
             CASE
-                WHEN x < target_x THEN x + 1
-                WHEN x > target_x THEN x - 1
-                ELSE x
+                WHEN t.x = t.target_x AND t.y = t.target_y THEN t.x
+                WHEN f.next_x IS NOT NULL THEN f.next_x
+                WHEN t.x < t.target_x THEN t.x + 1
+                WHEN t.x > t.target_x THEN t.x - 1
+                ELSE t.x
             END AS new_x,
             CASE
-                WHEN x = target_x AND y < target_y THEN y + 1
-                WHEN x = target_x AND y > target_y THEN y - 1
-                ELSE y
+                WHEN t.x = t.target_x AND t.y = t.target_y THEN t.y
+                WHEN f.next_y IS NOT NULL THEN f.next_y
+                WHEN t.x = t.target_x AND t.y < t.target_y THEN t.y + 1
+                WHEN t.x = t.target_x AND t.y > t.target_y THEN t.y - 1
+                ELSE t.y
             END AS new_y,
             CASE
-                WHEN x = target_x AND y = target_y THEN (idx + 1) % sched_len
-                ELSE idx
+                WHEN t.x = t.target_x AND t.y = t.target_y
+                    THEN (t.idx + 1) % t.sched_len
+                ELSE t.idx
             END AS new_idx
-        FROM targets
+        FROM targets t
+        LEFT JOIN flow_field_destinations d
+            ON d.dest_x = t.target_x AND d.dest_y = t.target_y
+            AND d.terrain_version = version
+        LEFT JOIN flow_fields f
+            ON f.dest_x = d.dest_x AND f.dest_y = d.dest_y
+            AND f.tile_x = t.x AND f.tile_y = t.y
     )
     UPDATE vehicles v
     SET
@@ -57,6 +84,8 @@ BEGIN
         y = m.new_y,
         schedule_idx = m.new_idx
     FROM moved m
-    WHERE v.id = m.id;
+    WHERE v.id = m.id
+      -- Rewriting an unchanged row would still cost a new tuple and WAL
+      AND (v.x, v.y, v.schedule_idx) IS DISTINCT FROM (m.new_x, m.new_y, m.new_idx);
 END;
 $$;
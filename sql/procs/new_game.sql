@@ -1,26 +1,81 @@
-CREATE OR REPLACE PROCEDURE new_game(width INT, height INT)
+-- World generation
+-- new_game() resets the world and bulk-loads tiles and terrain with
+-- set-based inserts. The individual steps are exposed so very large maps can
+-- be loaded in column bands on several connections at once:
+--
+--   CALL reset_world(width, height);          -- once
+--   CALL populate_world(x_from, x_to, height); -- per band, any connection
+--   CALL index_world();                       -- once, after all bands
+
+CREATE OR REPLACE PROCEDURE reset_world(width INT, height INT)
 LANGUAGE plpgsql
 AS $$
 DECLARE
-    x INT;
-    y INT;
+    version BIGINT;
+    sprites BIGINT;
 BEGIN
+    -- Keep terrain versions increasing across games so that cached routes
+    -- and flow fields built for the previous world are never reused. The
+    -- sprites outlive the world, and so does their version.
+    SELECT max(terrain_version), max(sprite_version)
+    INTO version, sprites
+    FROM game_state;
+
     -- Reset world state
     TRUNCATE TABLE tiles RESTART IDENTITY CASCADE;
     TRUNCATE TABLE terrain RESTART IDENTITY CASCADE;
     TRUNCATE TABLE game_state RESTART IDENTITY CASCADE;
+    TRUNCATE TABLE tick_stats;
+
+    -- Load without per-row triggers or secondary indexes; index_world()
+    -- restores both once every band is in place.
+    ALTER TABLE tiles DISABLE TRIGGER USER;
+    ALTER TABLE terrain DISABLE TRIGGER USER;
+    DROP INDEX IF EXISTS terrain_tile_idx;
 
     -- Create initial game state
-    INSERT INTO game_state(width, height, current_tick)
-    VALUES (width, height, 0);
+    INSERT INTO game_state(
+        width, height, current_tick, terrain_version, sprite_version
+    )
+    VALUES (width, height, 0, COALESCE(version, 0) + 1, COALESCE(sprites, 0));
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE populate_world(x_from INT, x_to INT, height INT)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Each tile points at the terrain row created for its cell
+    WITH cells AS (
+        INSERT INTO terrain(tile_x, tile_y, type)
+        SELECT gx, gy, 'plain'
+        FROM generate_series(x_from, x_to) AS gx
+        CROSS JOIN generate_series(1, height) AS gy
+        RETURNING id, tile_x, tile_y
+    )
+    INSERT INTO tiles(x, y, terrain_id)
+    SELECT tile_x, tile_y, id FROM cells;
+END;
+$$;
 
-    -- Populate tiles and terrain
-    FOR x IN 1..width LOOP
-        FOR y IN 1..height LOOP
-            INSERT INTO tiles(x, y) VALUES (x, y);
-            INSERT INTO terrain(tile_x, tile_y, type)
-            VALUES (x, y, 'plain');
-        END LOOP;
-    END LOOP;
+CREATE OR REPLACE PROCEDURE index_world()
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    CREATE INDEX IF NOT EXISTS terrain_tile_idx ON terrain (tile_x, tile_y);
+    ALTER TABLE tiles ENABLE TRIGGER USER;
+    ALTER TABLE terrain ENABLE TRIGGER USER;
+    ANALYZE tiles;
+    ANALYZE terrain;
+END;
+$$;
+
+CREATE OR REPLACE PROCEDURE new_game(width INT, height INT)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    CALL reset_world(width, height);
+    CALL populate_world(1, width, height);
+    CALL index_world();
 END;
 $$;
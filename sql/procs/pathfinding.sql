@@ -1,5 +1,61 @@
 -- Pathfinding utilities
--- Implements a simple A* search over a grid using Manhattan distance.
+-- Implements A* search over a grid using Manhattan distance.
+--
+-- Terrain is loaded once per call into a dense array indexed by tile, so
+-- passability and cost-map lookups are O(1). The open set is a binary heap
+-- kept in parallel arrays; ties on f are broken by the smaller heuristic and
+-- then by insertion order so routes are deterministic.
+
+-- Load terrain into a dense array of step costs covering the map plus a
+-- one-tile border. Cell (x, y) lives at (x - min_x) * (max_y - min_y + 1)
+-- + (y - min_y) + 1 and holds the cost of entering it, or NULL if it is
+-- impassable. All bounds are NULL when there is no terrain.
+CREATE OR REPLACE FUNCTION terrain_grid(
+    cost_map integer[][] DEFAULT NULL,  -- optional costs: [x, y, cost]
+    OUT min_x integer,
+    OUT min_y integer,
+    OUT max_x integer,
+    OUT max_y integer,
+    OUT step integer[]
+) AS $$
+DECLARE
+    h integer;
+    cx integer;
+    cy integer;
+    s integer;
+BEGIN
+    SELECT min(tile_x) - 1, max(tile_x) + 1, min(tile_y) - 1, max(tile_y) + 1
+    INTO min_x, max_x, min_y, max_y
+    FROM terrain;
+    IF min_x IS NULL THEN
+        RETURN;
+    END IF;
+    h := max_y - min_y + 1;
+
+    SELECT array_agg(t.cost ORDER BY c.i)
+    INTO step
+    FROM generate_series(1, (max_x - min_x + 1) * h) AS c(i)
+    LEFT JOIN (
+        SELECT (tile_x - min_x) * h + (tile_y - min_y) + 1 AS i, 1 AS cost
+        FROM terrain
+        WHERE type NOT IN ('water', 'mountain')
+        GROUP BY 1
+    ) t ON t.i = c.i;
+
+    -- Earlier cost-map entries take precedence over later ones
+    IF cost_map IS NOT NULL AND array_ndims(cost_map) = 2 THEN
+        FOR s IN REVERSE array_upper(cost_map, 1)..array_lower(cost_map, 1) LOOP
+            cx := cost_map[s][1];
+            cy := cost_map[s][2];
+            IF cx BETWEEN min_x AND max_x AND cy BETWEEN min_y AND max_y
+               AND step[(cx - min_x) * h + (cy - min_y) + 1] IS NOT NULL THEN
+                step[(cx - min_x) * h + (cy - min_y) + 1] :=
+                    COALESCE(cost_map[s][3], 1);
+            END IF;
+        END LOOP;
+    END IF;
+END;
+$$ LANGUAGE plpgsql STABLE;
 
 CREATE OR REPLACE FUNCTION find_route(
     start_x integer,
@@ -10,84 +66,156 @@ CREATE OR REPLACE FUNCTION find_route(
 )
 RETURNS integer[][] AS $$
 DECLARE
-    cur RECORD;
-    nbr RECORD;
-    path integer[][] := ARRAY[]::integer[][];
-    step_cost integer;
-    terrain_type text;
+    min_x integer;
+    min_y integer;
+    max_x integer;
+    max_y integer;
+    h integer;
+    step integer[];        -- cost of entering each cell, NULL if impassable
+    g integer[];           -- best known cost from the start
+    parent integer[];      -- previous cell on the best known path
+    closed boolean[];
+    heap_key bigint[] := '{}';  -- (f << 32) | heuristic
+    heap_seq integer[] := '{}';
+    heap_node integer[] := '{}';
+    heap_size integer := 0;
+    seq integer := 0;
+    pos integer;
+    child integer;
+    key bigint;
+    key_seq integer;
+    key_node integer;
+    goal integer;
+    cur integer;
+    nbr integer;
+    cx integer;
+    cy integer;
+    nx integer;
+    ny integer;
+    ng integer;
+    dist integer;
+    d integer;
+    path_x integer[] := '{}';
+    path_y integer[] := '{}';
+    path integer[][];
 BEGIN
-    DROP TABLE IF EXISTS tmp_open;
-    CREATE TEMP TABLE tmp_open(
-        x int,
-        y int,
-        cost int,
-        priority int
-    ) ON COMMIT DROP;
-    DROP TABLE IF EXISTS tmp_came;
-    CREATE TEMP TABLE tmp_came(
-        x int,
-        y int,
-        prev_x int,
-        prev_y int,
-        cost int
-    ) ON COMMIT DROP;
-
-    INSERT INTO tmp_open VALUES (start_x, start_y, 0,
-        abs(start_x - end_x) + abs(start_y - end_y));
-    INSERT INTO tmp_came VALUES (start_x, start_y, NULL, NULL, 0);
+    IF start_x = end_x AND start_y = end_y THEN
+        RETURN ARRAY[ARRAY[start_x, start_y]];
+    END IF;
+
+    SELECT * INTO min_x, min_y, max_x, max_y, step FROM terrain_grid(cost_map);
+    -- The start tile need not be passable, only inside the bordered grid
+    IF min_x IS NULL
+       OR start_x NOT BETWEEN min_x AND max_x
+       OR start_y NOT BETWEEN min_y AND max_y
+       OR end_x NOT BETWEEN min_x AND max_x
+       OR end_y NOT BETWEEN min_y AND max_y THEN
+        RETURN ARRAY[]::integer[][];
+    END IF;
+    h := max_y - min_y + 1;
+
+    g := array_fill(NULL::integer, ARRAY[array_length(step, 1)]);
+    parent := array_fill(0, ARRAY[array_length(step, 1)]);
+    closed := array_fill(false, ARRAY[array_length(step, 1)]);
+
+    goal := (end_x - min_x) * h + (end_y - min_y) + 1;
+    IF step[goal] IS NULL THEN
+        RETURN ARRAY[]::integer[][];
+    END IF;
+    cur := (start_x - min_x) * h + (start_y - min_y) + 1;
+    dist := abs(start_x - end_x) + abs(start_y - end_y);
+    g[cur] := 0;
+    heap_key[1] := (dist::bigint << 32) | dist;
+    heap_seq[1] := 0;
+    heap_node[1] := cur;
+    heap_size := 1;
 
     LOOP
-        SELECT * INTO cur FROM tmp_open ORDER BY priority LIMIT 1;
-        IF NOT FOUND THEN
+        IF heap_size = 0 THEN
             RETURN ARRAY[]::integer[][];
         END IF;
-        DELETE FROM tmp_open WHERE x = cur.x AND y = cur.y AND cost = cur.cost AND priority = cur.priority;
-        EXIT WHEN cur.x = end_x AND cur.y = end_y;
-
-        FOR nbr IN
-            SELECT cur.x + 1 AS x, cur.y AS y
-            UNION ALL SELECT cur.x - 1, cur.y
-            UNION ALL SELECT cur.x, cur.y + 1
-            UNION ALL SELECT cur.x, cur.y - 1
-        LOOP
-            SELECT type INTO terrain_type
-            FROM terrain
-            WHERE tile_x = nbr.x AND tile_y = nbr.y;
-            IF terrain_type IS NULL OR terrain_type IN ('water', 'mountain') THEN
-                CONTINUE;
-            END IF;
 
-            step_cost := 1;
-            IF cost_map IS NOT NULL THEN
-                SELECT cost_map[s][3] INTO step_cost
-                FROM generate_subscripts(cost_map, 1) AS s
-                WHERE cost_map[s][1] = nbr.x AND cost_map[s][2] = nbr.y;
-                step_cost := COALESCE(step_cost, 1);
-            END IF;
+        -- Pop the minimum and sift the last entry down from the root
+        cur := heap_node[1];
+        key := heap_key[heap_size];
+        key_seq := heap_seq[heap_size];
+        key_node := heap_node[heap_size];
+        heap_size := heap_size - 1;
+        IF heap_size > 0 THEN
+            pos := 1;
+            LOOP
+                child := pos * 2;
+                EXIT WHEN child > heap_size;
+                IF child < heap_size
+                   AND (heap_key[child + 1] < heap_key[child]
+                        OR (heap_key[child + 1] = heap_key[child]
+                            AND heap_seq[child + 1] < heap_seq[child])) THEN
+                    child := child + 1;
+                END IF;
+                EXIT WHEN key < heap_key[child]
+                    OR (key = heap_key[child] AND key_seq < heap_seq[child]);
+                heap_key[pos] := heap_key[child];
+                heap_seq[pos] := heap_seq[child];
+                heap_node[pos] := heap_node[child];
+                pos := child;
+            END LOOP;
+            heap_key[pos] := key;
+            heap_seq[pos] := key_seq;
+            heap_node[pos] := key_node;
+        END IF;
 
-            IF NOT EXISTS (SELECT 1 FROM tmp_came WHERE x = nbr.x AND y = nbr.y) THEN
-                INSERT INTO tmp_came VALUES (nbr.x, nbr.y, cur.x, cur.y, cur.cost + step_cost);
-                INSERT INTO tmp_open VALUES (
-                    nbr.x,
-                    nbr.y,
-                    cur.cost + step_cost,
-                    cur.cost + step_cost + abs(nbr.x - end_x) + abs(nbr.y - end_y)
-                );
-            END IF;
+        CONTINUE WHEN closed[cur];
+        closed[cur] := true;
+        EXIT WHEN cur = goal;
+
+        cx := (cur - 1) / h + min_x;
+        cy := (cur - 1) % h + min_y;
+        FOR d IN 1..4 LOOP
+            nx := cx + CASE d WHEN 1 THEN 1 WHEN 2 THEN -1 ELSE 0 END;
+            ny := cy + CASE d WHEN 3 THEN 1 WHEN 4 THEN -1 ELSE 0 END;
+            CONTINUE WHEN nx < min_x OR nx > max_x OR ny < min_y OR ny > max_y;
+            nbr := (nx - min_x) * h + (ny - min_y) + 1;
+            CONTINUE WHEN step[nbr] IS NULL OR closed[nbr];
+
+            ng := g[cur] + step[nbr];
+            CONTINUE WHEN g[nbr] IS NOT NULL AND g[nbr] <= ng;
+            g[nbr] := ng;
+            parent[nbr] := cur;
+
+            -- Push the neighbour and sift it up towards the root
+            dist := abs(nx - end_x) + abs(ny - end_y);
+            key := ((ng + dist)::bigint << 32) | dist;
+            seq := seq + 1;
+            heap_size := heap_size + 1;
+            pos := heap_size;
+            WHILE pos > 1 LOOP
+                child := pos / 2;
+                EXIT WHEN heap_key[child] < key
+                    OR (heap_key[child] = key AND heap_seq[child] < seq);
+                heap_key[pos] := heap_key[child];
+                heap_seq[pos] := heap_seq[child];
+                heap_node[pos] := heap_node[child];
+                pos := child;
+            END LOOP;
+            heap_key[pos] := key;
+            heap_seq[pos] := seq;
+            heap_node[pos] := nbr;
         END LOOP;
     END LOOP;
 
-    cur.x := end_x;
-    cur.y := end_y;
+    -- Walk back from the goal, then emit the path start-first
+    cur := goal;
     LOOP
-        path := ARRAY[ARRAY[cur.x, cur.y]] || path;
-        EXIT WHEN cur.x = start_x AND cur.y = start_y;
-        SELECT prev_x, prev_y INTO cur.x, cur.y FROM tmp_came WHERE x = cur.x AND y = cur.y;
-        IF cur.x IS NULL THEN
-            RETURN ARRAY[]::integer[][];
-        END IF;
+        path_x := path_x || ((cur - 1) / h + min_x);
+        path_y := path_y || ((cur - 1) % h + min_y);
+        EXIT WHEN parent[cur] = 0;
+        cur := parent[cur];
     END LOOP;
 
+    SELECT array_agg(ARRAY[path_x[i], path_y[i]] ORDER BY i DESC)
+    INTO path
+    FROM generate_subscripts(path_x, 1) AS i;
+
     RETURN path;
 END;
 $$ LANGUAGE plpgsql;
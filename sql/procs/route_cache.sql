@@ -0,0 +1,104 @@
+-- Route caching
+-- cached_route() returns find_route() results from route_cache while the
+-- terrain is unchanged. Any insert, delete or truncate on terrain, or an
+-- update of its position or type columns, bumps game_state.terrain_version
+-- and so invalidates every cached route.
+
+CREATE OR REPLACE FUNCTION bump_terrain_version()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE game_state SET terrain_version = terrain_version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS terrain_version_bump ON terrain;
+CREATE TRIGGER terrain_version_bump
+AFTER INSERT OR UPDATE OF tile_x, tile_y, type OR DELETE OR TRUNCATE ON terrain
+FOR EACH STATEMENT EXECUTE FUNCTION bump_terrain_version();
+
+CREATE OR REPLACE FUNCTION cached_route(
+    start_x integer,
+    start_y integer,
+    end_x integer,
+    end_y integer,
+    cost_map integer[][] DEFAULT NULL
+)
+RETURNS integer[][] AS $$
+DECLARE
+    version bigint;
+    tick bigint;
+    cm_hash text := COALESCE(md5(cost_map::text), '');
+    hit route_cache%ROWTYPE;
+    path integer[][];
+BEGIN
+    SELECT gs.terrain_version, gs.current_tick INTO version, tick
+    FROM game_state gs ORDER BY gs.id LIMIT 1;
+    version := COALESCE(version, 0);
+    tick := COALESCE(tick, 0);
+
+    SELECT * INTO hit
+    FROM route_cache rc
+    WHERE rc.start_x = cached_route.start_x
+      AND rc.start_y = cached_route.start_y
+      AND rc.end_x = cached_route.end_x
+      AND rc.end_y = cached_route.end_y
+      AND rc.cost_map_hash = cm_hash;
+
+    IF FOUND AND hit.terrain_version = version THEN
+        -- Touch at most once per tick to keep hits cheap
+        IF hit.last_used_tick < tick THEN
+            UPDATE route_cache rc
+            SET last_used_tick = tick
+            WHERE rc.start_x = cached_route.start_x
+              AND rc.start_y = cached_route.start_y
+              AND rc.end_x = cached_route.end_x
+              AND rc.end_y = cached_route.end_y
+              AND rc.cost_map_hash = cm_hash;
+        END IF;
+        RETURN hit.path;
+    END IF;
+
+    path := find_route(start_x, start_y, end_x, end_y, cost_map);
+
+    INSERT INTO route_cache AS rc (
+        start_x, start_y, end_x, end_y, cost_map_hash,
+        terrain_version, path, last_used_tick
+    )
+    VALUES (start_x, start_y, end_x, end_y, cm_hash, version, path, tick)
+    ON CONFLICT ON CONSTRAINT route_cache_pkey DO UPDATE
+    SET terrain_version = EXCLUDED.terrain_version,
+        path = EXCLUDED.path,
+        last_used_tick = EXCLUDED.last_used_tick;
+
+    RETURN path;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop routes computed for old terrain and keep at most max_entries of the
+-- most recently used ones. Returns the number of routes evicted.
+CREATE OR REPLACE FUNCTION evict_routes(max_entries integer DEFAULT 10000)
+RETURNS integer AS $$
+DECLARE
+    version bigint;
+    stale integer;
+    excess integer;
+BEGIN
+    SELECT gs.terrain_version INTO version
+    FROM game_state gs ORDER BY gs.id LIMIT 1;
+
+    DELETE FROM route_cache
+    WHERE terrain_version <> COALESCE(version, 0);
+    GET DIAGNOSTICS stale = ROW_COUNT;
+
+    DELETE FROM route_cache
+    WHERE ctid IN (
+        SELECT ctid FROM route_cache
+        ORDER BY last_used_tick DESC
+        OFFSET max_entries
+    );
+    GET DIAGNOSTICS excess = ROW_COUNT;
+
+    RETURN stale + excess;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,24 @@
+-- Table snapshots
+-- Store the rows of each named table as a JSON array in tick_snapshots,
+-- keyed by the current tick. Used by fast-forward runs to record how the
+-- simulation evolves without stopping at every tick.
+CREATE OR REPLACE PROCEDURE snapshot_tables(names text[])
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    tick BIGINT;
+    name TEXT;
+    data JSONB;
+BEGIN
+    SELECT current_tick INTO tick FROM game_state ORDER BY id LIMIT 1;
+
+    FOREACH name IN ARRAY names LOOP
+        EXECUTE format('SELECT COALESCE(jsonb_agg(t), ''[]'') FROM %I t', name)
+        INTO data;
+        INSERT INTO tick_snapshots AS s (tick, table_name, data)
+        VALUES (COALESCE(tick, 0), name, data)
+        ON CONFLICT ON CONSTRAINT tick_snapshots_pkey DO UPDATE
+        SET data = EXCLUDED.data;
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,112 @@
+-- Spatial lookups of vehicles
+-- vehicle_cells files every vehicle under the 16x16 cell holding it. The
+-- triggers below keep it current for every writer of vehicles, including
+-- move_vehicles(). The update trigger only fires for a vehicle that crosses
+-- into another cell, about one move in sixteen. The lookups find the cells
+-- overlapping the area through the cell index and then check the exact
+-- position of the few vehicles filed there, instead of scanning vehicles.
+
+-- Cell holding a tile coordinate; positions are never negative
+CREATE OR REPLACE FUNCTION vehicle_cell(coord integer)
+RETURNS integer
+AS 'SELECT coord / 16'
+LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE OR REPLACE FUNCTION maintain_vehicle_cells()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        UPDATE vehicle_cells
+        SET cell_x = vehicle_cell(NEW.x), cell_y = vehicle_cell(NEW.y)
+        WHERE vehicle_id = NEW.id;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO vehicle_cells (vehicle_id, cell_x, cell_y)
+        SELECT id, vehicle_cell(x), vehicle_cell(y)
+        FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        DELETE FROM vehicle_cells c
+        USING old_rows o
+        WHERE c.vehicle_id = o.id;
+    ELSE
+        TRUNCATE vehicle_cells;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS vehicles_cells_ins ON vehicles;
+CREATE TRIGGER vehicles_cells_ins
+AFTER INSERT ON vehicles
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION maintain_vehicle_cells();
+
+DROP TRIGGER IF EXISTS vehicles_cells_del ON vehicles;
+CREATE TRIGGER vehicles_cells_del
+AFTER DELETE ON vehicles
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION maintain_vehicle_cells();
+
+DROP TRIGGER IF EXISTS vehicles_cells_truncate ON vehicles;
+CREATE TRIGGER vehicles_cells_truncate
+AFTER TRUNCATE ON vehicles
+FOR EACH STATEMENT EXECUTE FUNCTION maintain_vehicle_cells();
+
+-- Per row, but the WHEN clause is checked without calling the function, so
+-- moves within a cell cost next to nothing
+DROP TRIGGER IF EXISTS vehicles_cells_upd ON vehicles;
+CREATE TRIGGER vehicles_cells_upd
+AFTER UPDATE OF x, y ON vehicles
+FOR EACH ROW
+WHEN (
+    vehicle_cell(OLD.x) <> vehicle_cell(NEW.x)
+    OR vehicle_cell(OLD.y) <> vehicle_cell(NEW.y)
+)
+EXECUTE FUNCTION maintain_vehicle_cells();
+
+-- Refile every vehicle, e.g. after loading vehicles with triggers disabled.
+-- Returns the number of vehicles filed.
+CREATE OR REPLACE FUNCTION refresh_vehicle_cells()
+RETURNS integer AS $$
+DECLARE
+    filed integer;
+BEGIN
+    TRUNCATE vehicle_cells;
+    INSERT INTO vehicle_cells (vehicle_id, cell_x, cell_y)
+    SELECT id, vehicle_cell(x), vehicle_cell(y)
+    FROM vehicles;
+    GET DIAGNOSTICS filed = ROW_COUNT;
+    ANALYZE vehicle_cells;
+    RETURN filed;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Vehicles inside the rectangle, bounds included
+CREATE OR REPLACE FUNCTION vehicles_in_rect(
+    x_min integer, x_max integer, y_min integer, y_max integer
+)
+RETURNS SETOF vehicles AS $$
+    SELECT v.*
+    FROM vehicle_cells c
+    JOIN vehicles v ON v.id = c.vehicle_id
+    WHERE c.cell_x BETWEEN vehicle_cell(x_min) AND vehicle_cell(x_max)
+      AND c.cell_y BETWEEN vehicle_cell(y_min) AND vehicle_cell(y_max)
+      AND v.x BETWEEN x_min AND x_max
+      AND v.y BETWEEN y_min AND y_max
+$$ LANGUAGE sql STABLE;
+
+-- Vehicles on one tile
+CREATE OR REPLACE FUNCTION vehicles_at(px integer, py integer)
+RETURNS SETOF vehicles AS $$
+    SELECT * FROM vehicles_in_rect(px, px, py, py)
+$$ LANGUAGE sql STABLE;
+
+-- Vehicles within radius tiles of (cx, cy), by straight-line distance
+CREATE OR REPLACE FUNCTION vehicles_within(
+    cx integer, cy integer, radius integer
+)
+RETURNS SETOF vehicles AS $$
+    SELECT *
+    FROM vehicles_in_rect(cx - radius, cx + radius, cy - radius, cy + radius) v
+    WHERE (v.x - cx)::bigint * (v.x - cx) + (v.y - cy)::bigint * (v.y - cy)
+          <= radius::bigint * radius
+$$ LANGUAGE sql STABLE;
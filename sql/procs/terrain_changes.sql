@@ -0,0 +1,56 @@
+-- Terrain change tracking
+-- The current tick lives only in game_state. When the terrain of a tile
+-- changes, stamp the matching tiles row with the current tick so that
+-- renderers fetching tiles by updated_tick pick it up, instead of stamping
+-- every terrain row on every tick.
+
+CREATE OR REPLACE FUNCTION stamp_terrain_change()
+RETURNS trigger AS $$
+DECLARE
+    tick bigint := COALESCE(
+        (SELECT current_tick FROM game_state ORDER BY id LIMIT 1),
+        0
+    );
+BEGIN
+    IF TG_LEVEL = 'ROW' THEN
+        -- An update may move a terrain row, so stamp both of its tiles
+        UPDATE tiles t
+        SET updated_tick = tick
+        WHERE (t.x = OLD.tile_x AND t.y = OLD.tile_y)
+           OR (t.x = NEW.tile_x AND t.y = NEW.tile_y);
+    ELSIF TG_OP = 'INSERT' THEN
+        UPDATE tiles t
+        SET updated_tick = tick
+        FROM (SELECT DISTINCT tile_x, tile_y FROM new_rows) c
+        WHERE t.x = c.tile_x AND t.y = c.tile_y;
+    ELSE
+        UPDATE tiles t
+        SET updated_tick = tick
+        FROM (SELECT DISTINCT tile_x, tile_y FROM old_rows) c
+        WHERE t.x = c.tile_x AND t.y = c.tile_y;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS terrain_stamp_insert ON terrain;
+CREATE TRIGGER terrain_stamp_insert
+AFTER INSERT ON terrain
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION stamp_terrain_change();
+
+DROP TRIGGER IF EXISTS terrain_stamp_delete ON terrain;
+CREATE TRIGGER terrain_stamp_delete
+AFTER DELETE ON terrain
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION stamp_terrain_change();
+
+DROP TRIGGER IF EXISTS terrain_stamp_update ON terrain;
+CREATE TRIGGER terrain_stamp_update
+AFTER UPDATE OF tile_x, tile_y, type ON terrain
+FOR EACH ROW
+WHEN (
+    (OLD.tile_x, OLD.tile_y, OLD.type)
+    IS DISTINCT FROM (NEW.tile_x, NEW.tile_y, NEW.type)
+)
+EXECUTE FUNCTION stamp_terrain_change();
@@ -1,15 +1,89 @@
-CREATE OR REPLACE PROCEDURE tick()
+-- Advance the game by n ticks. Each tick bumps the global tick counter, the
+-- only per-tick write that does not depend on activity, and runs the enabled
+-- tick_stages in order, recording how long each stage took in tick_stats,
+-- which the default prune_tick_stats stage keeps to the most recent ticks.
+-- Stages named in skip are left out, for callers such as pgttd.parallel_tick
+-- that run them separately.
+DROP PROCEDURE IF EXISTS tick();
+CREATE OR REPLACE PROCEDURE tick(
+    n integer DEFAULT 1,
+    skip text[] DEFAULT '{}'
+)
 LANGUAGE plpgsql
 AS $$
 DECLARE
-    new_tick INT;
+    new_tick BIGINT;
+    stage RECORD;
+    started TIMESTAMPTZ;
 BEGIN
-    -- Advance global tick counter
-    UPDATE game_state
-    SET current_tick = current_tick + 1
-    RETURNING current_tick INTO new_tick;
+    FOR i IN 1..n LOOP
+        -- Advance global tick counter
+        UPDATE game_state
+        SET current_tick = current_tick + 1
+        RETURNING current_tick INTO new_tick;
+        IF new_tick IS NULL THEN
+            RAISE EXCEPTION 'no game_state row; run new_game() first';
+        END IF;
 
-    -- Example time-dependent update: mark terrain with latest tick
-    UPDATE terrain SET updated_tick = new_tick;
+        FOR stage IN
+            SELECT s.name, s.command
+            FROM tick_stages s
+            WHERE s.enabled AND s.name <> ALL (skip)
+            ORDER BY s.position
+        LOOP
+            started := clock_timestamp();
+            EXECUTE stage.command;
+            INSERT INTO tick_stats (tick, stage, duration_ms)
+            VALUES (
+                new_tick,
+                stage.name,
+                EXTRACT(EPOCH FROM clock_timestamp() - started) * 1000
+            );
+        END LOOP;
+    END LOOP;
+END;
+$$;
+
+-- Delete the stage timings of all but the last keep_ticks ticks. Returns the
+-- number of rows deleted.
+CREATE OR REPLACE FUNCTION prune_tick_stats(keep_ticks integer DEFAULT 1000)
+RETURNS integer AS $$
+DECLARE
+    pruned integer;
+BEGIN
+    DELETE FROM tick_stats
+    WHERE tick <= (SELECT max(current_tick) FROM game_state) - keep_ticks;
+    GET DIAGNOSTICS pruned = ROW_COUNT;
+    RETURN pruned;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Run n ticks with one call, committing every commit_every ticks so dead
+-- row versions from earlier ticks can be pruned, and snapshotting the named
+-- tables (see snapshot_tables()) after each commit. Must be called outside
+-- an explicit transaction block.
+CREATE OR REPLACE PROCEDURE fast_forward(
+    n integer,
+    commit_every integer DEFAULT 1,
+    snapshot text[] DEFAULT '{}'
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    done integer := 0;
+    size integer;
+BEGIN
+    IF commit_every < 1 THEN
+        RAISE EXCEPTION 'commit_every must be positive';
+    END IF;
+    WHILE done < n LOOP
+        size := LEAST(commit_every, n - done);
+        CALL tick(size);
+        done := done + size;
+        IF cardinality(snapshot) > 0 THEN
+            CALL snapshot_tables(snapshot);
+        END IF;
+        COMMIT;
+    END LOOP;
 END;
 $$;
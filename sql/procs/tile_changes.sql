@@ -0,0 +1,19 @@
+-- Tile change tracking
+-- Stamp every inserted or modified tile with the current game tick so
+-- renderers can fetch only the tiles that changed since they last looked.
+
+CREATE OR REPLACE FUNCTION stamp_tile_change()
+RETURNS trigger AS $$
+BEGIN
+    NEW.updated_tick := COALESCE(
+        (SELECT current_tick FROM game_state ORDER BY id LIMIT 1),
+        0
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tiles_stamp_change ON tiles;
+CREATE TRIGGER tiles_stamp_change
+BEFORE INSERT OR UPDATE ON tiles
+FOR EACH ROW EXECUTE FUNCTION stamp_tile_change();
@@ -1,5 +1,5 @@
 -- Vehicle movement procedures
--- Move a single vehicle along a path computed by find_route.
+-- Move a single vehicle along a path from cached_route.
 
 CREATE OR REPLACE FUNCTION move_vehicle(
     vehicle_id integer,
@@ -13,7 +13,7 @@ DECLARE
     path integer[][];
     next_idx integer;
 BEGIN
-    path := find_route(start_x, start_y, end_x, end_y);
+    path := cached_route(start_x, start_y, end_x, end_y);
     IF array_length(path, 1) IS NULL THEN
         RETURN;
     END IF;
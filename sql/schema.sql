@@ -1,9 +1,38 @@
 -- Auto-generated; do not edit directly.
 
--- Table definition for terrain types
+-- Terrain: named terrain types, and the terrain of each map cell as read by
+-- pathfinding and tracked by the route cache and tile change triggers
 CREATE TABLE IF NOT EXISTS terrain (
     id SERIAL PRIMARY KEY,
-    name TEXT NOT NULL UNIQUE
+    name TEXT UNIQUE,
+    tile_x INTEGER,
+    tile_y INTEGER,
+    type TEXT
+);
+
+-- Databases created when terrain only held named types
+ALTER TABLE terrain
+    ALTER COLUMN name DROP NOT NULL,
+    ADD COLUMN IF NOT EXISTS tile_x INTEGER,
+    ADD COLUMN IF NOT EXISTS tile_y INTEGER,
+    ADD COLUMN IF NOT EXISTS type TEXT;
+
+-- Dropped while new_game() loads a world and rebuilt by index_world()
+CREATE INDEX IF NOT EXISTS terrain_tile_idx ON terrain (tile_x, tile_y);
+
+-- Sprite images, stored once per distinct PNG and keyed by its SHA-256
+CREATE TABLE IF NOT EXISTS sprite_images (
+    sha256 BYTEA PRIMARY KEY,
+    image BYTEA NOT NULL
+);
+
+-- Sprites, with the glyph and color text renderers draw them as
+CREATE TABLE IF NOT EXISTS sprites (
+    id SERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    glyph TEXT NOT NULL DEFAULT '?',
+    color TEXT NOT NULL DEFAULT 'white',
+    image_sha256 BYTEA NOT NULL REFERENCES sprite_images (sha256)
 );
 
 -- Grid tiles referencing terrain
@@ -12,9 +41,21 @@ CREATE TABLE IF NOT EXISTS tiles (
     x INTEGER NOT NULL,
     y INTEGER NOT NULL,
     terrain_id INTEGER NOT NULL REFERENCES terrain (id),
+    -- What renderers draw on the tile
+    sprite_id INTEGER REFERENCES sprites (id),
+    updated_tick BIGINT NOT NULL DEFAULT 0,
     UNIQUE (x, y)
 );
 
+-- Databases created before tiles had sprites
+ALTER TABLE tiles ADD COLUMN IF NOT EXISTS sprite_id INTEGER REFERENCES sprites (id);
+
+-- Databases created before tile changes were stamped
+ALTER TABLE tiles ADD COLUMN IF NOT EXISTS updated_tick BIGINT NOT NULL DEFAULT 0;
+
+-- Renderers poll for tiles changed since the last tick they saw
+CREATE INDEX IF NOT EXISTS tiles_updated_tick_idx ON tiles (updated_tick);
+
 -- Companies table for vehicle ownership and accounting
 CREATE TABLE IF NOT EXISTS companies (
     id SERIAL PRIMARY KEY,
@@ -32,17 +73,99 @@ CREATE TABLE IF NOT EXISTS industries (
     company_id INTEGER REFERENCES companies (id)
 );
 
+-- render_frame() looks up the industries of each tile it draws
+CREATE INDEX IF NOT EXISTS industries_tile_idx ON industries (tile_id);
+
 -- Table definition for vehicles
 CREATE TABLE IF NOT EXISTS vehicles (
     id SERIAL PRIMARY KEY,
     x INTEGER NOT NULL,
     y INTEGER NOT NULL,
+    CONSTRAINT non_negative_position CHECK (x >= 0 AND y >= 0),
     schedule JSONB NOT NULL DEFAULT '[]'::JSONB,
+    -- Waypoint coordinates unpacked from schedule for move_vehicles()
+    schedule_x INTEGER [] NOT NULL DEFAULT '{}',
+    schedule_y INTEGER [] NOT NULL DEFAULT '{}',
+    schedule_len INTEGER NOT NULL DEFAULT 0,
     schedule_idx INTEGER NOT NULL DEFAULT 0,
+    next_waypoint_idx INTEGER NOT NULL DEFAULT 1,
+    CONSTRAINT schedule_idx_within_bounds
+    CHECK (
+        schedule_idx >= 0
+        AND schedule_idx < GREATEST(schedule_len, 1)
+    ),
     cargo JSONB NOT NULL DEFAULT '[]'::JSONB,
     company_id INTEGER REFERENCES companies (id)
+)
+-- Leave room on each page so per-tick position updates can be HOT updates.
+-- Avoid indexing x, y or schedule_idx, which would rule HOT updates out.
+WITH (fillfactor = 70);
+
+-- Tables created with the default fillfactor of 100. Only pages written from
+-- now on keep the free space; a VACUUM FULL rewrites the existing ones.
+ALTER TABLE vehicles SET (fillfactor = 70);
+
+-- Keep the unpacked waypoint columns in step with schedule. The trigger only
+-- fires when schedule is written, so per-tick movement never parses JSON.
+CREATE OR REPLACE FUNCTION unpack_vehicle_schedule()
+RETURNS trigger AS $$
+BEGIN
+    SELECT
+        COALESCE(array_agg((w ->> 'x')::int ORDER BY i), '{}'),
+        COALESCE(array_agg((w ->> 'y')::int ORDER BY i), '{}'),
+        count(*)
+    INTO NEW.schedule_x, NEW.schedule_y, NEW.schedule_len
+    FROM jsonb_array_elements(NEW.schedule) WITH ORDINALITY AS s (w, i);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS vehicles_unpack_schedule ON vehicles;
+CREATE TRIGGER vehicles_unpack_schedule
+BEFORE INSERT OR UPDATE OF schedule ON vehicles
+FOR EACH ROW EXECUTE FUNCTION unpack_vehicle_schedule();
+
+-- Databases created before schedules were unpacked: add the columns, fill
+-- them through the trigger above and bound schedule_idx by schedule_len
+-- instead of the JSON length. Running this again does nothing.
+ALTER TABLE vehicles
+    ADD COLUMN IF NOT EXISTS schedule_x INTEGER [] NOT NULL DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS schedule_y INTEGER [] NOT NULL DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS schedule_len INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS next_waypoint_idx INTEGER NOT NULL DEFAULT 1;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'vehicles'::regclass
+          AND conname = 'schedule_idx_within_bounds'
+          AND pg_get_constraintdef(oid) LIKE '%schedule_len%'
+    ) THEN
+        UPDATE vehicles SET schedule = schedule;
+        ALTER TABLE vehicles
+            DROP CONSTRAINT IF EXISTS schedule_idx_within_bounds,
+            ADD CONSTRAINT schedule_idx_within_bounds
+            CHECK (
+                schedule_idx >= 0
+                AND schedule_idx < GREATEST(schedule_len, 1)
+            );
+    END IF;
+END$$;
+
+-- Coarse spatial index of vehicles, kept by the triggers in
+-- procs/spatial.sql. Each vehicle is filed under the 16x16 cell holding its
+-- tile. Indexing vehicles (x, y) directly would end HOT updates for every
+-- move; a row here only changes when its vehicle crosses into another cell.
+CREATE TABLE IF NOT EXISTS vehicle_cells (
+    vehicle_id INTEGER PRIMARY KEY,
+    cell_x INTEGER NOT NULL,
+    cell_y INTEGER NOT NULL
 );
 
+CREATE INDEX IF NOT EXISTS vehicle_cells_cell_idx
+ON vehicle_cells (cell_x, cell_y) INCLUDE (vehicle_id);
+
 -- Temporary storage for industry production results per tick
 CREATE TABLE IF NOT EXISTS industry_outputs (
     id SERIAL PRIMARY KEY,
@@ -63,16 +186,50 @@ CREATE TABLE IF NOT EXISTS game_state (
     id SERIAL PRIMARY KEY,
     current_tick BIGINT DEFAULT 0,
     seed BIGINT,
+    width INTEGER,
+    height INTEGER,
+    terrain_version BIGINT NOT NULL DEFAULT 0,
+    -- Bumped by every change to sprites, see sprites.sql
+    sprite_version BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Databases created before routes were cached per terrain version
+ALTER TABLE game_state
+    ADD COLUMN IF NOT EXISTS terrain_version BIGINT NOT NULL DEFAULT 0;
+
+-- Databases created before renderers cached sprites
+ALTER TABLE game_state
+    ADD COLUMN IF NOT EXISTS sprite_version BIGINT NOT NULL DEFAULT 0;
+
+-- Databases created before new_game() recorded the map size
+ALTER TABLE game_state
+    ADD COLUMN IF NOT EXISTS width INTEGER,
+    ADD COLUMN IF NOT EXISTS height INTEGER;
+
 -- Resources available in the world economy
 CREATE TABLE IF NOT EXISTS resources (
     id SERIAL PRIMARY KEY,
     name TEXT UNIQUE NOT NULL,
-    amount INTEGER NOT NULL DEFAULT 0
+    -- Fractional so that contended inputs can be shared proportionally
+    amount NUMERIC(18, 6) NOT NULL DEFAULT 0
 );
 
+-- Databases created while amounts were whole numbers; economy_tick()'s
+-- proportional shares would be rounded away on assignment
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'resources'
+          AND column_name = 'amount'
+          AND (data_type <> 'numeric' OR numeric_scale IS DISTINCT FROM 6)
+    ) THEN
+        ALTER TABLE resources ALTER COLUMN amount TYPE NUMERIC(18, 6);
+    END IF;
+END$$;
+
 -- Growth and decay rules for resources
 CREATE TABLE IF NOT EXISTS resource_rules (
     resource_id INTEGER PRIMARY KEY REFERENCES resources (id) ON DELETE CASCADE,
@@ -80,7 +237,9 @@ CREATE TABLE IF NOT EXISTS resource_rules (
     decay_rate INTEGER NOT NULL DEFAULT 0
 );
 
--- Industries that transform one resource into another
+-- Industries that transform resources into other resources. The input and
+-- output columns describe a single-input, single-output recipe; further
+-- inputs and outputs are listed in resource_industry_flows.
 CREATE TABLE IF NOT EXISTS resource_industries (
     id SERIAL PRIMARY KEY,
     name TEXT UNIQUE NOT NULL,
@@ -90,3 +249,126 @@ CREATE TABLE IF NOT EXISTS resource_industries (
     output_per_tick INTEGER NOT NULL DEFAULT 0
 );
 
+-- Additional inputs and outputs of resource industries
+CREATE TABLE IF NOT EXISTS resource_industry_flows (
+    industry_id INTEGER NOT NULL
+    REFERENCES resource_industries (id) ON DELETE CASCADE,
+    resource_id INTEGER NOT NULL REFERENCES resources (id),
+    is_input BOOLEAN NOT NULL,
+    per_tick INTEGER NOT NULL CHECK (per_tick > 0),
+    PRIMARY KEY (industry_id, resource_id, is_input)
+);
+
+CREATE INDEX IF NOT EXISTS resource_industry_flows_resource_idx
+ON resource_industry_flows (resource_id, is_input);
+
+-- Every input and output of every industry, whether given by the
+-- resource_industries columns or by resource_industry_flows. An input of 0
+-- per tick is kept: it still lets the industry run.
+CREATE OR REPLACE VIEW resource_industry_io AS
+SELECT id AS industry_id, input_resource_id AS resource_id,
+       true AS is_input, input_per_tick AS per_tick
+FROM resource_industries
+WHERE input_resource_id IS NOT NULL
+UNION ALL
+SELECT id, output_resource_id, false, output_per_tick
+FROM resource_industries
+WHERE output_resource_id IS NOT NULL AND output_per_tick > 0
+UNION ALL
+SELECT industry_id, resource_id, is_input, per_tick
+FROM resource_industry_flows;
+
+-- The rows of resource_industry_io grouped into production chain levels by
+-- refresh_industry_plan(). Emptied whenever industries or flows change.
+CREATE TABLE IF NOT EXISTS resource_industry_plan (
+    chain_level INTEGER,
+    industry_id INTEGER NOT NULL,
+    resource_id INTEGER NOT NULL,
+    is_input BOOLEAN NOT NULL,
+    per_tick INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS resource_industry_plan_level_idx
+ON resource_industry_plan (chain_level);
+
+-- Routes computed by find_route, reused until the terrain changes
+CREATE TABLE IF NOT EXISTS route_cache (
+    start_x INTEGER NOT NULL,
+    start_y INTEGER NOT NULL,
+    end_x INTEGER NOT NULL,
+    end_y INTEGER NOT NULL,
+    cost_map_hash TEXT NOT NULL DEFAULT '',
+    terrain_version BIGINT NOT NULL,
+    path INTEGER [] NOT NULL,
+    last_used_tick BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (start_x, start_y, end_x, end_y, cost_map_hash)
+);
+
+-- Least recently used routes are evicted first
+CREATE INDEX IF NOT EXISTS route_cache_last_used_idx
+ON route_cache (last_used_tick);
+
+-- Precomputed routes followed by move_vehicles_routed()
+CREATE TABLE IF NOT EXISTS vehicle_routes (
+    vehicle_id INTEGER PRIMARY KEY REFERENCES vehicles (id) ON DELETE CASCADE,
+    path INTEGER [] NOT NULL
+);
+
+-- Destinations with a precomputed flow field and the terrain version it
+-- was built for; NULL until refresh_flow_fields() first builds it
+CREATE TABLE IF NOT EXISTS flow_field_destinations (
+    dest_x INTEGER NOT NULL,
+    dest_y INTEGER NOT NULL,
+    terrain_version BIGINT,
+    PRIMARY KEY (dest_x, dest_y)
+);
+
+-- Next tile on a cheapest route from each tile to a destination. Tiles that
+-- cannot reach the destination have no row.
+CREATE TABLE IF NOT EXISTS flow_fields (
+    dest_x INTEGER NOT NULL,
+    dest_y INTEGER NOT NULL,
+    tile_x INTEGER NOT NULL,
+    tile_y INTEGER NOT NULL,
+    next_x INTEGER NOT NULL,
+    next_y INTEGER NOT NULL,
+    PRIMARY KEY (dest_x, dest_y, tile_x, tile_y),
+    FOREIGN KEY (dest_x, dest_y)
+    REFERENCES flow_field_destinations (dest_x, dest_y) ON DELETE CASCADE
+);
+
+-- Stages run by tick(), in ascending position. command is executed as-is.
+CREATE TABLE IF NOT EXISTS tick_stages (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL UNIQUE,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    command TEXT NOT NULL
+);
+
+-- Default pipeline
+INSERT INTO tick_stages (name, position, command) VALUES
+('economy_tick', 10, 'SELECT economy_tick()'),
+('refresh_flow_fields', 20, 'SELECT refresh_flow_fields(4)'),
+('move_vehicles', 30, 'CALL move_vehicles()'),
+('update_balances', 40, 'SELECT update_balances()'),
+('evict_routes', 50, 'SELECT evict_routes()'),
+('prune_tick_stats', 60, 'SELECT prune_tick_stats()')
+ON CONFLICT DO NOTHING;
+
+-- Time spent in each tick() stage, one row per stage per tick
+CREATE TABLE IF NOT EXISTS tick_stats (
+    tick BIGINT NOT NULL,
+    stage TEXT NOT NULL,
+    duration_ms DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (tick, stage)
+);
+
+-- Copies of selected tables taken by snapshot_tables(), one row per table
+-- per tick
+CREATE TABLE IF NOT EXISTS tick_snapshots (
+    tick BIGINT NOT NULL,
+    table_name TEXT NOT NULL,
+    data JSONB NOT NULL,
+    PRIMARY KEY (tick, table_name)
+);
+
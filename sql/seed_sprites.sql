@@ -1,12 +1,11 @@
-INSERT INTO sprites (name, image_base64) VALUES (
-    'red',
-    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGP4z8AAAAMBAQDJ/pLvAAAAAElFTkSuQmCC'
-);
-INSERT INTO sprites (name, image_base64) VALUES (
-    'green',
-    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGNg+M8AAAICAQB7CYF4AAAAAElFTkSuQmCC'
-);
-INSERT INTO sprites (name, image_base64) VALUES (
-    'blue',
-    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGNgYPgPAAEDAQAIicLsAAAAAElFTkSuQmCC'
-);
+BEGIN;
+CREATE TEMP TABLE sprite_load (name TEXT NOT NULL, image BYTEA NOT NULL) ON COMMIT DROP;
+CREATE TEMP TABLE sprite_seed (name TEXT NOT NULL, image_base64 TEXT NOT NULL) ON COMMIT DROP;
+COPY sprite_seed (name, image_base64) FROM STDIN;
+red	iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGP4z8AAAAMBAQDJ/pLvAAAAAElFTkSuQmCC
+green	iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGNg+M8AAAICAQB7CYF4AAAAAElFTkSuQmCC
+blue	iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGNgYPgPAAEDAQAIicLsAAAAAElFTkSuQmCC
+\.
+INSERT INTO sprite_load (name, image) SELECT name, decode(image_base64, 'base64') FROM sprite_seed;
+SELECT store_sprites();
+COMMIT;
@@ -1,5 +1,78 @@
-CREATE TABLE IF NOT EXISTS sprites (
-    id SERIAL PRIMARY KEY,
-    name TEXT UNIQUE NOT NULL,
-    image_base64 TEXT NOT NULL
-);
+-- Migrations, bulk loading and change tracking for the tables of
+-- tables/sprites.sql, which must be loaded first. Sprites that share an image
+-- (an atlas full of the same grass) share a sprite_images row.
+
+-- Sprites created before text renderers drew them lack a glyph and color
+ALTER TABLE sprites
+    ADD COLUMN IF NOT EXISTS glyph TEXT NOT NULL DEFAULT '?',
+    ADD COLUMN IF NOT EXISTS color TEXT NOT NULL DEFAULT 'white';
+
+-- Databases created before sprite_images keep their PNGs as base64 text in
+-- sprites.image_base64. Move them over; running this again does nothing.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'sprites'
+          AND column_name = 'image_base64'
+    ) THEN
+        INSERT INTO sprite_images (sha256, image)
+        SELECT DISTINCT sha256(png), png
+        FROM (
+            SELECT decode(image_base64, 'base64') AS png FROM sprites
+        ) decoded
+        ON CONFLICT (sha256) DO NOTHING;
+
+        ALTER TABLE sprites
+            ADD COLUMN image_sha256 BYTEA REFERENCES sprite_images (sha256);
+        UPDATE sprites
+        SET image_sha256 = sha256(decode(image_base64, 'base64'));
+        ALTER TABLE sprites
+            ALTER COLUMN image_sha256 SET NOT NULL,
+            DROP COLUMN image_base64;
+    END IF;
+END$$;
+
+-- Bulk loading: a client creates
+--   CREATE TEMP TABLE sprite_load (name TEXT NOT NULL, image BYTEA NOT NULL)
+--       ON COMMIT DROP
+-- fills it with COPY and calls store_sprites(). New images are added once,
+-- sprites are added or pointed at their new image by name, and the number of
+-- sprites added or changed is returned. The load table is emptied.
+CREATE OR REPLACE FUNCTION store_sprites()
+RETURNS integer AS $$
+DECLARE
+    stored integer;
+BEGIN
+    INSERT INTO sprite_images (sha256, image)
+    SELECT DISTINCT sha256(image), image FROM sprite_load
+    ON CONFLICT (sha256) DO NOTHING;
+
+    INSERT INTO sprites (name, image_sha256)
+    SELECT DISTINCT ON (name) name, sha256(image) FROM sprite_load
+    ORDER BY name
+    ON CONFLICT (name) DO UPDATE SET image_sha256 = excluded.image_sha256
+    WHERE sprites.image_sha256 <> excluded.image_sha256;
+    GET DIAGNOSTICS stored = ROW_COUNT;
+
+    TRUNCATE sprite_load;
+    RETURN stored;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Renderers keep a copy of this table and reload it when
+-- game_state.sprite_version moves. The version is a column rather than a
+-- sequence so that a change becomes visible together with the new sprites.
+CREATE OR REPLACE FUNCTION bump_sprite_version()
+RETURNS trigger AS $$
+BEGIN
+    UPDATE game_state SET sprite_version = sprite_version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sprites_version_bump ON sprites;
+CREATE TRIGGER sprites_version_bump
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON sprites
+FOR EACH STATEMENT EXECUTE FUNCTION bump_sprite_version();
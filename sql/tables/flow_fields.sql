@@ -0,0 +1,22 @@
+-- Destinations with a precomputed flow field and the terrain version it
+-- was built for; NULL until refresh_flow_fields() first builds it
+CREATE TABLE IF NOT EXISTS flow_field_destinations (
+    dest_x INTEGER NOT NULL,
+    dest_y INTEGER NOT NULL,
+    terrain_version BIGINT,
+    PRIMARY KEY (dest_x, dest_y)
+);
+
+-- Next tile on a cheapest route from each tile to a destination. Tiles that
+-- cannot reach the destination have no row.
+CREATE TABLE IF NOT EXISTS flow_fields (
+    dest_x INTEGER NOT NULL,
+    dest_y INTEGER NOT NULL,
+    tile_x INTEGER NOT NULL,
+    tile_y INTEGER NOT NULL,
+    next_x INTEGER NOT NULL,
+    next_y INTEGER NOT NULL,
+    PRIMARY KEY (dest_x, dest_y, tile_x, tile_y),
+    FOREIGN KEY (dest_x, dest_y)
+    REFERENCES flow_field_destinations (dest_x, dest_y) ON DELETE CASCADE
+);
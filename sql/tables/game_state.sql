@@ -3,5 +3,23 @@ CREATE TABLE IF NOT EXISTS game_state (
     id SERIAL PRIMARY KEY,
     current_tick BIGINT DEFAULT 0,
     seed BIGINT,
+    width INTEGER,
+    height INTEGER,
+    terrain_version BIGINT NOT NULL DEFAULT 0,
+    -- Bumped by every change to sprites, see sprites.sql
+    sprite_version BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
+
+-- Databases created before routes were cached per terrain version
+ALTER TABLE game_state
+    ADD COLUMN IF NOT EXISTS terrain_version BIGINT NOT NULL DEFAULT 0;
+
+-- Databases created before renderers cached sprites
+ALTER TABLE game_state
+    ADD COLUMN IF NOT EXISTS sprite_version BIGINT NOT NULL DEFAULT 0;
+
+-- Databases created before new_game() recorded the map size
+ALTER TABLE game_state
+    ADD COLUMN IF NOT EXISTS width INTEGER,
+    ADD COLUMN IF NOT EXISTS height INTEGER;
@@ -5,3 +5,6 @@ CREATE TABLE IF NOT EXISTS industries (
     tile_id INTEGER NOT NULL REFERENCES tiles (id),
     company_id INTEGER REFERENCES companies (id)
 );
+
+-- render_frame() looks up the industries of each tile it draws
+CREATE INDEX IF NOT EXISTS industries_tile_idx ON industries (tile_id);
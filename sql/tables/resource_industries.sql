@@ -1,4 +1,6 @@
--- Industries that transform one resource into another
+-- Industries that transform resources into other resources. The input and
+-- output columns describe a single-input, single-output recipe; further
+-- inputs and outputs are listed in resource_industry_flows.
 CREATE TABLE IF NOT EXISTS resource_industries (
     id SERIAL PRIMARY KEY,
     name TEXT UNIQUE NOT NULL,
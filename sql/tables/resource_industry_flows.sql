@@ -0,0 +1,41 @@
+-- Additional inputs and outputs of resource industries
+CREATE TABLE IF NOT EXISTS resource_industry_flows (
+    industry_id INTEGER NOT NULL
+    REFERENCES resource_industries (id) ON DELETE CASCADE,
+    resource_id INTEGER NOT NULL REFERENCES resources (id),
+    is_input BOOLEAN NOT NULL,
+    per_tick INTEGER NOT NULL CHECK (per_tick > 0),
+    PRIMARY KEY (industry_id, resource_id, is_input)
+);
+
+CREATE INDEX IF NOT EXISTS resource_industry_flows_resource_idx
+ON resource_industry_flows (resource_id, is_input);
+
+-- Every input and output of every industry, whether given by the
+-- resource_industries columns or by resource_industry_flows. An input of 0
+-- per tick is kept: it still lets the industry run.
+CREATE OR REPLACE VIEW resource_industry_io AS
+SELECT id AS industry_id, input_resource_id AS resource_id,
+       true AS is_input, input_per_tick AS per_tick
+FROM resource_industries
+WHERE input_resource_id IS NOT NULL
+UNION ALL
+SELECT id, output_resource_id, false, output_per_tick
+FROM resource_industries
+WHERE output_resource_id IS NOT NULL AND output_per_tick > 0
+UNION ALL
+SELECT industry_id, resource_id, is_input, per_tick
+FROM resource_industry_flows;
+
+-- The rows of resource_industry_io grouped into production chain levels by
+-- refresh_industry_plan(). Emptied whenever industries or flows change.
+CREATE TABLE IF NOT EXISTS resource_industry_plan (
+    chain_level INTEGER,
+    industry_id INTEGER NOT NULL,
+    resource_id INTEGER NOT NULL,
+    is_input BOOLEAN NOT NULL,
+    per_tick INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS resource_industry_plan_level_idx
+ON resource_industry_plan (chain_level);
@@ -2,5 +2,21 @@
 CREATE TABLE IF NOT EXISTS resources (
     id SERIAL PRIMARY KEY,
     name TEXT UNIQUE NOT NULL,
-    amount INTEGER NOT NULL DEFAULT 0
+    -- Fractional so that contended inputs can be shared proportionally
+    amount NUMERIC(18, 6) NOT NULL DEFAULT 0
 );
+
+-- Databases created while amounts were whole numbers; economy_tick()'s
+-- proportional shares would be rounded away on assignment
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'resources'
+          AND column_name = 'amount'
+          AND (data_type <> 'numeric' OR numeric_scale IS DISTINCT FROM 6)
+    ) THEN
+        ALTER TABLE resources ALTER COLUMN amount TYPE NUMERIC(18, 6);
+    END IF;
+END$$;
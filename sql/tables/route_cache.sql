@@ -0,0 +1,16 @@
+-- Routes computed by find_route, reused until the terrain changes
+CREATE TABLE IF NOT EXISTS route_cache (
+    start_x INTEGER NOT NULL,
+    start_y INTEGER NOT NULL,
+    end_x INTEGER NOT NULL,
+    end_y INTEGER NOT NULL,
+    cost_map_hash TEXT NOT NULL DEFAULT '',
+    terrain_version BIGINT NOT NULL,
+    path INTEGER [] NOT NULL,
+    last_used_tick BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (start_x, start_y, end_x, end_y, cost_map_hash)
+);
+
+-- Least recently used routes are evicted first
+CREATE INDEX IF NOT EXISTS route_cache_last_used_idx
+ON route_cache (last_used_tick);
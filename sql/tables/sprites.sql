@@ -0,0 +1,14 @@
+-- Sprite images, stored once per distinct PNG and keyed by its SHA-256
+CREATE TABLE IF NOT EXISTS sprite_images (
+    sha256 BYTEA PRIMARY KEY,
+    image BYTEA NOT NULL
+);
+
+-- Sprites, with the glyph and color text renderers draw them as
+CREATE TABLE IF NOT EXISTS sprites (
+    id SERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    glyph TEXT NOT NULL DEFAULT '?',
+    color TEXT NOT NULL DEFAULT 'white',
+    image_sha256 BYTEA NOT NULL REFERENCES sprite_images (sha256)
+);
@@ -1,5 +1,19 @@
--- Table definition for terrain types
+-- Terrain: named terrain types, and the terrain of each map cell as read by
+-- pathfinding and tracked by the route cache and tile change triggers
 CREATE TABLE IF NOT EXISTS terrain (
     id SERIAL PRIMARY KEY,
-    name TEXT NOT NULL UNIQUE
+    name TEXT UNIQUE,
+    tile_x INTEGER,
+    tile_y INTEGER,
+    type TEXT
 );
+
+-- Databases created when terrain only held named types
+ALTER TABLE terrain
+    ALTER COLUMN name DROP NOT NULL,
+    ADD COLUMN IF NOT EXISTS tile_x INTEGER,
+    ADD COLUMN IF NOT EXISTS tile_y INTEGER,
+    ADD COLUMN IF NOT EXISTS type TEXT;
+
+-- Dropped while new_game() loads a world and rebuilt by index_world()
+CREATE INDEX IF NOT EXISTS terrain_tile_idx ON terrain (tile_x, tile_y);
@@ -0,0 +1,8 @@
+-- Copies of selected tables taken by snapshot_tables(), one row per table
+-- per tick
+CREATE TABLE IF NOT EXISTS tick_snapshots (
+    tick BIGINT NOT NULL,
+    table_name TEXT NOT NULL,
+    data JSONB NOT NULL,
+    PRIMARY KEY (tick, table_name)
+);
@@ -0,0 +1,17 @@
+-- Stages run by tick(), in ascending position. command is executed as-is.
+CREATE TABLE IF NOT EXISTS tick_stages (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL UNIQUE,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    command TEXT NOT NULL
+);
+
+-- Default pipeline
+INSERT INTO tick_stages (name, position, command) VALUES
+('economy_tick', 10, 'SELECT economy_tick()'),
+('refresh_flow_fields', 20, 'SELECT refresh_flow_fields(4)'),
+('move_vehicles', 30, 'CALL move_vehicles()'),
+('update_balances', 40, 'SELECT update_balances()'),
+('evict_routes', 50, 'SELECT evict_routes()'),
+('prune_tick_stats', 60, 'SELECT prune_tick_stats()')
+ON CONFLICT DO NOTHING;
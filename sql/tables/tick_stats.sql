@@ -0,0 +1,7 @@
+-- Time spent in each tick() stage, one row per stage per tick
+CREATE TABLE IF NOT EXISTS tick_stats (
+    tick BIGINT NOT NULL,
+    stage TEXT NOT NULL,
+    duration_ms DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (tick, stage)
+);
@@ -4,5 +4,17 @@ CREATE TABLE IF NOT EXISTS tiles (
     x INTEGER NOT NULL,
     y INTEGER NOT NULL,
     terrain_id INTEGER NOT NULL REFERENCES terrain (id),
+    -- What renderers draw on the tile
+    sprite_id INTEGER REFERENCES sprites (id),
+    updated_tick BIGINT NOT NULL DEFAULT 0,
     UNIQUE (x, y)
 );
+
+-- Databases created before tiles had sprites
+ALTER TABLE tiles ADD COLUMN IF NOT EXISTS sprite_id INTEGER REFERENCES sprites (id);
+
+-- Databases created before tile changes were stamped
+ALTER TABLE tiles ADD COLUMN IF NOT EXISTS updated_tick BIGINT NOT NULL DEFAULT 0;
+
+-- Renderers poll for tiles changed since the last tick they saw
+CREATE INDEX IF NOT EXISTS tiles_updated_tick_idx ON tiles (updated_tick);
@@ -0,0 +1,12 @@
+-- Coarse spatial index of vehicles, kept by the triggers in
+-- procs/spatial.sql. Each vehicle is filed under the 16x16 cell holding its
+-- tile. Indexing vehicles (x, y) directly would end HOT updates for every
+-- move; a row here only changes when its vehicle crosses into another cell.
+CREATE TABLE IF NOT EXISTS vehicle_cells (
+    vehicle_id INTEGER PRIMARY KEY,
+    cell_x INTEGER NOT NULL,
+    cell_y INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS vehicle_cells_cell_idx
+ON vehicle_cells (cell_x, cell_y) INCLUDE (vehicle_id);
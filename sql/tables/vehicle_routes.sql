@@ -0,0 +1,5 @@
+-- Precomputed routes followed by move_vehicles_routed()
+CREATE TABLE IF NOT EXISTS vehicle_routes (
+    vehicle_id INTEGER PRIMARY KEY REFERENCES vehicles (id) ON DELETE CASCADE,
+    path INTEGER [] NOT NULL
+);
@@ -5,13 +5,72 @@ CREATE TABLE IF NOT EXISTS vehicles (
     y INTEGER NOT NULL,
     CONSTRAINT non_negative_position CHECK (x >= 0 AND y >= 0),
     schedule JSONB NOT NULL DEFAULT '[]'::JSONB,
+    -- Waypoint coordinates unpacked from schedule for move_vehicles()
+    schedule_x INTEGER [] NOT NULL DEFAULT '{}',
+    schedule_y INTEGER [] NOT NULL DEFAULT '{}',
+    schedule_len INTEGER NOT NULL DEFAULT 0,
     schedule_idx INTEGER NOT NULL DEFAULT 0,
     next_waypoint_idx INTEGER NOT NULL DEFAULT 1,
     CONSTRAINT schedule_idx_within_bounds
     CHECK (
         schedule_idx >= 0
-        AND schedule_idx < GREATEST(JSONB_ARRAY_LENGTH(schedule), 1)
+        AND schedule_idx < GREATEST(schedule_len, 1)
     ),
     cargo JSONB NOT NULL DEFAULT '[]'::JSONB,
     company_id INTEGER REFERENCES companies (id)
-);
+)
+-- Leave room on each page so per-tick position updates can be HOT updates.
+-- Avoid indexing x, y or schedule_idx, which would rule HOT updates out.
+WITH (fillfactor = 70);
+
+-- Tables created with the default fillfactor of 100. Only pages written from
+-- now on keep the free space; a VACUUM FULL rewrites the existing ones.
+ALTER TABLE vehicles SET (fillfactor = 70);
+
+-- Keep the unpacked waypoint columns in step with schedule. The trigger only
+-- fires when schedule is written, so per-tick movement never parses JSON.
+CREATE OR REPLACE FUNCTION unpack_vehicle_schedule()
+RETURNS trigger AS $$
+BEGIN
+    SELECT
+        COALESCE(array_agg((w ->> 'x')::int ORDER BY i), '{}'),
+        COALESCE(array_agg((w ->> 'y')::int ORDER BY i), '{}'),
+        count(*)
+    INTO NEW.schedule_x, NEW.schedule_y, NEW.schedule_len
+    FROM jsonb_array_elements(NEW.schedule) WITH ORDINALITY AS s (w, i);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS vehicles_unpack_schedule ON vehicles;
+CREATE TRIGGER vehicles_unpack_schedule
+BEFORE INSERT OR UPDATE OF schedule ON vehicles
+FOR EACH ROW EXECUTE FUNCTION unpack_vehicle_schedule();
+
+-- Databases created before schedules were unpacked: add the columns, fill
+-- them through the trigger above and bound schedule_idx by schedule_len
+-- instead of the JSON length. Running this again does nothing.
+ALTER TABLE vehicles
+    ADD COLUMN IF NOT EXISTS schedule_x INTEGER [] NOT NULL DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS schedule_y INTEGER [] NOT NULL DEFAULT '{}',
+    ADD COLUMN IF NOT EXISTS schedule_len INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS next_waypoint_idx INTEGER NOT NULL DEFAULT 1;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'vehicles'::regclass
+          AND conname = 'schedule_idx_within_bounds'
+          AND pg_get_constraintdef(oid) LIKE '%schedule_len%'
+    ) THEN
+        UPDATE vehicles SET schedule = schedule;
+        ALTER TABLE vehicles
+            DROP CONSTRAINT IF EXISTS schedule_idx_within_bounds,
+            ADD CONSTRAINT schedule_idx_within_bounds
+            CHECK (
+                schedule_idx >= 0
+                AND schedule_idx < GREATEST(schedule_len, 1)
+            );
+    END IF;
+END$$;
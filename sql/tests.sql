@@ -8,3 +8,13 @@
 \ir tests/vehicles.sql
 \ir tests/vehicle_movement.sql
 \ir tests/update_balances.sql
+\ir tests/tile_changes.sql
+\ir tests/new_game.sql
+\ir tests/route_cache.sql
+\ir tests/batch_routing.sql
+\ir tests/flow_fields.sql
+\ir tests/terrain_changes.sql
+\ir tests/snapshots.sql
+\ir tests/spatial.sql
+\ir tests/frame.sql
+\ir tests/sprites.sql
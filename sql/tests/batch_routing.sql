@@ -0,0 +1,99 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- minimal terrain with an impassable water tile at (2,1)
+CREATE TEMP TABLE terrain(
+    tile_x int,
+    tile_y int,
+    type text
+);
+INSERT INTO terrain(tile_x, tile_y, type)
+SELECT x, y, 'plain'
+FROM generate_series(1,3) x CROSS JOIN generate_series(1,3) y;
+UPDATE terrain SET type = 'water' WHERE tile_x = 2 AND tile_y = 1;
+
+-- load schema and functions under test
+\ir ../tables/companies.sql
+\ir ../tables/vehicles.sql
+\ir ../tables/vehicle_routes.sql
+\ir ../procs/pathfinding.sql
+\ir ../procs/batch_routing.sql
+
+-- several vehicles, two sharing a destination
+DO $$
+DECLARE
+    routes jsonb;
+BEGIN
+    SELECT jsonb_object_agg(r.vehicle_id, r.path) INTO routes
+    FROM find_routes(ARRAY[
+        (1, 1, 1, 3, 2)::route_request,
+        (2, 3, 3, 3, 2)::route_request,
+        (3, 2, 2, 2, 2)::route_request,
+        (4, 1, 1, 2, 1)::route_request,
+        (5, 1, 1, 9, 9)::route_request
+    ]) r;
+
+    IF routes -> '1' <> '[[1,1],[1,2],[2,2],[3,2]]' THEN
+        RAISE EXCEPTION 'route 1 mismatch: %', routes -> '1';
+    END IF;
+    IF routes -> '2' <> '[[3,3],[3,2]]' THEN
+        RAISE EXCEPTION 'route 2 mismatch: %', routes -> '2';
+    END IF;
+    IF routes -> '3' <> '[[2,2]]' THEN
+        RAISE EXCEPTION 'single tile route mismatch: %', routes -> '3';
+    END IF;
+    IF routes -> '4' <> '[]' OR routes -> '5' <> '[]' THEN
+        RAISE EXCEPTION 'unreachable routes returned: %, %',
+            routes -> '4', routes -> '5';
+    END IF;
+END$$;
+
+-- batch routes are as long as individual searches
+DO $$
+DECLARE
+    r record;
+BEGIN
+    FOR r IN
+        SELECT b.path AS batch, find_route(t.tile_x, t.tile_y, 3, 3) AS single
+        FROM find_routes(ARRAY(
+            SELECT (tile_x * 10 + tile_y, tile_x, tile_y, 3, 3)::route_request
+            FROM terrain
+        )) b
+        JOIN terrain t ON t.tile_x * 10 + t.tile_y = b.vehicle_id
+    LOOP
+        IF array_length(r.batch, 1) IS DISTINCT FROM array_length(r.single, 1) THEN
+            RAISE EXCEPTION 'batch route length differs: % vs %', r.batch, r.single;
+        END IF;
+    END LOOP;
+END$$;
+
+-- routed vehicles advance together, one step per call
+TRUNCATE vehicles RESTART IDENTITY CASCADE;
+INSERT INTO vehicles (x, y) VALUES (1, 1), (3, 3);
+CALL route_vehicles(ARRAY[
+    (1, 1, 1, 3, 2)::route_request,
+    (2, 3, 3, 3, 2)::route_request
+]);
+
+CALL move_vehicles_routed();
+DO $$
+BEGIN
+    IF (SELECT (x, y) FROM vehicles WHERE id = 1) <> (1, 2)
+       OR (SELECT (x, y) FROM vehicles WHERE id = 2) <> (3, 2) THEN
+        RAISE EXCEPTION 'first routed step mismatch';
+    END IF;
+END$$;
+
+CALL move_vehicles_routed();
+CALL move_vehicles_routed();
+CALL move_vehicles_routed();
+DO $$
+BEGIN
+    IF (SELECT (x, y) FROM vehicles WHERE id = 1) <> (3, 2)
+       OR (SELECT (x, y) FROM vehicles WHERE id = 2) <> (3, 2) THEN
+        RAISE EXCEPTION 'vehicles did not stop at their destination';
+    END IF;
+END$$;
+
+ROLLBACK;
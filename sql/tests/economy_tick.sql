@@ -32,4 +32,103 @@ BEGIN
     END IF;
 END$$;
 
+-- Two mills compete for 6 ore but request 12: each gets half its request
+-- and runs at half rate, and the smelter's output feeds the forge within
+-- the same tick
+TRUNCATE resources,
+resource_rules,
+resource_industries,
+resource_industry_flows RESTART IDENTITY CASCADE;
+INSERT INTO resources (name, amount)
+VALUES ('ore', 6), ('coal', 100), ('steel', 0), ('tools', 0), ('slag', 0);
+INSERT INTO resource_industries (
+    name, input_resource_id, output_resource_id, input_per_tick, output_per_tick
+)
+VALUES ('mill a', 1, 3, 4, 2), ('mill b', 1, 3, 8, 4), ('forge', 3, 4, 2, 1);
+-- mill a also burns coal and leaves slag
+INSERT INTO resource_industry_flows (industry_id, resource_id, is_input, per_tick)
+VALUES (1, 2, true, 10), (1, 5, false, 3);
+
+SELECT economy_tick();
+
+DO $$
+DECLARE
+    got numeric[];
+BEGIN
+    SELECT array_agg(amount ORDER BY id) INTO got FROM resources;
+    -- ore 6 - 2 - 4; coal 100 - 5; steel 1 + 2 - 2; tools 1; slag 1.5
+    IF got <> ARRAY[0, 95, 1, 1, 1.5]::numeric[] THEN
+        RAISE EXCEPTION 'contended chain mismatch: %', got;
+    END IF;
+    IF (SELECT array_agg(DISTINCT chain_level ORDER BY chain_level)
+        FROM resource_industry_plan) <> ARRAY[0, 1] THEN
+        RAISE EXCEPTION 'forge should run after the mills';
+    END IF;
+END$$;
+
+-- An industry runs at the rate of its scarcest input
+UPDATE resources SET amount = 4 WHERE name = 'ore';
+UPDATE resources SET amount = 2.5 WHERE name = 'coal';
+DELETE FROM resource_industries WHERE name IN ('mill b', 'forge');
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM resource_industry_plan) THEN
+        RAISE EXCEPTION 'plan not cleared after industries changed';
+    END IF;
+END$$;
+
+SELECT economy_tick();
+
+DO $$
+DECLARE
+    got numeric[];
+BEGIN
+    SELECT array_agg(amount ORDER BY id) INTO got FROM resources;
+    -- coal limits mill a to a quarter: ore 4 - 1, coal 0, steel 1 + 0.5,
+    -- slag 1.5 + 0.75
+    IF got <> ARRAY[3, 0, 1.5, 1, 2.25]::numeric[] THEN
+        RAISE EXCEPTION 'scarcest input mismatch: %', got;
+    END IF;
+END$$;
+
+-- Industries without an input resource never run, as they never did; an
+-- input of 0 per tick still lets an industry run
+TRUNCATE resources,
+resource_rules,
+resource_industries,
+resource_industry_flows RESTART IDENTITY CASCADE;
+INSERT INTO resources (name, amount) VALUES ('water', 0), ('fish', 0);
+INSERT INTO resource_industries (
+    name, input_resource_id, output_resource_id, input_per_tick, output_per_tick
+)
+VALUES ('well', NULL, 1, 0, 5), ('pond', 1, 2, 0, 2);
+
+SELECT economy_tick();
+
+DO $$
+DECLARE
+    got numeric[];
+BEGIN
+    SELECT array_agg(amount ORDER BY id) INTO got FROM resources;
+    IF got <> ARRAY[0, 2]::numeric[] THEN
+        RAISE EXCEPTION 'input-free industries mismatch: %', got;
+    END IF;
+END$$;
+
+-- Loading the table again widens an amount column from before fractional
+-- shares
+ALTER TABLE resources ALTER COLUMN amount TYPE INTEGER;
+\ir ../tables/resources.sql
+
+DO $$
+BEGIN
+    IF (
+        SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = 'resources'::regclass AND attname = 'amount'
+    ) <> 'numeric(18,6)' THEN
+        RAISE EXCEPTION 'resources.amount not migrated to numeric';
+    END IF;
+END$$;
+
 ROLLBACK;
@@ -0,0 +1,160 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- 3x3 terrain with a water wall at x = 2 except for a gap at (2,3)
+CREATE TEMP TABLE terrain(
+    tile_x int,
+    tile_y int,
+    type text
+);
+INSERT INTO terrain(tile_x, tile_y, type)
+SELECT x, y, 'plain'
+FROM generate_series(1,3) x CROSS JOIN generate_series(1,3) y;
+UPDATE terrain SET type = 'water' WHERE tile_x = 2 AND tile_y < 3;
+
+-- load schema and functions under test
+\ir ../tables/game_state.sql
+\ir ../tables/route_cache.sql
+\ir ../tables/companies.sql
+\ir ../tables/vehicles.sql
+\ir ../tables/flow_fields.sql
+\ir ../procs/pathfinding.sql
+\ir ../procs/route_cache.sql
+\ir ../procs/batch_routing.sql
+\ir ../procs/flow_fields.sql
+\ir ../procs/move_vehicles.sql
+
+INSERT INTO game_state (current_tick) VALUES (0);
+INSERT INTO vehicles (x, y, schedule)
+VALUES (1, 1, '[{"x":3,"y":1},{"x":1,"y":1}]');
+
+-- waypoints are registered but not built yet
+DO $$
+BEGIN
+    IF (SELECT count(*) FROM flow_field_destinations
+        WHERE terrain_version IS NULL) <> 2 THEN
+        RAISE EXCEPTION 'schedule waypoints not registered';
+    END IF;
+END$$;
+
+-- changed schedules register their waypoints, moving vehicles does not
+DO $$
+BEGIN
+    DELETE FROM flow_field_destinations WHERE dest_x = 1 AND dest_y = 1;
+    UPDATE vehicles SET x = 1 WHERE id = 1;
+    IF EXISTS (SELECT 1 FROM flow_field_destinations
+               WHERE dest_x = 1 AND dest_y = 1) THEN
+        RAISE EXCEPTION 'position update registered waypoints';
+    END IF;
+    UPDATE vehicles SET schedule = '[{"x":3,"y":1},{"x":1,"y":1}]' WHERE id = 1;
+    IF EXISTS (SELECT 1 FROM flow_field_destinations
+               WHERE dest_x = 1 AND dest_y = 1) THEN
+        RAISE EXCEPTION 'unchanged schedule registered waypoints';
+    END IF;
+    UPDATE vehicles SET schedule = '[{"x":1,"y":1},{"x":3,"y":1}]' WHERE id = 1;
+    IF NOT EXISTS (SELECT 1 FROM flow_field_destinations
+                   WHERE dest_x = 1 AND dest_y = 1) THEN
+        RAISE EXCEPTION 'changed schedule did not register waypoints';
+    END IF;
+    UPDATE vehicles SET schedule = '[{"x":3,"y":1},{"x":1,"y":1}]' WHERE id = 1;
+END$$;
+
+-- fields can be built a few at a time
+DO $$
+BEGIN
+    IF refresh_flow_fields(1) <> 1 THEN
+        RAISE EXCEPTION 'expected one field to be built';
+    END IF;
+    IF refresh_flow_fields() <> 1 THEN
+        RAISE EXCEPTION 'expected the remaining field to be built';
+    END IF;
+    IF refresh_flow_fields() <> 0 THEN
+        RAISE EXCEPTION 'up-to-date fields were rebuilt';
+    END IF;
+    IF (SELECT array[next_x, next_y] FROM flow_fields
+        WHERE dest_x = 3 AND dest_y = 1 AND tile_x = 1 AND tile_y = 1)
+       <> array[1, 2] THEN
+        RAISE EXCEPTION 'field should lead around the water';
+    END IF;
+END$$;
+
+-- vehicles detour through the gap instead of crossing the water
+DO $$
+DECLARE
+    steps jsonb := '[]';
+    i int;
+BEGIN
+    FOR i IN 1..6 LOOP
+        CALL move_vehicles();
+        steps := steps || jsonb_build_array(
+            (SELECT jsonb_build_array(x, y) FROM vehicles WHERE id = 1)
+        );
+    END LOOP;
+    IF steps <> '[[1,2],[1,3],[2,3],[3,3],[3,2],[3,1]]' THEN
+        RAISE EXCEPTION 'unexpected steps: %', steps;
+    END IF;
+END$$;
+
+-- terrain changes mark every field stale
+UPDATE terrain SET type = 'plain' WHERE tile_x = 2 AND tile_y = 1;
+DO $$
+BEGIN
+    IF refresh_flow_fields() <> 2 THEN
+        RAISE EXCEPTION 'stale fields not rebuilt';
+    END IF;
+    IF (SELECT array[next_x, next_y] FROM flow_fields
+        WHERE dest_x = 1 AND dest_y = 1 AND tile_x = 3 AND tile_y = 1)
+       <> array[2, 1] THEN
+        RAISE EXCEPTION 'rebuilt field does not use the new terrain';
+    END IF;
+END$$;
+
+-- reaching the waypoint advances the schedule, then the shorter route is used
+CALL move_vehicles();
+CALL move_vehicles();
+DO $$
+BEGIN
+    IF (SELECT array[x, y, schedule_idx] FROM vehicles WHERE id = 1)
+       <> array[2, 1, 1] THEN
+        RAISE EXCEPTION 'vehicle did not take the new route';
+    END IF;
+END$$;
+
+
+-- fields built for older terrain are not followed until they are rebuilt
+UPDATE vehicles SET x = 3, y = 3 WHERE id = 1;
+UPDATE flow_fields SET next_x = 3, next_y = 2
+WHERE dest_x = 1 AND dest_y = 1 AND tile_x = 3 AND tile_y = 3;
+UPDATE terrain SET type = 'plain' WHERE tile_x = 2 AND tile_y = 2;
+CALL move_vehicles();
+DO $$
+BEGIN
+    IF (SELECT array[x, y] FROM vehicles WHERE id = 1) <> array[2, 3] THEN
+        RAISE EXCEPTION 'vehicle followed a stale field';
+    END IF;
+END$$;
+
+-- a vehicle on a tile with no route to its target steps straight instead of
+-- waiting there; here water cuts (1,1) off from the rest of the map
+UPDATE terrain SET type = 'water'
+WHERE (tile_x, tile_y) IN ((2, 1), (1, 2));
+DO $$
+BEGIN
+    IF refresh_flow_fields() <> 2 THEN
+        RAISE EXCEPTION 'fields not rebuilt after the water change';
+    END IF;
+END$$;
+CALL move_vehicles();
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM flow_fields
+               WHERE dest_x = 1 AND dest_y = 1 AND tile_x = 2 AND tile_y = 3) THEN
+        RAISE EXCEPTION 'field covers a tile without a route';
+    END IF;
+    IF (SELECT array[x, y] FROM vehicles WHERE id = 1) <> array[1, 3] THEN
+        RAISE EXCEPTION 'vehicle off the field did not step straight';
+    END IF;
+END$$;
+
+ROLLBACK;
@@ -0,0 +1,84 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- load schema and procedure definitions
+\ir ../tables/terrain.sql
+\ir ../tables/game_state.sql
+\ir ../tables/sprites.sql
+\ir ../sprites.sql
+\ir ../tables/tiles.sql
+\ir ../tables/companies.sql
+\ir ../tables/industries.sql
+\ir ../tables/vehicles.sql
+\ir ../tables/vehicle_cells.sql
+\ir ../procs/spatial.sql
+\ir ../procs/frame.sql
+
+INSERT INTO terrain (name) VALUES ('grass');
+INSERT INTO sprite_images (sha256, image) VALUES (sha256(''), '');
+INSERT INTO sprites (name, image_sha256, glyph, color)
+VALUES ('grass', sha256(''), '.', 'green');
+INSERT INTO tiles (x, y, terrain_id, sprite_id)
+SELECT x, y, 1, 1
+FROM generate_series(0, 3) x CROSS JOIN generate_series(0, 3) y;
+INSERT INTO industries (name, tile_id)
+SELECT name, id
+FROM tiles, (VALUES ('mine'), ('farm')) n (name)
+WHERE (x, y) IN ((1, 1), (2, 2));
+INSERT INTO vehicles (x, y) VALUES (2, 2), (2, 2), (0, 1);
+
+-- one row per tile in the rectangle, however many industries it holds,
+-- overlays on top, row by row
+DO $$
+DECLARE
+    frame text;
+BEGIN
+    SELECT string_agg(format('%s,%s %s %s', x, y, glyph, color), '; ')
+    INTO frame
+    FROM render_frame(0, 2, 1, 2);
+    IF frame IS DISTINCT FROM
+        '0,1 @ yellow; 1,1 I magenta; 2,1 . green; '
+        '0,2 . green; 1,2 . green; 2,2 @ yellow'
+    THEN
+        RAISE EXCEPTION 'unexpected frame: %', frame;
+    END IF;
+END$$;
+
+-- vehicles outside the rectangle are not drawn
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM render_frame(3, 3, 0, 3) WHERE glyph <> '.') THEN
+        RAISE EXCEPTION 'overlay drawn outside its tile';
+    END IF;
+END$$;
+
+-- packed frames: header, glyph plane, palette plane; (3, 3) has no tile
+DELETE FROM tiles WHERE x = 3 AND y = 3;
+UPDATE sprites SET color = 'chartreuse';
+DO $$
+DECLARE
+    raw bytea := render_frame_packed(2, 3, 2, 3);
+BEGIN
+    IF raw IS DISTINCT FROM
+        '\x0002000200'::bytea || '\x402e2e00'::bytea || '\x03070700'::bytea
+    THEN
+        RAISE EXCEPTION 'unexpected packed frame: %', raw;
+    END IF;
+    IF render_frame_packed(2, 3, 2, 3, true) IS DISTINCT FROM
+        '\x0002000201'::bytea || '\x0140022e0100010302070100'::bytea
+    THEN
+        RAISE EXCEPTION 'unexpected run-length encoded frame: %',
+            render_frame_packed(2, 3, 2, 3, true);
+    END IF;
+END$$;
+
+-- runs are cut at 255 bytes
+DO $$
+BEGIN
+    IF pack_runs(decode(repeat('aa', 300), 'hex')) <> '\xffaa2daa'::bytea THEN
+        RAISE EXCEPTION 'long run not split';
+    END IF;
+END$$;
+
+ROLLBACK;
@@ -5,6 +5,8 @@ BEGIN;
 -- load schema and procedure definitions
 \ir ../tables/companies.sql
 \ir ../tables/vehicles.sql
+\ir ../tables/game_state.sql
+\ir ../tables/flow_fields.sql
 \ir ../procs/move_vehicles.sql
 
 -- setup initial data
@@ -38,4 +40,21 @@ BEGIN
     END IF;
 END$$;
 
+-- an id range only moves the vehicles inside it
+INSERT INTO vehicles (x, y, schedule)
+VALUES (0, 0, '[{"x":5,"y":0}]'), (0, 0, '[{"x":5,"y":0}]');
+CALL move_vehicles(2, 2);
+DO $$
+BEGIN
+    IF (SELECT x FROM vehicles WHERE id = 2) != 1 THEN
+        RAISE EXCEPTION 'vehicle inside the range did not move';
+    END IF;
+    IF (SELECT x FROM vehicles WHERE id = 3) != 0 THEN
+        RAISE EXCEPTION 'vehicle outside the range moved';
+    END IF;
+    IF (SELECT x FROM vehicles WHERE id = 1) != 1 THEN
+        RAISE EXCEPTION 'vehicle below the range moved';
+    END IF;
+END$$;
+
 ROLLBACK;
@@ -5,6 +5,8 @@ BEGIN;
 -- load schema and procedure definitions
 \ir ../tables/companies.sql
 \ir ../tables/vehicles.sql
+\ir ../tables/game_state.sql
+\ir ../tables/flow_fields.sql
 \ir ../procs/move_vehicles.sql
 
 -- allow NULL schedule_idx for testing
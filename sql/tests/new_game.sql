@@ -0,0 +1,106 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- minimal world tables used by new_game()
+CREATE TEMP TABLE game_state(
+    id SERIAL PRIMARY KEY,
+    width INT,
+    height INT,
+    current_tick BIGINT,
+    terrain_version BIGINT NOT NULL DEFAULT 0,
+    sprite_version BIGINT NOT NULL DEFAULT 0
+);
+CREATE TEMP TABLE tiles(
+    id SERIAL PRIMARY KEY,
+    x INT NOT NULL,
+    y INT NOT NULL,
+    terrain_id INT,
+    updated_tick BIGINT NOT NULL DEFAULT 0,
+    UNIQUE (x, y)
+);
+CREATE TEMP TABLE terrain(
+    id SERIAL PRIMARY KEY,
+    tile_x INT,
+    tile_y INT,
+    type TEXT
+);
+INSERT INTO game_state(width, height, current_tick, sprite_version)
+VALUES (1, 1, 42, 7);
+INSERT INTO tiles(x, y) VALUES (99, 99);
+
+-- load procedures under test
+\ir ../tables/tick_stats.sql
+\ir ../procs/tile_changes.sql
+\ir ../procs/terrain_changes.sql
+\ir ../procs/new_game.sql
+
+CALL new_game(4, 3);
+
+DO $$
+BEGIN
+    IF (SELECT count(*) FROM game_state) <> 1
+       OR (SELECT current_tick FROM game_state) <> 0
+       OR (SELECT width FROM game_state) <> 4
+       OR (SELECT height FROM game_state) <> 3 THEN
+        RAISE EXCEPTION 'game state not reset';
+    END IF;
+    IF (SELECT count(*) FROM tiles) <> 12
+       OR (SELECT count(DISTINCT (x, y)) FROM tiles) <> 12
+       OR (SELECT min(x) FROM tiles) <> 1 OR (SELECT max(x) FROM tiles) <> 4
+       OR (SELECT min(y) FROM tiles) <> 1 OR (SELECT max(y) FROM tiles) <> 3 THEN
+        RAISE EXCEPTION 'tiles not populated';
+    END IF;
+    IF (SELECT count(*) FROM terrain WHERE type = 'plain') <> 12 THEN
+        RAISE EXCEPTION 'terrain not populated';
+    END IF;
+    IF EXISTS (
+        SELECT 1 FROM tiles t
+        LEFT JOIN terrain r ON r.id = t.terrain_id
+        WHERE r.tile_x IS DISTINCT FROM t.x OR r.tile_y IS DISTINCT FROM t.y
+    ) THEN
+        RAISE EXCEPTION 'tiles not linked to their terrain';
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_indexes WHERE indexname = 'terrain_tile_idx'
+    ) THEN
+        RAISE EXCEPTION 'terrain index not created after load';
+    END IF;
+END$$;
+
+-- tile change stamping is active again once the world is built
+UPDATE game_state SET current_tick = 7;
+UPDATE tiles SET x = x WHERE x = 1 AND y = 1;
+DO $$
+BEGIN
+    IF (SELECT updated_tick FROM tiles WHERE x = 1 AND y = 1) <> 7 THEN
+        RAISE EXCEPTION 'tile trigger not re-enabled';
+    END IF;
+END$$;
+UPDATE terrain SET type = 'water' WHERE tile_x = 2 AND tile_y = 2;
+DO $$
+BEGIN
+    IF (SELECT updated_tick FROM tiles WHERE x = 2 AND y = 2) <> 7 THEN
+        RAISE EXCEPTION 'terrain trigger not re-enabled';
+    END IF;
+END$$;
+
+-- bands loaded separately produce the same world
+CALL reset_world(4, 3);
+CALL populate_world(1, 2, 3);
+CALL populate_world(3, 4, 3);
+CALL index_world();
+DO $$
+BEGIN
+    IF (SELECT count(*) FROM tiles) <> 12 OR (SELECT count(*) FROM terrain) <> 12 THEN
+        RAISE EXCEPTION 'banded load mismatch';
+    END IF;
+    IF (SELECT terrain_version FROM game_state) <> 2 THEN
+        RAISE EXCEPTION 'terrain version not carried over to the new world';
+    END IF;
+    IF (SELECT sprite_version FROM game_state) <> 7 THEN
+        RAISE EXCEPTION 'sprite version not carried over to the new world';
+    END IF;
+END$$;
+
+ROLLBACK;
@@ -53,5 +53,30 @@ BEGIN
     END IF;
 END$$;
 
+-- verify expensive tiles are routed around
+DO $$
+DECLARE
+    res integer[][];
+    expected integer[][] := ARRAY[
+        ARRAY[1,2], ARRAY[1,3], ARRAY[2,3], ARRAY[3,3], ARRAY[3,2]
+    ];
+BEGIN
+    res := find_route(1,2,3,2, ARRAY[ARRAY[2,2,10]]);
+    IF res IS NULL OR res != expected THEN
+        RAISE EXCEPTION 'costly tile not avoided: %', res;
+    END IF;
+END$$;
+
+-- verify impassable or off-map destinations yield an empty route
+DO $$
+BEGIN
+    IF array_length(find_route(1,1,2,1), 1) IS NOT NULL THEN
+        RAISE EXCEPTION 'route into water returned';
+    END IF;
+    IF array_length(find_route(1,1,9,9), 1) IS NOT NULL THEN
+        RAISE EXCEPTION 'route off the map returned';
+    END IF;
+END$$;
+
 ROLLBACK;
 
@@ -0,0 +1,125 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- load schema and functions under test
+\ir ../tables/terrain.sql
+\ir ../tables/game_state.sql
+\ir ../tables/route_cache.sql
+\ir ../procs/pathfinding.sql
+\ir ../procs/route_cache.sql
+
+-- minimal terrain for pathfinding, next to a named terrain type
+INSERT INTO terrain (name) VALUES ('grass');
+INSERT INTO terrain(tile_x, tile_y, type)
+SELECT x, y, 'plain'
+FROM generate_series(1,3) x CROSS JOIN generate_series(1,3) y;
+
+INSERT INTO game_state (current_tick) VALUES (1);
+
+-- a miss computes and stores the route
+DO $$
+DECLARE
+    expected integer[][] := ARRAY[ARRAY[1,1], ARRAY[2,1], ARRAY[3,1], ARRAY[3,2]];
+BEGIN
+    IF cached_route(1,1,3,2) != expected THEN
+        RAISE EXCEPTION 'cached route mismatch';
+    END IF;
+    IF (SELECT count(*) FROM route_cache) <> 1 THEN
+        RAISE EXCEPTION 'route not stored';
+    END IF;
+END$$;
+
+-- a hit is served from the cache and refreshes its LRU stamp
+UPDATE route_cache SET path = ARRAY[ARRAY[9,9]];
+UPDATE game_state SET current_tick = 5;
+DO $$
+BEGIN
+    IF cached_route(1,1,3,2) != ARRAY[ARRAY[9,9]] THEN
+        RAISE EXCEPTION 'cache not used';
+    END IF;
+    IF (SELECT last_used_tick FROM route_cache) <> 5 THEN
+        RAISE EXCEPTION 'last_used_tick not refreshed';
+    END IF;
+END$$;
+
+-- cost maps are part of the key
+DO $$
+BEGIN
+    PERFORM cached_route(1,1,3,2, ARRAY[ARRAY[2,1,5]]);
+    IF (SELECT count(*) FROM route_cache) <> 2 THEN
+        RAISE EXCEPTION 'cost map not part of cache key';
+    END IF;
+END$$;
+
+-- changing terrain invalidates cached routes
+UPDATE terrain SET type = 'water' WHERE tile_x = 2 AND tile_y = 1;
+DO $$
+DECLARE
+    expected integer[][] := ARRAY[ARRAY[1,1], ARRAY[1,2], ARRAY[2,2], ARRAY[3,2]];
+BEGIN
+    IF (SELECT terrain_version FROM game_state) <> 1 THEN
+        RAISE EXCEPTION 'terrain version not bumped';
+    END IF;
+    IF cached_route(1,1,3,2) != expected THEN
+        RAISE EXCEPTION 'stale route returned after terrain change';
+    END IF;
+END$$;
+
+-- updates that do not touch terrain shape keep the cache valid
+ALTER TABLE terrain ADD COLUMN updated_tick INT;
+UPDATE terrain SET updated_tick = 5;
+DO $$
+BEGIN
+    IF (SELECT terrain_version FROM game_state) <> 1 THEN
+        RAISE EXCEPTION 'terrain version bumped by unrelated update';
+    END IF;
+END$$;
+
+-- eviction drops stale routes then the least recently used ones
+INSERT INTO route_cache (
+    start_x, start_y, end_x, end_y, terrain_version, path, last_used_tick
+)
+VALUES (1, 1, 1, 2, 1, '{}', 2), (1, 1, 1, 3, 1, '{}', 9);
+DO $$
+BEGIN
+    IF evict_routes(2) <> 2 THEN
+        RAISE EXCEPTION 'unexpected eviction count';
+    END IF;
+    IF EXISTS (SELECT 1 FROM route_cache WHERE cost_map_hash <> '') THEN
+        RAISE EXCEPTION 'stale route not evicted';
+    END IF;
+    IF EXISTS (SELECT 1 FROM route_cache WHERE end_y = 2 AND end_x = 1) THEN
+        RAISE EXCEPTION 'least recently used route not evicted';
+    END IF;
+END$$;
+
+-- the default tick pipeline evicts routes computed for old terrain
+\ir ../tables/tick_stages.sql
+\ir ../tables/tick_stats.sql
+\ir ../procs/tick.sql
+UPDATE tick_stages SET enabled = (name = 'evict_routes');
+UPDATE game_state SET terrain_version = terrain_version + 1;
+CALL tick();
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM route_cache) THEN
+        RAISE EXCEPTION 'tick() did not evict stale routes';
+    END IF;
+END$$;
+
+
+-- Loading the table again gives an older game_state its terrain version
+ALTER TABLE game_state DROP COLUMN terrain_version;
+\ir ../tables/game_state.sql
+UPDATE terrain SET type = 'water' WHERE tile_x = 2 AND tile_y = 2;
+
+DO $$
+BEGIN
+    IF (SELECT terrain_version FROM game_state) <> 1 THEN
+        RAISE EXCEPTION 'terrain_version not added to existing game_state';
+    END IF;
+END$$;
+
+ROLLBACK;
@@ -0,0 +1,45 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- load table definitions and procedure under test
+\ir ../tables/game_state.sql
+\ir ../tables/companies.sql
+\ir ../tables/tick_snapshots.sql
+\ir ../procs/snapshots.sql
+
+INSERT INTO game_state (current_tick) VALUES (10);
+INSERT INTO companies (name, cash) VALUES ('Acme', 100), ('Globex', 50);
+CREATE TEMP TABLE empty_table (id int);
+
+CALL snapshot_tables(ARRAY['companies', 'empty_table']);
+UPDATE companies SET cash = 0;
+UPDATE game_state SET current_tick = 20;
+CALL snapshot_tables(ARRAY['companies']);
+
+DO $$
+BEGIN
+    IF (SELECT jsonb_path_query_array(data, '$[*].cash') FROM tick_snapshots
+        WHERE tick = 10 AND table_name = 'companies') <> '[100, 50]' THEN
+        RAISE EXCEPTION 'snapshot at tick 10 mismatch';
+    END IF;
+    IF (SELECT jsonb_path_query_array(data, '$[*].cash') FROM tick_snapshots
+        WHERE tick = 20 AND table_name = 'companies') <> '[0, 0]' THEN
+        RAISE EXCEPTION 'snapshot at tick 20 mismatch';
+    END IF;
+    IF (SELECT data FROM tick_snapshots
+        WHERE tick = 10 AND table_name = 'empty_table') <> '[]' THEN
+        RAISE EXCEPTION 'empty table should snapshot as an empty array';
+    END IF;
+END$$;
+
+-- unknown tables are rejected rather than silently skipped
+DO $$
+BEGIN
+    CALL snapshot_tables(ARRAY['no_such_table']);
+    RAISE EXCEPTION 'unknown table accepted';
+EXCEPTION WHEN undefined_table THEN
+    NULL;
+END$$;
+
+ROLLBACK;
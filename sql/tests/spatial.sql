@@ -0,0 +1,98 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- load schema and procedure definitions
+\ir ../tables/companies.sql
+\ir ../tables/vehicles.sql
+\ir ../tables/vehicle_cells.sql
+\ir ../tables/game_state.sql
+\ir ../tables/flow_fields.sql
+\ir ../procs/move_vehicles.sql
+\ir ../procs/spatial.sql
+
+TRUNCATE vehicles RESTART IDENTITY;
+INSERT INTO vehicles (x, y, schedule)
+VALUES
+    (15, 0, '[{"x":20,"y":0}]'),
+    (3, 3, '[]'),
+    (3, 3, '[]'),
+    (40, 40, '[]'),
+    (10, 12, '[]');
+
+-- inserted vehicles are filed under their cells
+DO $$
+BEGIN
+    IF (SELECT count(*) FROM vehicle_cells) != 5 THEN
+        RAISE EXCEPTION 'inserted vehicles were not filed';
+    END IF;
+    IF (SELECT (cell_x, cell_y) FROM vehicle_cells WHERE vehicle_id = 4)
+       IS DISTINCT FROM (2, 2) THEN
+        RAISE EXCEPTION 'vehicle filed under the wrong cell';
+    END IF;
+END$$;
+
+-- moving across a cell boundary refiles the vehicle
+CALL move_vehicles();
+DO $$
+BEGIN
+    IF (SELECT cell_x FROM vehicle_cells WHERE vehicle_id = 1) != 1 THEN
+        RAISE EXCEPTION 'moved vehicle was not refiled';
+    END IF;
+    IF (SELECT array_agg(id ORDER BY id) FROM vehicles_at(16, 0))
+       IS DISTINCT FROM ARRAY[1] THEN
+        RAISE EXCEPTION 'point lookup missed the moved vehicle';
+    END IF;
+    IF EXISTS (SELECT 1 FROM vehicles_at(15, 0)) THEN
+        RAISE EXCEPTION 'point lookup found a vehicle that left';
+    END IF;
+END$$;
+
+-- rectangles and radii check exact positions, not just cells
+DO $$
+BEGIN
+    IF (SELECT array_agg(id ORDER BY id) FROM vehicles_in_rect(0, 16, 0, 11))
+       IS DISTINCT FROM ARRAY[1, 2, 3] THEN
+        RAISE EXCEPTION 'rectangle lookup returned the wrong vehicles';
+    END IF;
+    IF (SELECT array_agg(id ORDER BY id) FROM vehicles_within(6, 6, 5))
+       IS DISTINCT FROM ARRAY[2, 3] THEN
+        RAISE EXCEPTION 'radius lookup returned the wrong vehicles';
+    END IF;
+    IF (SELECT array_agg(id ORDER BY id) FROM vehicles_within(6, 6, 8))
+       IS DISTINCT FROM ARRAY[2, 3, 5] THEN
+        RAISE EXCEPTION 'radius lookup missed a vehicle in the wider radius';
+    END IF;
+END$$;
+
+-- deletes, direct position updates and truncation keep the cells in step
+DELETE FROM vehicles WHERE id = 2;
+UPDATE vehicles SET x = 0, y = 100 WHERE id = 4;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM vehicle_cells WHERE vehicle_id = 2) THEN
+        RAISE EXCEPTION 'deleted vehicle is still filed';
+    END IF;
+    IF (SELECT array_agg(id) FROM vehicles_at(0, 100))
+       IS DISTINCT FROM ARRAY[4] THEN
+        RAISE EXCEPTION 'updated vehicle was not refiled';
+    END IF;
+END$$;
+
+TRUNCATE vehicle_cells;
+DO $$
+BEGIN
+    IF refresh_vehicle_cells() != 4 THEN
+        RAISE EXCEPTION 'refresh did not file every vehicle';
+    END IF;
+END$$;
+
+TRUNCATE vehicles;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM vehicle_cells) THEN
+        RAISE EXCEPTION 'truncating vehicles left cells behind';
+    END IF;
+END$$;
+
+ROLLBACK;
@@ -0,0 +1,98 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- a sprites table from before sprite_images, with two sprites sharing a PNG,
+-- and a game_state without a sprite version
+\ir ../tables/game_state.sql
+ALTER TABLE game_state DROP COLUMN sprite_version;
+INSERT INTO game_state (current_tick) VALUES (0);
+CREATE TABLE sprites (
+    id SERIAL PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    image_base64 TEXT NOT NULL
+);
+INSERT INTO sprites (name, image_base64) VALUES
+    ('grass', encode('\x89504e47aa'::bytea, 'base64')),
+    ('meadow', encode('\x89504e47aa'::bytea, 'base64')),
+    ('water', encode('\x89504e47bb'::bytea, 'base64'));
+
+-- load table definitions, migrating the base64 column; loading twice is safe
+\ir ../tables/game_state.sql
+\ir ../tables/sprites.sql
+\ir ../sprites.sql
+\ir ../tables/sprites.sql
+\ir ../sprites.sql
+
+DO $$
+BEGIN
+    IF (SELECT count(*) FROM sprite_images) <> 2 THEN
+        RAISE EXCEPTION 'migrated images not deduplicated';
+    END IF;
+    IF EXISTS (
+        SELECT 1 FROM sprites s
+        LEFT JOIN sprite_images i ON i.sha256 = s.image_sha256
+        WHERE i.image IS DISTINCT FROM CASE s.name
+            WHEN 'water' THEN '\x89504e47bb'::bytea
+            ELSE '\x89504e47aa'::bytea
+        END
+    ) THEN
+        RAISE EXCEPTION 'sprites lost their images in the migration';
+    END IF;
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'sprites' AND column_name = 'image_base64'
+    ) THEN
+        RAISE EXCEPTION 'image_base64 column not dropped';
+    END IF;
+    IF EXISTS (SELECT 1 FROM sprites WHERE (glyph, color) <> ('?', 'white')) THEN
+        RAISE EXCEPTION 'migrated sprites lack the default glyph and color';
+    END IF;
+END$$;
+
+-- bulk loads add new images once and only touch sprites that changed
+CREATE TEMP TABLE sprite_load (name TEXT NOT NULL, image BYTEA NOT NULL)
+    ON COMMIT DROP;
+INSERT INTO sprite_load (name, image) VALUES
+    ('grass', '\x89504e47aa'),
+    ('water', '\x89504e47cc'),
+    ('sand', '\x89504e47cc');
+
+DO $$
+DECLARE
+    stored integer := store_sprites();
+BEGIN
+    IF stored <> 2 THEN
+        RAISE EXCEPTION 'expected 2 sprites stored, got %', stored;
+    END IF;
+    IF (SELECT count(*) FROM sprite_images) <> 3 THEN
+        RAISE EXCEPTION 'loaded images not deduplicated';
+    END IF;
+    IF (SELECT image_sha256 FROM sprites WHERE name = 'water')
+        IS DISTINCT FROM sha256('\x89504e47cc')
+    THEN
+        RAISE EXCEPTION 'changed sprite not updated';
+    END IF;
+    IF EXISTS (SELECT 1 FROM sprite_load) THEN
+        RAISE EXCEPTION 'load table not emptied';
+    END IF;
+END$$;
+
+-- every kind of change moves the version, once per statement
+TRUNCATE sprites;
+UPDATE game_state SET sprite_version = 0;
+INSERT INTO sprites (name, image_sha256)
+SELECT name, sha256 FROM sprite_images, (VALUES ('red'), ('blue')) n (name)
+WHERE sha256 = sha256('\x89504e47aa');
+UPDATE sprites SET image_sha256 = sha256('\x89504e47bb') WHERE name = 'red';
+DELETE FROM sprites WHERE name = 'blue';
+TRUNCATE sprites;
+
+DO $$
+BEGIN
+    IF (SELECT sprite_version FROM game_state) <> 4 THEN
+        RAISE EXCEPTION 'sprite changes did not bump the version';
+    END IF;
+END$$;
+
+ROLLBACK;
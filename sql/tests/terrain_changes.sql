@@ -0,0 +1,55 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- load table definitions and triggers under test
+\ir ../tables/terrain.sql
+\ir ../tables/sprites.sql
+\ir ../tables/tiles.sql
+\ir ../tables/game_state.sql
+\ir ../procs/terrain_changes.sql
+
+-- per-tile terrain alongside the tiles it describes
+INSERT INTO game_state (current_tick) VALUES (3);
+INSERT INTO terrain (name) VALUES ('grass');
+INSERT INTO tiles (x, y, terrain_id)
+SELECT x, y, 1 FROM generate_series(1, 3) x CROSS JOIN generate_series(1, 3) y;
+
+-- inserted terrain stamps its tiles
+INSERT INTO terrain (tile_x, tile_y, type)
+SELECT x, y, 'plain'
+FROM generate_series(1, 3) x CROSS JOIN generate_series(1, 3) y;
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM tiles WHERE updated_tick <> 3) THEN
+        RAISE EXCEPTION 'inserted terrain did not stamp its tiles';
+    END IF;
+END$$;
+
+-- only tiles whose terrain actually changes are stamped
+UPDATE game_state SET current_tick = 5;
+UPDATE terrain SET type = 'water' WHERE tile_x = 2;
+UPDATE terrain SET type = type WHERE tile_x = 1;
+DO $$
+BEGIN
+    IF (SELECT array_agg(x ORDER BY x, y) FROM tiles WHERE updated_tick = 5)
+       <> ARRAY[2, 2, 2] THEN
+        RAISE EXCEPTION 'unexpected tiles stamped after update';
+    END IF;
+END$$;
+
+-- moving a terrain row stamps both tiles, deleting one stamps its tile
+UPDATE game_state SET current_tick = 6;
+UPDATE terrain SET tile_y = 2 WHERE tile_x = 3 AND tile_y = 1;
+UPDATE game_state SET current_tick = 7;
+DELETE FROM terrain WHERE tile_x = 1 AND tile_y = 3;
+DO $$
+BEGIN
+    IF (SELECT array_agg(ARRAY[x, y, updated_tick] ORDER BY x, y)
+        FROM tiles WHERE updated_tick > 5)
+       <> ARRAY[ARRAY[1, 3, 7], ARRAY[3, 1, 6], ARRAY[3, 2, 6]]::bigint[] THEN
+        RAISE EXCEPTION 'moved or deleted terrain not stamped';
+    END IF;
+END$$;
+
+ROLLBACK;
@@ -12,17 +12,120 @@ CREATE TABLE terrain (id SERIAL PRIMARY KEY, updated_tick INT);
 INSERT INTO terrain DEFAULT VALUES;
 INSERT INTO terrain DEFAULT VALUES;
 
+-- replace the default pipeline with stages that log their order
+\ir ../tables/tick_stages.sql
+\ir ../tables/tick_stats.sql
+DELETE FROM tick_stages;
+CREATE TABLE stage_log (tick INT, stage TEXT);
+INSERT INTO tick_stages (name, position, enabled, command) VALUES
+('second', 20, TRUE,
+ 'INSERT INTO stage_log SELECT current_tick, ''second'' FROM game_state'),
+('first', 10, TRUE,
+ 'INSERT INTO stage_log SELECT current_tick, ''first'' FROM game_state'),
+('disabled', 15, FALSE,
+ 'INSERT INTO stage_log SELECT current_tick, ''disabled'' FROM game_state');
+
 -- execute tick
 CALL tick();
 
--- verify tick counter and terrain updates
+-- verify the tick counter advanced and terrain was left alone
 DO $$
 BEGIN
     IF (SELECT current_tick FROM game_state) != 1 THEN
         RAISE EXCEPTION 'tick counter not incremented';
     END IF;
-    IF EXISTS (SELECT 1 FROM terrain WHERE updated_tick <> 1) THEN
-        RAISE EXCEPTION 'terrain not updated with tick';
+    IF EXISTS (SELECT 1 FROM terrain WHERE updated_tick IS NOT NULL) THEN
+        RAISE EXCEPTION 'terrain rewritten by tick';
+    END IF;
+END$$;
+
+-- enabled stages run in position order and are timed
+DO $$
+BEGIN
+    IF (SELECT array_agg(stage ORDER BY ctid) FROM stage_log)
+       <> ARRAY['first', 'second'] THEN
+        RAISE EXCEPTION 'stages ran out of order or while disabled';
+    END IF;
+    IF (SELECT array_agg(stage ORDER BY stage) FROM tick_stats WHERE tick = 1)
+       <> ARRAY['first', 'second'] THEN
+        RAISE EXCEPTION 'stage timings not recorded';
+    END IF;
+END$$;
+
+-- several ticks per call, optionally skipping stages
+CALL tick(3, ARRAY['second']);
+DO $$
+BEGIN
+    IF (SELECT current_tick FROM game_state) != 4 THEN
+        RAISE EXCEPTION 'tick(3) did not advance three ticks';
+    END IF;
+    IF (SELECT array_agg(tick ORDER BY tick) FROM stage_log WHERE stage = 'first')
+       <> ARRAY[1, 2, 3, 4] THEN
+        RAISE EXCEPTION 'first stage did not run once per tick';
+    END IF;
+    IF EXISTS (SELECT 1 FROM stage_log WHERE stage = 'second' AND tick > 1) THEN
+        RAISE EXCEPTION 'skipped stage ran';
+    END IF;
+    IF (SELECT count(*) FROM tick_stats) <> 5 THEN
+        RAISE EXCEPTION 'unexpected number of stage timings';
+    END IF;
+END$$;
+
+-- old stage timings are pruned, the last keep_ticks ticks are kept
+DO $$
+BEGIN
+    IF prune_tick_stats(2) <> 3 THEN
+        RAISE EXCEPTION 'expected the timings of ticks 1 and 2 to be pruned';
+    END IF;
+    IF (SELECT array_agg(tick ORDER BY tick) FROM tick_stats) <> ARRAY[3, 4]::bigint[] THEN
+        RAISE EXCEPTION 'recent stage timings pruned';
+    END IF;
+END$$;
+
+-- tick cost does not grow with the map: a 16x larger map writes the same
+-- number of rows per tick and takes about as long
+DELETE FROM tick_stages;
+DO $$
+DECLARE
+    side int;
+    started timestamptz;
+    elapsed interval[] := '{}';
+    written bigint[] := '{}';
+    before bigint;
+BEGIN
+    FOREACH side IN ARRAY ARRAY[100, 400] LOOP
+        TRUNCATE terrain;
+        INSERT INTO terrain (updated_tick)
+        SELECT 0 FROM generate_series(1, side * side);
+
+        SELECT n_tup_ins + n_tup_upd + n_tup_del INTO before
+        FROM pg_stat_xact_user_tables WHERE relname = 'terrain';
+        started := clock_timestamp();
+        CALL tick(20);
+        elapsed := elapsed || (clock_timestamp() - started);
+        written := written || (
+            SELECT n_tup_ins + n_tup_upd + n_tup_del - before
+            FROM pg_stat_xact_user_tables WHERE relname = 'terrain'
+        );
+    END LOOP;
+
+    RAISE NOTICE 'tick(20) on 100x100: %, on 400x400: %', elapsed[1], elapsed[2];
+    IF written <> ARRAY[0, 0]::bigint[] THEN
+        RAISE EXCEPTION 'tick wrote terrain rows: %', written;
+    END IF;
+    IF elapsed[2] > elapsed[1] * 4 + interval '50 ms' THEN
+        RAISE EXCEPTION 'tick time grew with map size: %', elapsed;
+    END IF;
+END$$;
+
+-- fast_forward() rejects a non-positive commit interval
+DO $$
+BEGIN
+    CALL fast_forward(10, 0);
+    RAISE EXCEPTION 'commit_every 0 accepted';
+EXCEPTION WHEN raise_exception THEN
+    IF SQLERRM <> 'commit_every must be positive' THEN
+        RAISE;
     END IF;
 END$$;
 
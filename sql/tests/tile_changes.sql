@@ -0,0 +1,59 @@
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+-- load table definitions and trigger under test
+\ir ../tables/terrain.sql
+\ir ../tables/sprites.sql
+\ir ../tables/tiles.sql
+\ir ../tables/game_state.sql
+\ir ../procs/tile_changes.sql
+
+-- setup a small map at tick 3
+INSERT INTO game_state (current_tick) VALUES (3);
+INSERT INTO terrain (name) VALUES ('grass'), ('water');
+INSERT INTO tiles (x, y, terrain_id)
+SELECT x, y, 1
+FROM generate_series(0, 2) x CROSS JOIN generate_series(0, 2) y;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM tiles WHERE updated_tick <> 3) THEN
+        RAISE EXCEPTION 'inserted tiles not stamped with current tick';
+    END IF;
+END$$;
+
+-- modify a single tile at a later tick
+UPDATE game_state SET current_tick = 5;
+UPDATE tiles SET terrain_id = 2 WHERE x = 1 AND y = 1;
+
+DO $$
+BEGIN
+    IF (SELECT count(*) FROM tiles WHERE updated_tick >= 4) <> 1 THEN
+        RAISE EXCEPTION 'expected exactly one changed tile';
+    END IF;
+    IF (SELECT updated_tick FROM tiles WHERE x = 1 AND y = 1) <> 5 THEN
+        RAISE EXCEPTION 'changed tile not stamped with new tick';
+    END IF;
+END$$;
+
+
+-- Loading the table again adds the stamp and its index to tiles from before
+-- change tracking
+DROP INDEX tiles_updated_tick_idx;
+ALTER TABLE tiles DROP COLUMN updated_tick;
+\ir ../tables/tiles.sql
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM tiles WHERE updated_tick <> 0) THEN
+        RAISE EXCEPTION 'updated_tick not added to existing tiles';
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_indexes WHERE indexname = 'tiles_updated_tick_idx'
+    ) THEN
+        RAISE EXCEPTION 'updated_tick index not rebuilt';
+    END IF;
+END$$;
+
+ROLLBACK;
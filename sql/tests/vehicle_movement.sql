@@ -2,12 +2,6 @@
 
 BEGIN;
 
--- load schema and function under test
-\ir ../tables/companies.sql
-\ir ../tables/vehicles.sql
-\ir ../procs/pathfinding.sql
-\ir ../procs/vehicle_movement.sql
-
 -- minimal terrain for pathfinding
 CREATE TEMP TABLE terrain(
     tile_x int,
@@ -18,6 +12,15 @@ INSERT INTO terrain(tile_x, tile_y, type)
 SELECT x, y, 'plain'
 FROM generate_series(1,3) x CROSS JOIN generate_series(1,3) y;
 
+-- load schema and function under test
+\ir ../tables/companies.sql
+\ir ../tables/vehicles.sql
+\ir ../tables/game_state.sql
+\ir ../tables/route_cache.sql
+\ir ../procs/pathfinding.sql
+\ir ../procs/route_cache.sql
+\ir ../procs/vehicle_movement.sql
+
 -- setup a vehicle starting at (1,1)
 TRUNCATE vehicles RESTART IDENTITY;
 INSERT INTO vehicles (x, y) VALUES (1, 1);
@@ -56,4 +56,76 @@ BEGIN
     END;
 END$$;
 
+-- waypoint columns follow the schedule
+DO $$
+DECLARE
+    vid int;
+BEGIN
+    SELECT id INTO vid FROM vehicles;
+    IF (SELECT (schedule_x, schedule_y, schedule_len) FROM vehicles WHERE id = vid)
+       IS DISTINCT FROM ('{1,2}'::int[], '{1,2}'::int[], 2) THEN
+        RAISE EXCEPTION 'schedule not unpacked on insert';
+    END IF;
+    UPDATE vehicles SET schedule = '[{"x":5,"y":3}]', schedule_idx = 0
+    WHERE id = vid;
+    IF (SELECT (schedule_x, schedule_y, schedule_len) FROM vehicles WHERE id = vid)
+       IS DISTINCT FROM ('{5}'::int[], '{3}'::int[], 1) THEN
+        RAISE EXCEPTION 'schedule not unpacked on update';
+    END IF;
+    UPDATE vehicles SET schedule = '[]' WHERE id = vid;
+    IF (SELECT (schedule_x, schedule_y, schedule_len) FROM vehicles WHERE id = vid)
+       IS DISTINCT FROM ('{}'::int[], '{}'::int[], 0) THEN
+        RAISE EXCEPTION 'empty schedule not unpacked';
+    END IF;
+END$$;
+
+
+-- Loading the table again upgrades vehicles from before unpacked schedules
+DROP TRIGGER vehicles_unpack_schedule ON vehicles;
+DELETE FROM vehicles;
+ALTER TABLE vehicles
+    DROP CONSTRAINT schedule_idx_within_bounds,
+    DROP COLUMN schedule_x,
+    DROP COLUMN schedule_y,
+    DROP COLUMN schedule_len,
+    ADD CONSTRAINT schedule_idx_within_bounds
+    CHECK (
+        schedule_idx >= 0
+        AND schedule_idx < GREATEST(JSONB_ARRAY_LENGTH(schedule), 1)
+    );
+INSERT INTO vehicles (x, y, schedule, schedule_idx)
+VALUES (0, 0, '[{"x":1,"y":2},{"x":3,"y":4}]', 1);
+\ir ../tables/vehicles.sql
+\ir ../tables/vehicles.sql
+
+DO $$
+BEGIN
+    IF (SELECT (schedule_x, schedule_y, schedule_len) FROM vehicles)
+       IS DISTINCT FROM ('{1,3}'::int[], '{2,4}'::int[], 2) THEN
+        RAISE EXCEPTION 'existing schedules not unpacked';
+    END IF;
+    IF pg_get_constraintdef((
+        SELECT oid FROM pg_constraint
+        WHERE conname = 'schedule_idx_within_bounds'
+    )) NOT LIKE '%schedule_len%' THEN
+        RAISE EXCEPTION 'schedule_idx bound not moved to schedule_len';
+    END IF;
+END$$;
+INSERT INTO vehicles (x, y, schedule) VALUES (1, 1, '[{"x":5,"y":6}]');
+
+
+-- Loading the table again lowers the fillfactor of an existing table
+ALTER TABLE vehicles RESET (fillfactor);
+\ir ../tables/vehicles.sql
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_class
+        WHERE oid = 'vehicles'::regclass AND 'fillfactor=70' = ANY (reloptions)
+    ) THEN
+        RAISE EXCEPTION 'fillfactor not set on existing vehicles';
+    END IF;
+END$$;
+
 ROLLBACK;
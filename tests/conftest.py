@@ -0,0 +1,17 @@
+import types
+
+import pytest
+
+
+@pytest.fixture
+def dummy_curses(monkeypatch):
+    dummy = types.SimpleNamespace(
+        COLOR_BLACK=0,
+        COLOR_WHITE=7,
+        KEY_RESIZE=410,
+        error=Exception,
+        init_pair=lambda idx, fg, bg: None,
+        color_pair=lambda idx: idx,
+    )
+    monkeypatch.setattr("renderer.cli_viewer.curses", dummy, raising=False)
+    return dummy
@@ -1,11 +1,32 @@
 import psycopg
 
 
+class DummyCopy:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+    def write_row(self, row):
+        self.rows.append(row)
+
+
 class DummyCursor:
-    def __init__(self, should_fail: bool = False):
+    """A cursor that records statements and returns *rows* to every query."""
+
+    def __init__(self, should_fail: bool = False, rows=()):
         self.should_fail = should_fail
+        self.rows = list(rows)
         self.executed = None
         self.sql = None
+        self.params = None
+        # Every (sql, params) executed or copied, in order
+        self.statements = []
+        self.copied = []
 
     def __enter__(self):
         return self
@@ -17,9 +38,21 @@ class DummyCursor:
         if self.should_fail:
             raise psycopg.Error("boom")
         self.sql = sql
+        self.params = params
+        self.statements.append((sql, params))
         if params is not None:
             self.executed = (sql, params)
 
+    def copy(self, sql):
+        self.statements.append((sql, None))
+        return DummyCopy(self.copied)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def __iter__(self):
+        return iter(self.rows)
+
 
 class DummyConnection:
     def __init__(self, cursor: DummyCursor):
@@ -27,6 +60,7 @@ class DummyConnection:
         self.committed = False
         self.rolled_back = False
         self.closed = False
+        self.broken = False
 
     def cursor(self):
         return self.cursor_obj
@@ -45,3 +79,33 @@ class DummyConnection:
 
     def __exit__(self, exc_type, exc, tb):
         self.close()
+
+
+class DummyScreen:
+    """A curses window that records what is drawn on it."""
+
+    def __init__(self, keys=(), size=(4, 6)):
+        self.keys = list(keys)
+        self.size = size
+        self.drawn = []
+        self.colors = []
+        self.erased = 0
+        self.refreshed = 0
+
+    def getmaxyx(self):
+        return self.size
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else -1
+
+    def erase(self):
+        self.erased += 1
+
+    def addch(self, y, x, ch, color):
+        if isinstance(ch, int):
+            ch = chr(ch)
+        self.drawn.append((x, y, ch))
+        self.colors.append(color)
+
+    def refresh(self):
+        self.refreshed += 1
@@ -0,0 +1,101 @@
+import asyncio
+import contextlib
+
+from pgttd import aio
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    async def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def execute(self, sql, params=None, prepare=None):
+        self.pool.executed.append((sql, params, prepare))
+        if sql.startswith("CALL"):
+            await self.pool.tick_may_finish.wait()
+        return FakeCursor(self.pool.rows.get(sql.split()[1], [(7,)]))
+
+
+class FakePool:
+    def __init__(self, rows=None):
+        self.rows = rows or {}
+        self.executed = []
+        self.borrowed = 0
+        self.tick_may_finish = asyncio.Event()
+        self.tick_may_finish.set()
+
+    @contextlib.asynccontextmanager
+    async def connection(self):
+        self.borrowed += 1
+        yield FakeConnection(self)
+
+
+def test_tick_calls_prepared_tick_and_returns_new_tick():
+    pool = FakePool()
+    assert asyncio.run(aio.AsyncClient(pool).tick()) == 7
+    assert pool.executed == [
+        ("CALL tick()", None, True),
+        (aio.CURRENT_TICK_SQL, None, None),
+    ]
+
+
+def test_tick_can_skip_stages():
+    pool = FakePool()
+    asyncio.run(aio.AsyncClient(pool).tick(skip=["move_vehicles"]))
+    assert pool.executed[0] == ("CALL tick(1, %s)", (["move_vehicles"],), None)
+
+
+def test_region_queries_pass_bounds():
+    pool = FakePool()
+    client = aio.AsyncClient(pool)
+
+    async def run():
+        await client.fetch_changed_tiles(5, (0, 9, 10, 19))
+        await client.fetch_vehicles((1, 2, 3, 4))
+        await client.fetch_tiles()
+        await client.fetch_frame((0, 79, 0, 23))
+        await client.fetch_packed_frame((0, 79, 0, 23), rle=True)
+        await client.fetch_tiles((0, 1, 2, 3), sprite_ids=True)
+
+    asyncio.run(run())
+    changed, vehicles, tiles, frame, packed, sprite_ids = pool.executed
+    assert "t.updated_tick >= %s AND t.x BETWEEN" in changed[0]
+    assert changed[1] == (5, 0, 9, 10, 19)
+    assert vehicles[0].startswith(aio.VEHICLES_IN_RECT_SQL)
+    assert vehicles[1] == (1, 2, 3, 4)
+    assert tiles[0].endswith("ORDER BY t.y, t.x")
+    assert frame[:2] == (aio.FRAME_SQL, (0, 79, 0, 23))
+    assert packed[:2] == (aio.PACKED_FRAME_SQL, (0, 79, 0, 23, True))
+    assert sprite_ids[0].startswith(aio.TILE_SPRITES_SQL + " WHERE")
+
+
+def test_queries_run_while_a_tick_is_in_flight():
+    pool = FakePool(rows={"t.x,": [(0, 0, ".", "green")]})
+    pool.tick_may_finish.clear()
+    client = aio.AsyncClient(pool)
+
+    async def fetch_then_release_tick():
+        tiles = await client.fetch_tiles()
+        # The tick is still waiting here, on a connection of its own
+        pool.tick_may_finish.set()
+        return tiles
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(client.tick(), fetch_then_release_tick()), 1
+        )
+
+    tick, tiles = asyncio.run(run())
+    assert tick == 7
+    assert tiles == [(0, 0, ".", "green")]
+    assert pool.borrowed == 2
@@ -0,0 +1,100 @@
+import asyncio
+
+import psycopg
+import pytest
+
+from renderer import cli_viewer
+from tests.helpers import DummyScreen
+
+
+class SlowTickClient:
+    """A client whose first tick never finishes."""
+
+    def __init__(self):
+        self.tick_started = asyncio.Event()
+        self.regions = []
+
+    async def tick(self):
+        self.tick_started.set()
+        await asyncio.Event().wait()
+
+    async def game_state(self):
+        return 0, 1
+
+    async def fetch_sprites(self):
+        return [(1, ".", "green", b""), (2, "#", None, b"")]
+
+    async def fetch_tiles(self, region, sprite_ids=False):
+        assert sprite_ids
+        self.regions.append(region)
+        return [(0, 0, 1), (1, 0, 2)]
+
+    async def fetch_changed_tiles(self, since_tick, region, sprite_ids=False):
+        return []
+
+    async def fetch_vehicles(self, region):
+        return [(1, 1, 0, None)]
+
+    async def fetch_frame(self, region):
+        self.regions.append(region)
+        return [(0, 0, ".", "green"), (1, 0, "@", "yellow")]
+
+
+@pytest.fixture
+def dummy_curses(dummy_curses, monkeypatch):
+    monkeypatch.setattr(cli_viewer, "INPUT_POLL", 0.001)
+    return dummy_curses
+
+
+def test_frames_and_keys_do_not_wait_for_ticks(dummy_curses):
+    client = SlowTickClient()
+    screen = DummyScreen([])
+    viewer = cli_viewer.AsyncViewer(screen, client, refresh=0.001, step=False)
+
+    async def run():
+        task = asyncio.create_task(viewer.run())
+        await client.tick_started.wait()
+        while viewer.frames < 5 and not task.done():
+            await asyncio.sleep(0.001)
+        # Pan while the tick is still running, then quit
+        screen.keys += [ord("l"), ord("q")]
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+    assert viewer.ticks == 0
+    assert screen.drawn[:3] == [(0, 0, "."), (1, 0, "#"), (1, 0, "@")]
+    assert client.regions[0] == (0, 37, 0, 35)
+    assert viewer.view.x == 4
+
+
+def test_step_mode_ticks_on_t_and_stops_on_tick_failure(dummy_curses):
+    class FailingClient(SlowTickClient):
+        async def tick(self):
+            raise psycopg.Error("boom")
+
+    screen = DummyScreen([-1, ord("t")])
+    viewer = cli_viewer.AsyncViewer(screen, FailingClient(), refresh=0.001, step=True)
+
+    asyncio.run(asyncio.wait_for(viewer.run(), 1))
+    assert viewer.ticks == 0
+
+
+def test_frame_mode_draws_one_query_per_frame(dummy_curses):
+    client = SlowTickClient()
+    screen = DummyScreen([])
+    viewer = cli_viewer.AsyncViewer(
+        screen, client, refresh=0.001, step=False, frame=True
+    )
+
+    async def run():
+        task = asyncio.create_task(viewer.run())
+        while viewer.frames < 3 and not task.done():
+            await asyncio.sleep(0.001)
+        screen.keys.append(ord("q"))
+        await asyncio.wait_for(task, 1)
+
+    asyncio.run(run())
+    # Later frames match the first, so nothing is repainted
+    assert screen.drawn == [(0, 0, "."), (1, 0, "@")]
+    assert client.regions[0] == (0, 5, 0, 3)
+    assert len(client.regions) == viewer.frames
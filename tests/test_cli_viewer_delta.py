@@ -0,0 +1,73 @@
+import pytest
+
+from renderer.cli_viewer import (
+    Tile,
+    fetch_changed_tiles,
+    needs_resync,
+    render_changes,
+    render_vehicles,
+    track,
+)
+from tests.helpers import DummyCursor, DummyConnection, DummyScreen
+
+
+def test_render_changes_skips_unchanged_cells(dummy_curses):
+    grid = {}
+    list(track([Tile(0, 0, ".", "green"), Tile(1, 0, ".", "green")], grid))
+    screen = DummyScreen()
+
+    drawn = render_changes(
+        screen,
+        [Tile(0, 0, ".", "green"), Tile(1, 0, "#", "red")],
+        grid,
+        color_cache={},
+    )
+
+    assert drawn == 1
+    assert screen.drawn == [(1, 0, "#")]
+    assert grid[(1, 0)] == Tile(1, 0, "#", "red")
+    assert screen.refreshed == 1
+
+
+def test_render_changes_without_changes_does_not_refresh(dummy_curses):
+    grid = {(0, 0): Tile(0, 0, ".", "green")}
+    screen = DummyScreen()
+
+    assert render_changes(screen, [Tile(0, 0, ".", "green")], grid, {}) == 0
+    assert screen.refreshed == 0
+
+
+def test_render_vehicles_restores_tiles_vehicles_left(dummy_curses):
+    grid = {}
+    list(track([Tile(0, 0, ".", "green"), Tile(1, 0, "#", "red")], grid))
+    screen = DummyScreen()
+
+    shown = render_vehicles(screen, {(1, 0)}, {(0, 0), (1, 0)}, grid, {})
+
+    assert shown == {(1, 0)}
+    assert screen.drawn == [(0, 0, "."), (1, 0, "@")]
+    assert screen.refreshed == 1
+
+
+def test_fetch_changed_tiles_filters_by_tick():
+    cursor = DummyCursor(rows=[(2, 3, "#", None)])
+    tiles = list(fetch_changed_tiles(DummyConnection(cursor), 7))
+
+    assert tiles == [Tile(2, 3, "#", "white")]
+    assert "updated_tick >= %s" in cursor.sql
+    assert cursor.params == (7,)
+
+
+@pytest.mark.parametrize(
+    "last_tick, current_tick, max_lag, expected",
+    [
+        (None, 0, 100, True),
+        (5, 6, 100, False),
+        (5, 5, 100, False),
+        (5, 3, 100, True),
+        (5, 200, 100, True),
+        (5, 200, 0, False),
+    ],
+)
+def test_needs_resync(last_tick, current_tick, max_lag, expected):
+    assert needs_resync(last_tick, current_tick, max_lag) is expected
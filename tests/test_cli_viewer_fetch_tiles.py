@@ -1,4 +1,5 @@
-from renderer.cli_viewer import fetch_tiles
+from renderer.cli_viewer import FRAME_SQL, Tile, Viewport, fetch_frame, fetch_tiles
+from tests.helpers import DummyCursor, DummyConnection
 
 
 def test_fetch_tiles_sorted_by_y_then_x():
@@ -42,3 +43,12 @@ def test_fetch_tiles_sorted_by_y_then_x():
     expected = sorted([(x, y) for x, y, _, _ in rows], key=lambda p: (p[1], p[0]))
     assert coords == expected
     assert "order by t.y, t.x" in conn.cur.sql.lower()
+
+
+def test_fetch_frame_queries_the_viewport():
+    cursor = DummyCursor(rows=[(3, 4, "@", "yellow"), (4, 4, ".", None)])
+    tiles = list(fetch_frame(DummyConnection(cursor), Viewport(3, 4, 2, 1)))
+
+    assert tiles == [Tile(3, 4, "@", "yellow"), Tile(4, 4, ".", "white")]
+    assert cursor.sql == FRAME_SQL
+    assert cursor.params == (3, 4, 4, 4)
@@ -0,0 +1,41 @@
+import pytest
+
+from renderer.cli_viewer import FRAME_HEADER, decode_frame, paint_frame
+from tests.helpers import DummyScreen
+
+# 2x2 frame: '@' yellow, '.' green, '.' green, no tile
+PLANES = b"@..\x00" + b"\x03\x02\x02\x00"
+RAW = FRAME_HEADER.pack(2, 2, 0) + PLANES
+RLE = FRAME_HEADER.pack(2, 2, 1) + b"\x01@\x02.\x01\x00\x01\x03\x02\x02\x01\x00"
+
+
+@pytest.mark.parametrize("data", [RAW, RLE])
+def test_decode_frame_splits_planes(data):
+    assert decode_frame(data) == (2, 2, b"@..\x00", b"\x03\x02\x02\x00")
+
+
+def test_decode_frame_rejects_truncated_frames():
+    with pytest.raises(ValueError, match="expected 8"):
+        decode_frame(RAW[:-1])
+
+
+def test_paint_frame_repaints_only_changed_cells(dummy_curses):
+    screen = DummyScreen()
+    cache: dict[str, int] = {}
+
+    planes = paint_frame(screen, RAW, None, cache)
+    assert planes == PLANES
+    assert screen.erased == 1
+    assert screen.drawn == [(0, 0, "@"), (1, 0, "."), (0, 1, ".")]
+    assert screen.colors[0] == cache["yellow"]
+
+    # The vehicle moves from (0, 0) to (1, 1)
+    screen.drawn.clear()
+    moved = FRAME_HEADER.pack(2, 2, 0) + b"...@" + b"\x02\x02\x02\x03"
+    assert paint_frame(screen, moved, planes, cache) == b"...@\x02\x02\x02\x03"
+    assert screen.drawn == [(0, 0, "."), (1, 1, "@")]
+    assert screen.erased == 1
+
+    refreshed = screen.refreshed
+    paint_frame(screen, moved, b"...@\x02\x02\x02\x03", cache)
+    assert screen.refreshed == refreshed
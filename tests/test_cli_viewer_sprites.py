@@ -0,0 +1,140 @@
+import os
+from pathlib import Path
+
+import psycopg
+import pytest
+
+from renderer.cli_viewer import (
+    GAME_STATE_SQL,
+    SPRITES_SQL,
+    Sprite,
+    SpriteAtlas,
+    Tile,
+    Viewport,
+    fetch_changed_tiles,
+    fetch_game_state,
+    fetch_tiles,
+)
+from tests.helpers import DummyCursor, DummyConnection
+
+SQL_DIR = Path(__file__).resolve().parent.parent / "sql"
+
+PNG = b"\x89PNG\r\n\x1a\n"
+SPRITES = [
+    (1, ".", "Green", memoryview(PNG)),
+    (2, "#", None, b""),
+]
+
+
+def test_atlas_loads_sprites_once_per_version():
+    cursor = DummyCursor(rows=SPRITES)
+    conn = DummyConnection(cursor)
+    atlas = SpriteAtlas()
+
+    assert atlas.sync(conn, 3)
+    assert not atlas.sync(conn, 3)
+    assert cursor.statements == [(SPRITES_SQL, None)]
+    assert atlas.sprites == {
+        1: Sprite(".", "green", PNG),
+        2: Sprite("#", "white", b""),
+    }
+
+    assert atlas.sync(conn, 4)
+    assert len(cursor.statements) == 2
+
+
+def test_atlas_tiles_look_up_sprite_ids():
+    atlas = SpriteAtlas()
+    atlas.update(SPRITES, 1)
+
+    tiles = list(atlas.tiles([(0, 0, 1), (1, 0, 2), (2, 0, 9)]))
+
+    assert tiles == [
+        Tile(0, 0, ".", "green"),
+        Tile(1, 0, "#", "white"),
+        Tile(2, 0, "?", "white"),
+    ]
+
+
+def test_fetch_tiles_with_atlas_skips_the_sprite_join():
+    atlas = SpriteAtlas()
+    atlas.update(SPRITES, 1)
+    cursor = DummyCursor(rows=[(5, 6, 1)])
+
+    tiles = list(fetch_tiles(DummyConnection(cursor), Viewport(5, 6, 2, 2), atlas))
+
+    assert tiles == [Tile(5, 6, ".", "green")]
+    sql, params = cursor.executed
+    assert sql.startswith("SELECT t.x, t.y, t.sprite_id FROM tiles t ")
+    assert "sprites" not in sql
+    assert params == (5, 6, 6, 7)
+
+
+def test_fetch_game_state_reads_tick_and_sprite_version():
+    cursor = DummyCursor(rows=[(None, 4)])
+    assert fetch_game_state(DummyConnection(cursor)) == (0, 4)
+    assert cursor.statements == [(GAME_STATE_SQL, None)]
+
+
+@pytest.fixture
+def pg_conn():
+    dsn = os.environ.get("DATABASE_URL")
+    if not dsn:
+        pytest.skip("DATABASE_URL is not set")
+    try:
+        conn = psycopg.connect(dsn, client_encoding="UTF8")
+    except psycopg.OperationalError:
+        pytest.skip("database is not reachable")
+    with conn:
+        with conn.cursor() as cur:
+            # Build the schema in a scratch namespace that is rolled back
+            cur.execute("CREATE SCHEMA sprite_atlas")
+            cur.execute("SET LOCAL search_path TO sprite_atlas")
+            cur.execute((SQL_DIR / "schema.sql").read_text())
+            cur.execute(
+                "INSERT INTO game_state (current_tick, sprite_version) VALUES (5, 2)"
+            )
+            cur.execute("INSERT INTO terrain (name) VALUES ('grass')")
+            cur.execute(
+                "INSERT INTO sprite_images (sha256, image) VALUES (sha256(%s), %s)",
+                (PNG, PNG),
+            )
+            cur.execute(
+                "INSERT INTO sprites (name, glyph, color, image_sha256) "
+                "VALUES ('grass', '.', 'Green', sha256(%s)), "
+                "('plain', DEFAULT, DEFAULT, sha256(%s))",
+                (PNG, PNG),
+            )
+            cur.execute(
+                "INSERT INTO tiles (x, y, terrain_id, sprite_id, updated_tick) "
+                "VALUES (0, 0, 1, 1, 4), (1, 0, 1, 2, 5), (0, 1, 1, NULL, 5)"
+            )
+        yield conn
+        conn.rollback()
+
+
+def test_atlas_queries_run_against_the_schema(pg_conn):
+    atlas = SpriteAtlas()
+    version = fetch_game_state(pg_conn)
+
+    assert version == (5, 2)
+    assert atlas.sync(pg_conn, version[1])
+    assert atlas.sprites == {
+        1: Sprite(".", "green", PNG),
+        2: Sprite("?", "white", PNG),
+    }
+    assert list(fetch_tiles(pg_conn, Viewport(0, 0, 2, 2), atlas)) == [
+        Tile(0, 0, ".", "green"),
+        Tile(1, 0, "?", "white"),
+        Tile(0, 1, "?", "white"),
+    ]
+    # Without an atlas tiles without a sprite are left out by the join
+    assert list(fetch_tiles(pg_conn, Viewport(0, 0, 2, 2))) == [
+        Tile(0, 0, ".", "Green"),
+        Tile(1, 0, "?", "white"),
+    ]
+    changed = fetch_changed_tiles(pg_conn, 5, atlas=atlas)
+    assert sorted(changed, key=lambda tile: (tile.y, tile.x)) == [
+        Tile(1, 0, "?", "white"),
+        Tile(0, 1, "?", "white"),
+    ]
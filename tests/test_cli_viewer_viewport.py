@@ -0,0 +1,31 @@
+from renderer.cli_viewer import Tile, Viewport, fetch_tiles, render
+from tests.helpers import DummyCursor, DummyConnection, DummyScreen
+
+
+def test_viewport_expand_clamps_at_origin():
+    view = Viewport(2, 10, 4, 3)
+    grown = view.expand(5)
+    assert grown == Viewport(0, 5, 11, 13)
+    assert grown.contains(view)
+    assert not view.contains(grown)
+
+
+def test_viewport_pan_does_not_go_negative():
+    assert Viewport(1, 1, 4, 4).pan(-4, 2) == Viewport(0, 3, 4, 4)
+
+
+def test_fetch_tiles_uses_range_predicate():
+    cursor = DummyCursor()
+    list(fetch_tiles(DummyConnection(cursor), Viewport(10, 20, 5, 3)))
+    assert "t.x BETWEEN %s AND %s AND t.y BETWEEN %s AND %s" in cursor.sql
+    assert cursor.params == (10, 14, 20, 22)
+    assert "order by t.y, t.x" in cursor.sql.lower()
+
+
+def test_render_offsets_and_clips_to_viewport(dummy_curses):
+    screen = DummyScreen()
+    tiles = [Tile(9, 9, "a", "white"), Tile(10, 10, "b", "white")]
+
+    render(screen, tiles, color_cache={}, view=Viewport(10, 10, 2, 2))
+
+    assert screen.drawn == [(0, 0, "b")]
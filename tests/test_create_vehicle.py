@@ -1,9 +1,9 @@
+import io
 import json
 import sys
 from unittest.mock import MagicMock
 
 import pytest
-from psycopg.types.json import Json
 
 from pgttd import create_vehicle
 from tests.helpers import DummyCursor, DummyConnection
@@ -56,10 +56,9 @@ def test_main_success(monkeypatch, capsys):
     assert "INSERT INTO vehicles" in sql
     assert params[0] == 1
     assert params[1] == 2
-    assert isinstance(params[2], Json)
-    assert params[2].obj == [{"x": 1, "y": 2}]
-    assert isinstance(params[3], Json)
-    assert params[3].obj == [{"resource": "wood", "amount": 3}]
+    # The validated JSON text is sent as given
+    assert params[2] == '[{"x":1,"y":2}]'
+    assert params[3] == '[{"resource":"wood","amount":3}]'
     assert params[4] == 7
     assert conn.committed
     assert conn.closed
@@ -83,10 +82,8 @@ def test_main_defaults(monkeypatch, capsys):
     assert "INSERT INTO vehicles" in sql
     assert params[0] == 1
     assert params[1] == 1
-    assert isinstance(params[2], Json)
-    assert params[2].obj == []
-    assert isinstance(params[3], Json)
-    assert params[3].obj == []
+    assert params[2] == "[]"
+    assert params[3] == "[]"
     assert params[4] is None
     assert conn.committed
     assert conn.closed
@@ -217,3 +214,202 @@ def test_insert_vehicle_cargo_amount_negative(monkeypatch):
         create_vehicle.insert_vehicle(DSN, 0, 0, "[]", cargo, None)
 
     connect_mock.assert_not_called()
+
+
+def test_read_vehicles_jsonl():
+    lines = [
+        '{"x": 3, "y": 4, "schedule": [{"x": 1, "y": 2}], "company_id": 7}\n',
+        "\n",
+        '{"cargo": [{"resource": "wood", "amount": 3}]}\n',
+    ]
+    assert list(create_vehicle.read_vehicles(iter(lines))) == [
+        (3, 4, '[{"x": 1, "y": 2}]', "[]", 7),
+        (1, 1, "[]", '[{"resource": "wood", "amount": 3}]', None),
+    ]
+
+
+def test_read_vehicles_csv_keeps_json_text_and_defaults():
+    text = 'x,y,schedule,cargo,company_id\n5,6,"[{""x"":1,""y"":2}]",,\n'
+    rows = list(create_vehicle.read_vehicles(io.StringIO(text), "csv"))
+    assert rows == [(5, 6, '[{"x":1,"y":2}]', "[]", None)]
+
+
+@pytest.mark.parametrize(
+    "lines, fmt, msg",
+    [
+        (['{"x": 1}\n', "not json\n"], "jsonl", "Line 2: Invalid JSON"),
+        (["[1]\n"], "jsonl", "Line 1: Vehicle must be a JSON object"),
+        (['{"speed": 3}\n'], "jsonl", "Line 1: Unknown keys: speed"),
+        (['{"x": "1"}\n'], "jsonl", "Line 1: 'x' must be an integer"),
+        (['{"schedule": "[]"}\n'], "jsonl", "--schedule must be a JSON array"),
+        (['{"schedule": [{"x": 1}]}\n'], "jsonl", "Schedule entry 0 missing 'y'"),
+        (["x,y\n", "1,a\n"], "csv", "Line 2: 'y' must be an integer"),
+        (["company_id\n", "acme\n"], "csv", "'company_id' must be an integer"),
+        (["x,y\n", "1,2,3\n"], "csv", "Line 2: too many fields"),
+        (["x,y\n", "1\n"], "csv", "Line 2: too few fields"),
+    ],
+)
+def test_read_vehicles_reports_first_invalid_line(lines, fmt, msg):
+    with pytest.raises(ValueError, match=msg):
+        list(create_vehicle.read_vehicles(iter(lines), fmt))
+
+
+def test_read_vehicles_collects_csv_rows_with_extra_fields():
+    errors = []
+    text = "x,y\n1,2,3\n4,5\n"
+    rows = list(create_vehicle.read_vehicles(io.StringIO(text), "csv", errors))
+    assert rows == [(4, 5, "[]", "[]", None)]
+    assert errors == [(2, "too many fields")]
+
+
+def test_main_from_file_copies_rows(monkeypatch, tmp_path, capsys):
+    path = tmp_path / "vehicles.csv"
+    path.write_text("x,y\n1,2\n3,4\n")
+    cursor = DummyCursor()
+    conn = DummyConnection(cursor)
+    monkeypatch.setattr(create_vehicle.db, "connect", lambda dsn: conn)
+    monkeypatch.setattr(
+        sys, "argv", ["create_vehicle.py", "--dsn", DSN, "--from-file", str(path)]
+    )
+
+    create_vehicle.main()
+
+    assert cursor.statements[-1][0].startswith("COPY vehicles (x, y, schedule")
+    assert cursor.copied == [(1, 2, "[]", "[]", None), (3, 4, "[]", "[]", None)]
+    assert conn.committed
+    assert "Inserted 2 vehicles" in capsys.readouterr().out
+
+
+def test_main_from_file_rolls_back_invalid_input(monkeypatch):
+    cursor = DummyCursor()
+    conn = DummyConnection(cursor)
+    monkeypatch.setattr(create_vehicle.db, "connect", lambda dsn: conn)
+    monkeypatch.setattr(sys, "stdin", io.StringIO('{"x": 1}\n{"x": -}\n'))
+    monkeypatch.setattr(
+        sys, "argv", ["create_vehicle.py", "--dsn", DSN, "--from-file", "-"]
+    )
+
+    with pytest.raises(SystemExit, match="Line 2"):
+        create_vehicle.main()
+
+    assert conn.rolled_back
+    assert not conn.committed
+
+
+@pytest.mark.parametrize(
+    "schedule",
+    [
+        "[]",
+        '[{"x":1,"y":2}]',
+        ' [ {"y": -3, "x": 0},\n {"x": 10, "y": 20} ] ',
+    ],
+)
+def test_check_schedule_text_returns_text_unchanged(schedule):
+    assert create_vehicle.check_schedule_text(schedule) is schedule
+
+
+@pytest.mark.parametrize(
+    "schedule, msg",
+    [
+        ("[{}", "Invalid JSON for --schedule"),
+        ('[{"x":01,"y":2}]', "Invalid JSON for --schedule"),
+        ('[{"x":1.5,"y":2}]', "Schedule entry 0 key 'x' must be an integer"),
+        ('[{"x":1,"y":2},{"x":3}]', "Schedule entry 1 missing 'y'"),
+    ],
+)
+def test_check_schedule_text_reports_full_validation_errors(schedule, msg):
+    with pytest.raises(ValueError, match=msg):
+        create_vehicle.check_schedule_text(schedule)
+
+
+def test_check_schedule_text_accepts_shapes_outside_the_fast_path():
+    # Extra keys are allowed by validate_schedule, so they pass the slow path
+    schedule = '[{"x":1,"y":2,"z":3}]'
+    assert create_vehicle.check_schedule_text(schedule) is schedule
+
+
+@pytest.mark.parametrize(
+    "cargo, valid",
+    [
+        ('[{"resource":"w\\u00e4ter \\"x\\"","amount":0}]', True),
+        ('[{"amount": 3, "resource": "wood"}]', True),
+        ('[{"resource":"wood","amount":-1}]', False),
+        ('[{"resource":"wood","amount":1e3}]', False),
+        ('[{"resource":7,"amount":1}]', False),
+        ('[{"resource":"wood"}]', False),
+    ],
+)
+def test_check_cargo_text_matches_validate_cargo(cargo, valid):
+    if valid:
+        create_vehicle.validate_cargo(cargo)
+        assert create_vehicle.check_cargo_text(cargo) is cargo
+    else:
+        with pytest.raises(ValueError):
+            create_vehicle.validate_cargo(cargo)
+        with pytest.raises(ValueError):
+            create_vehicle.check_cargo_text(cargo)
+
+
+def test_read_vehicles_collects_every_invalid_row():
+    lines = [
+        '{"x": 1}\n',
+        "not json\n",
+        '{"schedule": [{"x": 1}]}\n',
+        '{"x": 2}\n',
+    ]
+    errors = []
+    rows = list(create_vehicle.read_vehicles(iter(lines), errors=errors))
+    assert [row[0] for row in rows] == [1, 2]
+    assert [lineno for lineno, _ in errors] == [2, 3]
+    assert errors[1][1] == "Schedule entry 0 missing 'y'"
+
+
+def test_format_errors_summarises_long_lists():
+    errors = [(n, "bad") for n in range(1, 26)]
+    text = create_vehicle.format_errors(errors)
+    lines = text.splitlines()
+    assert lines[0] == "25 invalid vehicle(s):"
+    assert lines[1] == "Line 1: bad"
+    assert lines[-1] == "... and 5 more"
+    assert len(lines) == create_vehicle.MAX_REPORTED_ERRORS + 2
+
+
+def test_main_from_file_reports_all_invalid_rows(monkeypatch):
+    cursor = DummyCursor()
+    conn = DummyConnection(cursor)
+    monkeypatch.setattr(create_vehicle.db, "connect", lambda dsn: conn)
+    monkeypatch.setattr(sys, "stdin", io.StringIO("x,y\n1,2\na,2\n3,4\n5,b\n7,8\n"))
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["create_vehicle.py", "--dsn", DSN, "--from-file", "-", "--format", "csv"],
+    )
+
+    with pytest.raises(SystemExit) as exc:
+        create_vehicle.main()
+
+    assert str(exc.value).splitlines() == [
+        "2 invalid vehicle(s):",
+        "Line 3: 'x' must be an integer",
+        "Line 5: 'y' must be an integer",
+    ]
+    # Rows after the first invalid one are checked but never copied
+    assert cursor.copied == [(1, 2, "[]", "[]", None)]
+    assert conn.rolled_back
+    assert not conn.committed
+
+
+def test_main_check_validates_without_connecting(monkeypatch, tmp_path, capsys):
+    path = tmp_path / "vehicles.jsonl"
+    path.write_text('{"x": 1}\n{"cargo": [{"resource": "wood", "amount": 1}]}\n')
+    connect_mock = MagicMock()
+    monkeypatch.setattr(create_vehicle.db, "connect", connect_mock)
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setattr(
+        sys, "argv", ["create_vehicle.py", "--from-file", str(path), "--check"]
+    )
+
+    create_vehicle.main()
+
+    assert "Validated 2 vehicles" in capsys.readouterr().out
+    connect_mock.assert_not_called()
@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import os
+
+import psycopg
+import pytest
+
+from pgttd import db
+from tests.helpers import DummyCursor, DummyConnection
+
+DSN = "postgresql://example"
+
+
+def test_session_kwargs_appends_statement_timeout_to_options():
+    kwargs = db.session_kwargs(
+        "dbname=x options='-c work_mem=8MB'", statement_timeout=500
+    )
+    assert kwargs == {"options": "-c work_mem=8MB -c statement_timeout=500"}
+    kwargs = db.session_kwargs(DSN, 0, prepare_threshold=0, options="-c a=1")
+    assert kwargs == {
+        "options": "-c a=1 -c statement_timeout=0",
+        "prepare_threshold": 0,
+    }
+    assert db.session_kwargs(DSN) == {}
+
+
+def test_session_kwargs_rejects_negative_timeout():
+    with pytest.raises(ValueError, match="--statement-timeout"):
+        db.session_kwargs(DSN, statement_timeout=-1)
+
+
+def test_factory_without_pool_opens_and_closes_connections(monkeypatch):
+    calls = []
+
+    def fake_connect(dsn, **kwargs):
+        calls.append((dsn, kwargs))
+        return DummyConnection(DummyCursor())
+
+    monkeypatch.setattr(db, "connect", fake_connect)
+
+    parser = argparse.ArgumentParser()
+    db.add_dsn_argument(parser)
+    db.add_pool_arguments(parser)
+    args = parser.parse_args(["--dsn", DSN, "--statement-timeout", "250"])
+    with db.ConnectionFactory.from_args(args) as factory:
+        assert factory.max_size is None
+        conn = factory.connect()
+        factory.release(conn)
+
+    assert calls == [(DSN, {"options": "-c statement_timeout=250"})]
+    assert conn.closed
+
+
+def test_conninfo_falls_back_to_environment(monkeypatch):
+    monkeypatch.delenv("PGTTD_CONFIG", raising=False)
+    monkeypatch.setenv("PGHOST", "db.example")
+    monkeypatch.setenv("PGDATABASE", "world")
+    assert db.conninfo(DSN) == DSN
+    info = psycopg.conninfo.conninfo_to_dict(db.conninfo(None))
+    assert info["host"] == "db.example"
+    assert info["dbname"] == "world"
+
+
+@pytest.mark.parametrize("min_size, max_size", [(2, 1), (0, 0), (-1, 4)])
+def test_create_pool_rejects_bad_sizes(min_size, max_size):
+    pytest.importorskip("psycopg_pool")
+    with pytest.raises(ValueError, match="--pool-max"):
+        db.create_pool(DSN, min_size, max_size)
+
+
+@pytest.fixture
+def dsn():
+    dsn = os.environ.get("DATABASE_URL")
+    if not dsn:
+        pytest.skip("DATABASE_URL is not set")
+    pytest.importorskip("psycopg_pool")
+    try:
+        psycopg.connect(dsn).close()
+    except psycopg.OperationalError:
+        pytest.skip("database is not reachable")
+    return dsn
+
+
+def test_pooled_factory_reuses_connections(dsn):
+    with db.ConnectionFactory(
+        dsn, pool=True, max_size=1, statement_timeout=1234
+    ) as factory:
+        conn = factory.connect()
+        pid = conn.info.backend_pid
+        timeout = conn.execute("SELECT current_setting('statement_timeout')")
+        assert timeout.fetchone()[0] in ("1234ms", b"1234ms")
+        factory.release(conn)
+
+        conn = factory.connect()
+        assert conn.info.backend_pid == pid
+        factory.release(conn)
+
+
+def test_async_pool_applies_session_settings(dsn):
+    async def run():
+        async with db.create_async_pool(dsn, statement_timeout=50) as pool:
+            async with pool.connection() as conn:
+                with pytest.raises(psycopg.errors.QueryCanceled):
+                    await conn.execute("SELECT pg_sleep(1)")
+
+    asyncio.run(run())
@@ -1,7 +1,5 @@
 import base64
-import sqlite3
 import sys
-from pathlib import Path
 
 import tools.generate_sprites as generate_sprites
 
@@ -19,39 +17,39 @@ def test_png_from_palette_stdlib_signature():
 def test_generate_palette_fallback(monkeypatch):
     monkeypatch.setitem(sys.modules, "PIL", None)
     palette = module.generate_palette()
-    assert palette["red"] == EXPECTED_RED
-    # ensure base64 decodes to a PNG file
-    png = base64.b64decode(palette["red"])
-    assert png.startswith(PNG_SIGNATURE)
+    assert base64.b64encode(palette["red"]).decode("ascii") == EXPECTED_RED
+    assert palette["red"].startswith(PNG_SIGNATURE)
 
 
-def test_insert_statement_is_escaped(tmp_path):
-    malicious_name = "evil'); DROP TABLE sprites; --"
-    payload = "data"
-    sql = generate_sprites.insert_statement(malicious_name, payload)
+def test_copy_row_escapes_names():
+    row = generate_sprites.copy_row("a\tb\\c\nd", b"\x01\xff")
+    assert row == "a\\tb\\\\c\\nd\tAf8="
+    assert "\n" not in row and row.count("\t") == 1
 
-    conn = sqlite3.connect(":memory:")
-    conn.execute("CREATE TABLE sprites(name TEXT, image_base64 TEXT)")
-    conn.executescript(sql)
 
-    rows = list(conn.execute("SELECT name, image_base64 FROM sprites"))
-    assert rows == [(malicious_name, payload)]
-
-
-def test_quote_sql_handles_various_types():
-    assert generate_sprites.quote_sql("O'Reilly") == "'O''Reilly'"
-    assert generate_sprites.quote_sql(42) == "'42'"
-    assert generate_sprites.quote_sql(Path("a'b")) == "'a''b'"
-    assert generate_sprites.quote_sql(None) == "NULL"
+def test_seed_script_loads_sprites_with_one_copy():
+    script = generate_sprites.seed_script({"red": b"\x89", "blue": b"\x00"})
+    assert script.splitlines() == [
+        "BEGIN;",
+        generate_sprites.LOAD_TABLE_SQL + ";",
+        generate_sprites.SEED_TABLE_SQL + ";",
+        generate_sprites.SEED_COPY_SQL + ";",
+        "red\tiQ==",
+        "blue\tAA==",
+        "\\.",
+        generate_sprites.SEED_DECODE_SQL + ";",
+        "SELECT store_sprites();",
+        "COMMIT;",
+    ]
 
 
 def test_main_writes_expected_file(tmp_path, monkeypatch, capsys):
     out = tmp_path / "out.sql"
 
-    monkeypatch.setattr(generate_sprites, "generate_palette", lambda: {"red": "data"})
+    monkeypatch.setattr(generate_sprites, "generate_palette", lambda: {"red": b"x"})
     monkeypatch.setattr(sys, "argv", ["generate_sprites.py", "--output", str(out)])
 
     generate_sprites.main()
 
-    assert out.read_text() == generate_sprites.insert_statement("red", "data") + "\n"
+    assert out.read_text() == generate_sprites.seed_script({"red": b"x"})
     assert f"Wrote 1 sprites to {out}" in capsys.readouterr().out
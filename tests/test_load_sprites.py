@@ -0,0 +1,98 @@
+import io
+import os
+from pathlib import Path
+
+import psycopg
+import pytest
+
+import tools.load_sprites as load_sprites
+from pgttd.aio import SPRITES_SQL
+from tests.helpers import DummyCursor, DummyConnection
+from tools.generate_sprites import COPY_SQL, LOAD_TABLE_SQL
+
+SQL_DIR = Path(__file__).resolve().parent.parent / "sql"
+
+
+def test_read_directory_names_sprites_after_files(tmp_path):
+    (tmp_path / "water.png").write_bytes(b"w")
+    (tmp_path / "grass.png").write_bytes(b"g")
+    (tmp_path / "notes.txt").write_bytes(b"n")
+
+    assert list(load_sprites.read_directory(tmp_path)) == [
+        ("grass", b"g"),
+        ("water", b"w"),
+    ]
+
+
+def test_load_sprites_copies_then_stores():
+    cursor = DummyCursor(rows=[(1,)])
+    conn = DummyConnection(cursor)
+
+    assert load_sprites.load_sprites(conn, [("grass", b"g"), ("sea", b"w")]) == (
+        2,
+        1,
+    )
+    assert [sql for sql, _ in cursor.statements] == [
+        LOAD_TABLE_SQL,
+        COPY_SQL,
+        "SELECT store_sprites()",
+    ]
+    assert cursor.copied == [("grass", b"g"), ("sea", b"w")]
+    assert conn.committed
+
+
+def test_slice_atlas_skips_transparent_squares(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    atlas = Image.new("RGBA", (5, 4), (0, 0, 0, 0))
+    atlas.putpixel((0, 0), (255, 0, 0, 255))
+    atlas.putpixel((3, 2), (0, 0, 255, 255))
+    path = tmp_path / "terrain.png"
+    atlas.save(path)
+
+    tiles = dict(load_sprites.slice_atlas(path, 2))
+
+    assert sorted(tiles) == ["terrain_0_0", "terrain_1_1"]
+    with Image.open(io.BytesIO(tiles["terrain_1_1"])) as tile:
+        assert tile.size == (2, 2)
+        assert tile.getpixel((1, 0)) == (0, 0, 255, 255)
+
+
+@pytest.fixture
+def pg_conn():
+    dsn = os.environ.get("DATABASE_URL")
+    if not dsn:
+        pytest.skip("DATABASE_URL is not set")
+    try:
+        conn = psycopg.connect(dsn, client_encoding="UTF8")
+    except psycopg.OperationalError:
+        pytest.skip("database is not reachable")
+    # load_sprites() commits, so the scratch namespace is dropped afterwards
+    with conn:
+        conn.execute("CREATE SCHEMA sprite_loading")
+        conn.execute("SET search_path TO sprite_loading")
+        conn.execute((SQL_DIR / "schema.sql").read_text())
+        conn.execute((SQL_DIR / "sprites.sql").read_text())
+        conn.execute("INSERT INTO game_state (current_tick) VALUES (0)")
+        conn.commit()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            conn.execute("DROP SCHEMA sprite_loading CASCADE")
+            conn.commit()
+
+
+def test_loaded_sprites_read_back_with_sprites_sql(pg_conn):
+    sprites = [("grass", b"g"), ("meadow", b"g"), ("water", b"w")]
+
+    assert load_sprites.load_sprites(pg_conn, sprites) == (3, 3)
+    assert load_sprites.load_sprites(pg_conn, sprites) == (3, 0)
+
+    images = pg_conn.execute("SELECT count(*) FROM sprite_images").fetchone()
+    assert images == (2,)
+    rows = sorted(pg_conn.execute(SPRITES_SQL).fetchall())
+    assert rows == [
+        (1, "?", "white", b"g"),
+        (2, "?", "white", b"g"),
+        (3, "?", "white", b"w"),
+    ]
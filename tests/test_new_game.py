@@ -0,0 +1,96 @@
+import sys
+
+import psycopg
+import pytest
+
+from pgttd import new_game
+from tests.helpers import DummyCursor, DummyConnection
+
+DSN = "postgresql://example"
+
+
+@pytest.mark.parametrize(
+    "width, workers, expected",
+    [
+        (10, 1, [(1, 10)]),
+        (10, 3, [(1, 4), (5, 7), (8, 10)]),
+        (2, 4, [(1, 1), (2, 2)]),
+    ],
+)
+def test_column_bands(width, workers, expected):
+    assert new_game.column_bands(width, workers) == expected
+
+
+def test_main_single_worker(monkeypatch, capsys):
+    cursor = DummyCursor()
+    conn = DummyConnection(cursor)
+
+    def fake_connect(dsn: str):
+        assert dsn == DSN
+        return conn
+
+    monkeypatch.setattr(new_game.db, "connect", fake_connect)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["pgttd.new_game", "--dsn", DSN, "--width", "4", "--height", "3"],
+    )
+
+    assert new_game.main() == 0
+
+    assert cursor.executed == ("CALL new_game(%s, %s)", (4, 3))
+    assert conn.committed
+    assert conn.closed
+    out = capsys.readouterr().out
+    assert "Created 4x3 world (24 rows)" in out
+    assert "rows/s" in out
+
+
+def test_create_world_in_bands(monkeypatch):
+    calls = []
+
+    class RecordingCursor(DummyCursor):
+        def execute(self, sql, params=None):
+            calls.append((sql, params))
+
+    monkeypatch.setattr(
+        new_game.db, "connect", lambda dsn: DummyConnection(RecordingCursor())
+    )
+
+    assert new_game.create_world(DSN, 4, 3, workers=2) == 24
+
+    assert calls[0] == ("CALL reset_world(%s, %s)", (4, 3))
+    assert sorted(calls[1:3]) == [
+        ("CALL populate_world(%s, %s, %s)", (1, 2, 3)),
+        ("CALL populate_world(%s, %s, %s)", (3, 4, 3)),
+    ]
+    assert calls[3] == ("CALL index_world()", None)
+
+
+def test_failed_band_still_indexes_the_world(monkeypatch):
+    calls = []
+
+    class FailingBandCursor(DummyCursor):
+        def execute(self, sql, params=None):
+            calls.append((sql, params))
+            if params == (3, 4, 3):
+                raise psycopg.Error("band failed")
+
+    monkeypatch.setattr(
+        new_game.db, "connect", lambda dsn: DummyConnection(FailingBandCursor())
+    )
+
+    with pytest.raises(psycopg.Error, match="band failed"):
+        new_game.create_world(DSN, 4, 3, workers=2)
+
+    assert calls[-1] == ("CALL index_world()", None)
+
+
+def test_invalid_size(monkeypatch):
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["pgttd.new_game", "--dsn", DSN, "--width", "0", "--height", "3"],
+    )
+    with pytest.raises(SystemExit, match="must be positive"):
+        new_game.main()
@@ -0,0 +1,98 @@
+import sys
+
+import psycopg
+import pytest
+
+from pgttd import parallel_tick
+from tests.helpers import DummyCursor, DummyConnection
+
+DSN = "postgresql://example"
+
+
+class RecordingCursor(DummyCursor):
+    def __init__(self, calls, bounds=(1, 10), fail_on=None):
+        super().__init__()
+        self.calls = calls
+        self.bounds = bounds
+        self.fail_on = fail_on
+
+    def execute(self, sql, params=None):
+        if self.fail_on is not None and params == self.fail_on:
+            raise psycopg.Error("boom")
+        self.calls.append((sql, params))
+
+    def fetchone(self):
+        return self.bounds
+
+
+@pytest.mark.parametrize(
+    "min_id, max_id, workers, expected",
+    [
+        (1, 10, 1, [(1, 10)]),
+        (1, 10, 3, [(1, 4), (5, 7), (8, 10)]),
+        (5, 6, 4, [(5, 5), (6, 6)]),
+    ],
+)
+def test_id_ranges(min_id, max_id, workers, expected):
+    assert parallel_tick.id_ranges(min_id, max_id, workers) == expected
+
+
+def test_tick_moves_each_shard(monkeypatch):
+    calls = []
+    conns = []
+
+    def fake_connect(dsn):
+        conn = DummyConnection(RecordingCursor(calls))
+        conns.append(conn)
+        return conn
+
+    monkeypatch.setattr(parallel_tick.db, "connect", fake_connect)
+
+    with parallel_tick.ParallelTicker(DSN, workers=2) as ticker:
+        ticker.tick()
+
+    assert calls[0] == ("CALL tick(1, %s)", (["move_vehicles"],))
+    moves = sorted(params for sql, params in calls if "move_vehicles" in sql)
+    assert moves == [(1, 5), (6, 10)]
+    assert all(conn.committed and conn.closed for conn in conns)
+
+
+def test_tick_rolls_back_every_shard_on_failure(monkeypatch):
+    calls = []
+    conns = []
+
+    def fake_connect(dsn):
+        conn = DummyConnection(RecordingCursor(calls, fail_on=(6, 10)))
+        conns.append(conn)
+        return conn
+
+    monkeypatch.setattr(parallel_tick.db, "connect", fake_connect)
+
+    with parallel_tick.ParallelTicker(DSN, workers=2) as ticker:
+        with pytest.raises(psycopg.Error):
+            ticker.tick()
+
+    assert all(conn.rolled_back for conn in conns)
+    assert not any(conn.committed for conn in conns)
+
+
+def test_main_rejects_non_positive_workers(monkeypatch):
+    monkeypatch.setattr(
+        sys, "argv", ["pgttd.parallel_tick", "--dsn", DSN, "--workers", "0"]
+    )
+
+    with pytest.raises(SystemExit) as exc:
+        parallel_tick.main()
+
+    assert "--workers must be positive" in str(exc.value)
+
+
+def test_rejects_pool_smaller_than_workers():
+    class SmallPool:
+        max_size = 2
+
+        def connect(self):
+            raise AssertionError("no connection should be taken")
+
+    with pytest.raises(ValueError, match="--pool-max must be at least --workers"):
+        parallel_tick.ParallelTicker(DSN, workers=3, factory=SmallPool())
@@ -30,6 +30,50 @@ def test_main_success(monkeypatch):
     assert not conn.rolled_back
 
 
+def test_main_fast_forward_with_snapshots(monkeypatch, capsys):
+    cursor = DummyCursor()
+    conn = DummyConnection(cursor)
+
+    def fake_connect(dsn, **kwargs):
+        assert kwargs == {"autocommit": True}
+        return conn
+
+    monkeypatch.setattr(run_tick.db, "connect", fake_connect)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "pgttd.run_tick",
+            "--dsn",
+            DSN,
+            "--ticks",
+            "2500",
+            "--commit-every",
+            "100",
+            "--snapshot",
+            "companies",
+            "--snapshot",
+            "resources",
+        ],
+    )
+
+    assert run_tick.main() == 0
+
+    assert cursor.executed == (
+        "CALL fast_forward(%s, %s, %s)",
+        (2500, 100, ["companies", "resources"]),
+    )
+    assert conn.closed
+    assert "Ran 2500 ticks" in capsys.readouterr().out
+
+
+def test_main_rejects_non_positive_ticks(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["pgttd.run_tick", "--dsn", DSN, "--ticks", "0"])
+
+    with pytest.raises(SystemExit):
+        run_tick.main()
+
+
 def test_main_failure(monkeypatch):
     cursor = DummyCursor(should_fail=True)
     conn = DummyConnection(cursor)
@@ -0,0 +1,234 @@
+import json
+import os
+from pathlib import Path
+
+import psycopg
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pgttd import sim  # noqa: E402
+
+SQL_DIR = Path(__file__).resolve().parent.parent / "sql"
+
+# ore, coal, steel, tools, slag
+RESOURCES = [(1, 6), (2, 100), (3, 0), (4, 0), (5, 0)]
+FLOWS = [
+    # mill a and mill b compete for ore; the forge uses their steel
+    (1, 1, True, 4),
+    (1, 3, False, 2),
+    (1, 2, True, 10),
+    (1, 5, False, 3),
+    (2, 1, True, 8),
+    (2, 3, False, 4),
+    (3, 3, True, 2),
+    (3, 4, False, 1),
+]
+
+
+def test_industry_levels_orders_chains_and_groups_cycles():
+    rows = FLOWS + [
+        (4, 4, True, 1),
+        (4, 6, False, 1),
+        (5, 6, True, 1),
+        (5, 4, False, 1),
+    ]
+    levels = sim.industry_levels(rows)
+    assert levels[1] == levels[2] == 0
+    assert levels[3] == 1
+    # industries 4 and 5 feed each other
+    assert levels[4] == levels[5] == 2
+
+
+def test_economy_shares_contended_inputs_down_the_chain():
+    economy = sim.Economy(RESOURCES, [(2, 0, 0)], FLOWS)
+    economy.step()
+    assert economy.amount.tolist() == [0, 95, 1, 1, 1.5]
+
+
+def test_economy_runs_at_the_scarcest_input():
+    economy = sim.Economy([(1, 4), (2, 2.5), (3, 0)], [(1, 1, 1)], FLOWS[:3])
+    economy.step()
+    # coal limits the mill to a quarter of its recipe
+    assert economy.amount.tolist() == [3, 0, 0.5]
+
+
+def test_economy_runs_only_industries_with_inputs():
+    # a well with no input and a pond whose input is 0 per tick
+    flows = [(1, 1, False, 5), (2, 1, True, 0), (2, 2, False, 2)]
+    economy = sim.Economy([(1, 0), (2, 0)], [], flows)
+    economy.step()
+    assert economy.amount.tolist() == [0, 2]
+
+
+def test_fleet_steps_towards_targets_and_follows_flow_fields():
+    fleet = sim.Fleet(
+        [
+            (1, 0, 0, 0, [2], [1]),
+            (2, 2, 0, 0, [2], [1]),
+            (3, 2, 1, 0, [2, 0], [1, 0]),
+            (4, 5, 5, 0, [], []),
+            (5, 1, 1, 0, [3], [3]),
+        ],
+        flow_fields=[(3, 3, 1, 1, 1, 2)],
+    )
+    fleet.step()
+    assert fleet.x.tolist() == [1, 2, 2, 5, 1]
+    assert fleet.y.tolist() == [0, 1, 1, 5, 2]
+    assert fleet.idx.tolist() == [0, 0, 1, 0, 0]
+    fleet.step()
+    # vehicle 5 is off the flow field and steps straight
+    assert fleet.x.tolist() == [2, 2, 1, 5, 2]
+    assert fleet.y.tolist() == [0, 1, 1, 5, 2]
+
+
+def test_ledger_applies_outputs_and_operations():
+    ledger = sim.Ledger(
+        [(1, 100, 7, 7), (2, 0, 0, 0)], outputs=[(1, 5), (1, 5)], operations=[(1, 3, 4)]
+    )
+    ledger.step()
+    ledger.step()
+    assert ledger.cash.tolist() == [118, 0]
+    assert ledger.income.tolist() == [13, 0]
+    assert ledger.expenses.tolist() == [4, 0]
+
+
+@pytest.fixture
+def pg_conn():
+    dsn = os.environ.get("DATABASE_URL")
+    if not dsn:
+        pytest.skip("DATABASE_URL is not set")
+    try:
+        conn = psycopg.connect(dsn)
+    except psycopg.OperationalError:
+        pytest.skip("database is not reachable")
+    with conn:
+        with conn.cursor() as cur:
+            # Build the schema in a scratch namespace that is rolled back
+            cur.execute("CREATE SCHEMA sim_conformance")
+            cur.execute("SET LOCAL search_path TO sim_conformance")
+            cur.execute((SQL_DIR / "schema.sql").read_text())
+            for proc in ("economy_tick", "move_vehicles", "update_balances"):
+                cur.execute((SQL_DIR / "procs" / f"{proc}.sql").read_text())
+        yield conn
+        conn.rollback()
+
+
+def _seed(cur) -> None:
+    rng = np.random.default_rng(7)
+    cur.execute("INSERT INTO game_state (current_tick) VALUES (0)")
+    # The test calls the stages itself and the field towards (9, 9) is stale
+    cur.execute(
+        "UPDATE tick_stages SET enabled = false WHERE name = 'refresh_flow_fields'"
+    )
+    cur.executemany(
+        "INSERT INTO resources (id, name, amount) VALUES (%s, %s, %s)",
+        [(rid, f"r{rid}", amount) for rid, amount in RESOURCES],
+    )
+    cur.executemany(
+        "INSERT INTO resource_rules VALUES (%s, %s, %s)",
+        [(1, 7, 0), (2, 3, 1), (5, 0, 2)],
+    )
+    cur.executemany(
+        "INSERT INTO resource_industries (id, name) VALUES (%s, %s)",
+        [(i, f"i{i}") for i in range(1, 4)],
+    )
+    cur.executemany(
+        "INSERT INTO resource_industry_flows VALUES (%s, %s, %s, %s)", FLOWS
+    )
+
+    cur.execute(
+        "INSERT INTO companies (id, name, cash) "
+        "VALUES (1, 'a', 100), (2, 'b', 50), (3, 'c', 0)"
+    )
+    cur.execute(
+        "INSERT INTO industry_outputs (company_id, value) VALUES (1, 5), (2, 3)"
+    )
+    cur.execute(
+        "INSERT INTO vehicle_operations (company_id, revenue, cost) "
+        "VALUES (1, 2, 4), (3, 0, 1)"
+    )
+
+    # Flow fields that move along y first, unlike the straight-line fallback,
+    # and leave out some far tiles: one towards (5, 5) built for the current
+    # terrain and one towards (9, 9) built for older terrain, which is ignored
+    cur.execute("INSERT INTO flow_field_destinations VALUES (5, 5, 0), (9, 9, -1)")
+    cur.execute(
+        "INSERT INTO flow_fields "
+        "SELECT d, d, x, y, "
+        "CASE WHEN y = d THEN x + sign(d - x)::int ELSE x END, "
+        "CASE WHEN y <> d THEN y + sign(d - y)::int ELSE y END "
+        "FROM (VALUES (5), (9)) dest (d), "
+        "generate_series(0, 12) x, generate_series(0, 12) y "
+        "WHERE (x, y) <> (d, d) AND x + y < 20"
+    )
+    vehicles = []
+    for _ in range(40):
+        stops = [
+            {"x": int(x), "y": int(y)}
+            for x, y in rng.integers(0, 13, size=(rng.integers(0, 4), 2))
+        ]
+        if stops and rng.random() < 0.5:
+            stops[0] = {"x": 5, "y": 5} if rng.random() < 0.7 else {"x": 9, "y": 9}
+        x, y = rng.integers(0, 13, size=2)
+        vehicles.append((int(x), int(y), json.dumps(stops)))
+    cur.executemany(
+        "INSERT INTO vehicles (x, y, schedule) VALUES (%s, %s, %s::jsonb)", vehicles
+    )
+
+
+def _state(cur):
+    cur.execute("SELECT amount::float8 FROM resources ORDER BY id")
+    amounts = [row[0] for row in cur.fetchall()]
+    cur.execute("SELECT x, y, schedule_idx FROM vehicles ORDER BY id")
+    vehicles = cur.fetchall()
+    cur.execute("SELECT cash, income, expenses FROM companies ORDER BY id")
+    return amounts, vehicles, cur.fetchall()
+
+
+def test_world_matches_stored_procedures_tick_for_tick(pg_conn):
+    with pg_conn.cursor() as cur:
+        _seed(cur)
+        world = sim.load(pg_conn)
+        for tick in range(1, 31):
+            cur.execute("SELECT economy_tick()")
+            cur.execute("CALL move_vehicles()")
+            cur.execute("SELECT update_balances()")
+            world.step()
+
+            amounts, vehicles, companies = _state(cur)
+            assert world.economy.amount == pytest.approx(amounts, abs=1e-6), tick
+            assert vehicles == list(
+                zip(
+                    world.fleet.x.tolist(),
+                    world.fleet.y.tolist(),
+                    world.fleet.idx.tolist(),
+                )
+            ), tick
+            assert companies == list(
+                zip(
+                    world.ledger.cash.tolist(),
+                    world.ledger.income.tolist(),
+                    world.ledger.expenses.tolist(),
+                )
+            ), tick
+
+        # save() overwrites the database state
+        world.economy.amount[:] = 0
+        world.fleet.x[:] = 0
+        world.save(pg_conn)
+        amounts, vehicles, _ = _state(cur)
+        assert amounts == [0.0] * len(RESOURCES)
+        assert {v[0] for v in vehicles} == {0}
+        cur.execute("SELECT current_tick FROM game_state")
+        assert cur.fetchone()[0] == 30
+
+
+def test_load_rejects_stages_it_cannot_simulate(pg_conn):
+    with pg_conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO tick_stages (name, position, command) "
+            "VALUES ('snapshot', 70, 'SELECT 1')"
+        )
+    with pytest.raises(ValueError, match="cannot simulate"):
+        sim.load(pg_conn)
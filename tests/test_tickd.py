@@ -0,0 +1,147 @@
+import psycopg
+import pytest
+
+from pgttd import tickd
+from tests.helpers import DummyCursor, DummyConnection
+
+DSN = "postgresql://example"
+
+
+class PreparingCursor(DummyCursor):
+    def __init__(self, calls, errors=()):
+        super().__init__()
+        self.calls = calls
+        self.errors = list(errors)
+
+    def execute(self, sql, params=None, prepare=None):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.calls.append((sql, prepare))
+
+
+def test_percentile():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert tickd.percentile(values, 50) == 3.0
+    assert tickd.percentile(values, 99) == 5.0
+    assert tickd.percentile([7.0], 90) == 7.0
+
+
+@pytest.mark.parametrize(
+    "now, behind, expected",
+    [
+        (10.5, "catch-up", (11.0, 0)),
+        (13.5, "catch-up", (11.0, 0)),
+        (10.5, "skip", (11.0, 0)),
+        (13.5, "skip", (14.0, 3)),
+    ],
+)
+def test_next_deadline(now, behind, expected):
+    assert tickd.next_deadline(10.0, now, 1.0, behind) == expected
+
+
+def test_run_uses_one_prepared_connection(monkeypatch):
+    calls = []
+    conns = []
+
+    def fake_connect(dsn):
+        assert dsn == DSN
+        conn = DummyConnection(PreparingCursor(calls))
+        conns.append(conn)
+        return conn
+
+    monkeypatch.setattr(tickd.db, "connect", fake_connect)
+
+    daemon = tickd.TickDaemon(DSN, report_every=2)
+    assert daemon.run(max_ticks=3) == 3
+
+    assert calls == [("CALL tick()", True)] * 3
+    assert len(conns) == 1
+    assert conns[0].committed and conns[0].closed
+
+
+def test_run_reconnects_after_connection_loss(monkeypatch):
+    calls = []
+    cursors = [
+        PreparingCursor(calls, errors=[psycopg.OperationalError("gone")]),
+        PreparingCursor(calls),
+    ]
+    conns = []
+
+    def fake_connect(dsn):
+        conn = DummyConnection(cursors.pop(0))
+        # psycopg marks a connection broken when it loses the server
+        conn.broken = not conns
+        conns.append(conn)
+        return conn
+
+    monkeypatch.setattr(tickd.db, "connect", fake_connect)
+    monkeypatch.setattr(tickd, "RECONNECT_DELAY", 0)
+
+    assert tickd.TickDaemon(DSN).run(max_ticks=2) == 2
+    assert len(conns) == 2
+    assert conns[0].closed and not conns[0].committed
+
+
+def test_run_raises_other_errors_after_rollback(monkeypatch):
+    conn = DummyConnection(PreparingCursor([], errors=[psycopg.Error("boom")]))
+    monkeypatch.setattr(tickd.db, "connect", lambda dsn: conn)
+
+    with pytest.raises(psycopg.Error):
+        tickd.TickDaemon(DSN).run(max_ticks=1)
+    assert conn.rolled_back
+    assert conn.closed
+
+
+def test_run_raises_cancelled_ticks_without_reconnecting(monkeypatch):
+    conns = []
+    error = psycopg.errors.QueryCanceled("canceling statement due to timeout")
+
+    def fake_connect(dsn):
+        conns.append(DummyConnection(PreparingCursor([], errors=[error])))
+        return conns[-1]
+
+    monkeypatch.setattr(tickd.db, "connect", fake_connect)
+
+    with pytest.raises(psycopg.errors.QueryCanceled):
+        tickd.TickDaemon(DSN).run(max_ticks=2)
+    assert len(conns) == 1
+    assert conns[0].rolled_back
+    assert conns[0].closed
+
+
+def test_run_raises_connect_errors(monkeypatch):
+    def fake_connect(dsn):
+        raise psycopg.ProgrammingError("invalid dsn")
+
+    monkeypatch.setattr(tickd.db, "connect", fake_connect)
+
+    with pytest.raises(psycopg.ProgrammingError):
+        tickd.TickDaemon(DSN).run(max_ticks=1)
+
+
+def test_stop_finishes_current_tick(monkeypatch):
+    daemon = tickd.TickDaemon(DSN, rate=1000)
+
+    class StoppingCursor(PreparingCursor):
+        def execute(self, sql, params=None, prepare=None):
+            super().execute(sql, params, prepare)
+            daemon.stop()
+
+    calls = []
+    conn = DummyConnection(StoppingCursor(calls))
+    monkeypatch.setattr(tickd.db, "connect", lambda dsn: conn)
+
+    assert daemon.run() == 1
+    assert conn.committed
+
+
+@pytest.mark.parametrize(
+    "kwargs, msg",
+    [
+        ({"rate": -1}, "--rate must not be negative"),
+        ({"report_every": 0}, "--report-every must be positive"),
+    ],
+)
+def test_invalid_options(kwargs, msg):
+    with pytest.raises(ValueError, match=msg):
+        tickd.TickDaemon(DSN, **kwargs)
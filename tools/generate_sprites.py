@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
-"""Generate simple colored square sprites and output SQL inserts.
+"""Generate simple colored square sprites and output a psql seed script.
 
-This script generates a few colored square PNG images, encodes them as
-Base64 strings, and writes SQL ``INSERT`` statements for a ``sprites``
-table.  If Pillow is available it is used to produce 16x16 images.  If
-not, the script falls back to generating 1x1 PNGs using only the Python
-standard library.
+This script generates a few colored square PNG images and writes a psql
+script that loads them into the ``sprites`` table with a single ``COPY``
+and ``store_sprites()`` from ``sql/sprites.sql``.  If Pillow is available
+it is used to produce 16x16 images.  If not, the script falls back to
+generating 1x1 PNGs using only the Python standard library.
 """
 
 from __future__ import annotations
@@ -16,31 +16,42 @@ import io
 import struct
 import zlib
 from pathlib import Path
-from typing import Any
 
+# Load table filled by COPY and emptied by store_sprites() of sql/sprites.sql
+LOAD_TABLE_SQL = (
+    "CREATE TEMP TABLE sprite_load (name TEXT NOT NULL, image BYTEA NOT NULL) "
+    "ON COMMIT DROP"
+)
+COPY_SQL = "COPY sprite_load (name, image) FROM STDIN"
 
-def quote_sql(value: Any) -> str:
-    """Return a safely quoted SQL string literal.
+# Seed scripts carry their images as base64, which is smaller than the hex
+# form of bytea in COPY text, and decode them on the server.
+SEED_TABLE_SQL = (
+    "CREATE TEMP TABLE sprite_seed (name TEXT NOT NULL, image_base64 TEXT NOT NULL) "
+    "ON COMMIT DROP"
+)
+SEED_COPY_SQL = "COPY sprite_seed (name, image_base64) FROM STDIN"
+SEED_DECODE_SQL = (
+    "INSERT INTO sprite_load (name, image) "
+    "SELECT name, decode(image_base64, 'base64') FROM sprite_seed"
+)
 
-    The original implementation assumed ``value`` was always a string and
-    called :py:meth:`str.replace` directly.  During packaging/build steps some
-    callers may provide values such as integers or ``Path`` objects which do
-    not implement ``replace``.  Converting to ``str`` first avoids ``AttributeError``
-    and ensures we can safely escape any single quotes.
-    """
+# Characters with a meaning of their own in COPY text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
 
-    if value is None:
-        return "NULL"
 
-    text = str(value)
-    return "'" + text.replace("'", "''") + "'"
+def copy_row(name: str, png: bytes) -> str:
+    """Return a line of COPY text format for :data:`SEED_COPY_SQL`."""
+    b64 = base64.b64encode(png).decode("ascii")
+    return f"{name.translate(_COPY_ESCAPES)}\t{b64}"
 
 
-def insert_statement(name: str, b64: str) -> str:
-    """Return an INSERT statement for the sprites table."""
-    return "INSERT INTO sprites(name, image_base64) VALUES ({name}, {b64});".format(
-        name=quote_sql(name), b64=quote_sql(b64)
-    )
+def seed_script(sprites: dict[str, bytes]) -> str:
+    """Return a psql script loading *sprites* with one COPY."""
+    lines = ["BEGIN;", LOAD_TABLE_SQL + ";", SEED_TABLE_SQL + ";", SEED_COPY_SQL + ";"]
+    lines.extend(copy_row(name, png) for name, png in sprites.items())
+    lines += ["\\.", SEED_DECODE_SQL + ";", "SELECT store_sprites();", "COMMIT;"]
+    return "\n".join(lines) + "\n"
 
 
 # Basic palette of sprite colors.
@@ -88,8 +99,8 @@ def _png_from_palette_stdlib(color: tuple[int, int, int]) -> bytes:
     )
 
 
-def generate_palette() -> dict[str, str]:
-    """Return a mapping of sprite name to Base64-encoded PNG."""
+def generate_palette() -> dict[str, bytes]:
+    """Return a mapping of sprite name to PNG image."""
     try:
         # Attempt to use Pillow if available
         import PIL  # noqa: F401
@@ -98,11 +109,7 @@ def generate_palette() -> dict[str, str]:
     except Exception:  # pragma: no cover - Pillow not available
         generator = _png_from_palette_stdlib
 
-    sprites: dict[str, str] = {}
-    for name, rgb in PALETTE.items():
-        png_bytes = generator(rgb)
-        sprites[name] = base64.b64encode(png_bytes).decode("ascii")
-    return sprites
+    return {name: generator(rgb) for name, rgb in PALETTE.items()}
 
 
 def main() -> None:
@@ -112,15 +119,13 @@ def main() -> None:
         "--output",
         type=Path,
         default=Path(__file__).resolve().parent.parent / "sql" / "seed_sprites.sql",
-        help="Path to write SQL insert statements",
+        help="Path to write the psql seed script",
     )
     args = parser.parse_args()
 
     sprites = generate_palette()
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    with args.output.open("w", encoding="utf-8") as f:
-        for name, b64 in sprites.items():
-            f.write(insert_statement(name, b64) + "\n")
+    args.output.write_text(seed_script(sprites), encoding="utf-8")
     print(f"Wrote {len(sprites)} sprites to {args.output}")
 
 
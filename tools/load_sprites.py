@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Bulk load sprite PNGs into the database.
+
+The source is either a directory, whose ``*.png`` files become sprites named
+after the file, or a single atlas PNG, which is cut into ``--tile-size``
+squares named ``<atlas>_<column>_<row>``. Fully transparent squares are
+skipped. Cutting an atlas needs Pillow (``pip install .[sprites]``); loading
+a directory does not.
+
+All images go to the server in one ``COPY`` into a temporary table, and
+``store_sprites()`` from ``sql/sprites.sql`` adds each distinct image once.
+Loading the same source again changes nothing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pgttd.db as db
+from tools.generate_sprites import COPY_SQL, LOAD_TABLE_SQL
+
+
+def read_directory(path: Path) -> Iterator[tuple[str, bytes]]:
+    """Yield ``(name, png)`` for each PNG file in *path*, by name."""
+    for file in sorted(path.glob("*.png")):
+        yield file.stem, file.read_bytes()
+
+
+def slice_atlas(path: Path, tile_size: int) -> Iterator[tuple[str, bytes]]:
+    """Yield ``(name, png)`` for each non-empty square of the atlas *path*.
+
+    Squares are taken row by row; a partial square at the right or bottom
+    edge is left out.
+    """
+    from PIL import Image
+
+    with Image.open(path) as atlas:
+        atlas = atlas.convert("RGBA")
+        for row in range(atlas.height // tile_size):
+            for col in range(atlas.width // tile_size):
+                left, top = col * tile_size, row * tile_size
+                tile = atlas.crop((left, top, left + tile_size, top + tile_size))
+                if tile.getchannel("A").getbbox() is None:
+                    continue
+                buf = io.BytesIO()
+                tile.save(buf, format="PNG")
+                yield f"{path.stem}_{col}_{row}", buf.getvalue()
+
+
+def load_sprites(conn, sprites: Iterable[tuple[str, bytes]]) -> tuple[int, int]:
+    """Load ``(name, png)`` pairs and commit.
+
+    Returns the number of sprites sent and the number added or changed.
+    """
+    sent = 0
+    with conn.cursor() as cur:
+        cur.execute(LOAD_TABLE_SQL)
+        with cur.copy(COPY_SQL) as copy:
+            for name, png in sprites:
+                copy.write_row((name, png))
+                sent += 1
+        cur.execute("SELECT store_sprites()")
+        stored = cur.fetchone()[0]
+    conn.commit()
+    return sent, stored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk load sprite PNGs")
+    db.add_dsn_argument(parser)
+    parser.add_argument(
+        "source", type=Path, help="Directory of PNG files or an atlas PNG"
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=16,
+        help="Width and height of the squares cut from an atlas",
+    )
+    args = parser.parse_args()
+    db.parse_dsn(args)
+
+    if args.source.is_dir():
+        sprites = read_directory(args.source)
+    else:
+        sprites = slice_atlas(args.source, args.tile_size)
+    with db.connect(args.dsn) as conn:
+        sent, stored = load_sprites(conn, sprites)
+    print(f"Loaded {sent} sprites, {stored} added or changed")
+
+
+if __name__ == "__main__":
+    main()